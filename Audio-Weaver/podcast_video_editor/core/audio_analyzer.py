@@ -1,33 +1,58 @@
+import copy
 import torch
-import warnings
 import os
+import wave
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from .energy_vad import EnergyVAD
+from .vad_model import vad_registry
+
+SAMPLING_RATE = 16000
+# Silero expects 512-sample windows at 16 kHz
+WINDOW_SAMPLES = 512
+# Samples read from disk per block in streaming mode (30 s)
+READ_BLOCK_SAMPLES = SAMPLING_RATE * 30
+# Context kept around energy-detected regions before handing them to Silero
+PREFILTER_PADDING = 0.5
 
 class AudioAnalyzer:
-    def __init__(self):
+    def __init__(self, prefilter=False):
         self.model = None
         self.utils = None
+        # prefilter: only run Silero over regions the energy VAD flags as non-silent
+        self.prefilter = prefilter
+        self.energy_vad = EnergyVAD()
     
     def load_model(self):
-        print("Loading Silero VAD model (this may take a moment)...")
-        # Suppress warnings
-        warnings.filterwarnings("ignore")
-        try:
-            self.model, self.utils = torch.hub.load(repo_or_dir='snakers4/silero-vad',
-                                                    model='silero_vad',
-                                                    force_reload=False,
-                                                    trust_repo=True)
-            print("Silero VAD model loaded successfully.")
-        except Exception as e:
-            print(f"Failed to load VAD model: {e}")
-            print("Will default to basic energy analysis if needed.")
+        # Shared per process: only the first analyzer actually loads the model
+        if vad_registry.metrics['loads'] == 0:
+            print("Loading Silero VAD model (this may take a moment)...")
+        self.model, self.utils = vad_registry.get()
+        if self.model:
+            metrics = vad_registry.metrics
+            print(f"Silero VAD model ready ({metrics['source']}, loaded in {metrics['load_seconds']}s).")
+        else:
+            print(f"Failed to load VAD model: {vad_registry.error}")
+            print("Falling back to energy-based speech detection.")
 
-    def get_speech_timestamps(self, audio_path):
+    def get_speech_timestamps(self, audio_path, streaming=True):
+        """
+        Speech intervals of a 16 kHz WAV as {'start', 'end'} dicts in seconds.
+        streaming: run VADIterator over chunks (constant memory) instead of
+        loading the whole recording into one tensor.
+        """
         if not self.model:
             self.load_model()
         
         if not self.model:
-            return []
+            return self.energy_speech_timestamps(audio_path)
+
+        if streaming:
+            try:
+                return list(self.iter_speech_timestamps(audio_path))
+            except Exception as e:
+                print(f"Error analyzing audio {audio_path}: {e}")
+                return self.energy_speech_timestamps(audio_path)
 
         (get_speech_timestamps, save_audio, read_audio, VADIterator, collect_chunks) = self.utils
         
@@ -46,9 +71,130 @@ class AudioAnalyzer:
                     'end': ts['end'] / 16000
                 })
             return result
+        except Exception as e:
+            print(f"Error analyzing audio {audio_path}: {e}")
+            return self.energy_speech_timestamps(audio_path)
+
+    def energy_speech_timestamps(self, audio_path):
+        # NumPy-only detection: used when Silero is unavailable or fails on a file
+        try:
+            return self.energy_vad.get_speech_timestamps(audio_path)
         except Exception as e:
             print(f"Error analyzing audio {audio_path}: {e}")
             return []
+
+    def iter_speech_timestamps(self, audio_path, model=None):
+        """
+        Generator of {'start', 'end'} speech intervals (seconds), streaming the WAV
+        through Silero's VADIterator window by window.
+        With prefilter enabled, stretches the energy VAD classifies as silence are skipped.
+        """
+        if not self.model:
+            self.load_model()
+        if not self.model:
+            return
+
+        VADIterator = self.utils[3]
+        vad = VADIterator(model or self.model, sampling_rate=SAMPLING_RATE)
+        with wave.open(audio_path, 'rb') as wf:
+            total_samples = wf.getnframes()
+
+        if self.prefilter:
+            regions = (
+                self.energy_vad.detect(audio_path)
+                .pad(PREFILTER_PADDING)
+                .clip(0, total_samples / SAMPLING_RATE)
+            )
+            ranges = [(int(s * SAMPLING_RATE), int(e * SAMPLING_RATE)) for s, e in regions]
+        else:
+            ranges = [(0, total_samples)]
+
+        try:
+            for first, last in ranges:
+                # Each region is an independent stream: fresh state, sample counter from zero
+                vad.reset_states()
+                yield from self._vad_region(vad, audio_path, first, last)
+        finally:
+            vad.reset_states()
+
+    def _vad_region(self, vad, audio_path, first, last):
+        speech_start = None
+        position = 0
+        for window in self._iter_windows(audio_path, first, last):
+            event = vad(torch.from_numpy(window))
+            position += len(window)
+            if not event:
+                continue
+            if 'start' in event:
+                speech_start = event['start']
+            if 'end' in event and speech_start is not None:
+                end = min(first + event['end'], last)
+                yield {'start': (first + speech_start) / SAMPLING_RATE, 'end': end / SAMPLING_RATE}
+                speech_start = None
+
+        # Region ended mid-speech
+        if speech_start is not None:
+            yield {'start': (first + speech_start) / SAMPLING_RATE, 'end': min(first + position, last) / SAMPLING_RATE}
+
+    def analyze_tracks(self, audio_paths, concurrent=True):
+        """
+        Speech timestamps for several tracks; with concurrent=True each track is
+        analyzed in its own thread (torch releases the GIL during inference).
+        """
+        if not self.model:
+            self.load_model()
+        if not self.model:
+            return [self.energy_speech_timestamps(path) for path in audio_paths]
+        if not concurrent or len(audio_paths) < 2:
+            return [self.get_speech_timestamps(path) for path in audio_paths]
+
+        # The streaming VAD keeps its state inside the model, so every worker needs its own copy
+        try:
+            models = [self.model] + [copy.deepcopy(self.model) for _ in audio_paths[1:]]
+        except Exception:
+            # e.g. ONNX sessions can't be copied
+            return [self.get_speech_timestamps(path) for path in audio_paths]
+
+        def analyze(path, model):
+            try:
+                return list(self.iter_speech_timestamps(path, model))
+            except Exception as e:
+                print(f"Error analyzing audio {path}: {e}")
+                return self.energy_speech_timestamps(path)
+
+        with ThreadPoolExecutor(max_workers=len(audio_paths)) as pool:
+            return list(pool.map(analyze, audio_paths, models))
+
+    def _iter_windows(self, audio_path, first=0, last=None):
+        # Reads READ_BLOCK_SAMPLES at a time and yields float32 windows of
+        # WINDOW_SAMPLES (the last one zero-padded), so memory is bounded.
+        # first/last limit the read to a sample range.
+        with wave.open(audio_path, 'rb') as wf:
+            if wf.getframerate() != SAMPLING_RATE or wf.getsampwidth() != 2:
+                raise ValueError(f"{audio_path}: expected 16-bit {SAMPLING_RATE} Hz PCM WAV")
+            channels = wf.getnchannels()
+            remaining = (wf.getnframes() if last is None else last) - first
+            if first:
+                wf.setpos(first)
+            leftover = np.zeros(0, dtype=np.float32)
+
+            while remaining > 0:
+                frames = wf.readframes(min(READ_BLOCK_SAMPLES, remaining))
+                if not frames:
+                    break
+                remaining -= len(frames) // (2 * channels)
+                block = np.frombuffer(frames, dtype='<i2').astype(np.float32) / 32768.0
+                if channels > 1:
+                    block = block.reshape(-1, channels).mean(axis=1)
+                block = np.concatenate((leftover, block))
+
+                usable = len(block) - len(block) % WINDOW_SAMPLES
+                for offset in range(0, usable, WINDOW_SAMPLES):
+                    yield block[offset:offset + WINDOW_SAMPLES]
+                leftover = block[usable:]
+
+            if len(leftover):
+                yield np.pad(leftover, (0, WINDOW_SAMPLES - len(leftover)))
     
     def suggest_dominant_speaker(self, audio1_path, audio2_path, start, end):
         """
@@ -0,0 +1,127 @@
+import struct
+
+import numpy as np
+
+from .intervals import Intervals
+
+
+class EnergyVAD:
+    """
+    Frame energy / zero-crossing voice activity detection in pure NumPy.
+
+    PCM is memory-mapped and processed block by block, so multi-hour files cost
+    a few MB of RAM. Thresholds adapt to each file: the noise floor and speech
+    level are percentiles of the frame energies, so no fixed dB value has to
+    match the recording's gain.
+    """
+
+    FRAME_MS = 30
+    # Frames per processing block (~10 minutes at 30 ms)
+    BLOCK_FRAMES = 20000
+    NOISE_PERCENTILE = 10
+    SPEECH_PERCENTILE = 90
+    # Threshold sits this far between noise floor and speech level...
+    THRESHOLD_RATIO = 0.35
+    # ...but never closer than this to the noise floor
+    MIN_MARGIN_DB = 6.0
+    # Quiet but noisy-sounding frames (fricatives like "s", "f") still count as speech
+    UNVOICED_ZCR = 0.25
+    MIN_SPEECH = 0.15
+    MIN_SILENCE = 0.3
+
+    def __init__(self, threshold_db=None):
+        # Fixed threshold in dBFS; None adapts it per file
+        self.threshold_db = threshold_db
+
+    def get_speech_timestamps(self, audio_path):
+        """Speech intervals as {'start', 'end'} dicts in seconds (same format as Silero)."""
+        return self.detect(audio_path).to_timestamps()
+
+    def detect(self, audio_path):
+        samples, sample_rate = read_pcm_memmap(audio_path)
+        frame_len = max(1, sample_rate * self.FRAME_MS // 1000)
+        energy_db, zcr = self._frame_features(samples, frame_len)
+        if len(energy_db) == 0:
+            return Intervals()
+
+        noise = np.percentile(energy_db, self.NOISE_PERCENTILE)
+        if self.threshold_db is not None:
+            threshold = self.threshold_db
+        else:
+            level = np.percentile(energy_db, self.SPEECH_PERCENTILE)
+            threshold = noise + max(self.MIN_MARGIN_DB, (level - noise) * self.THRESHOLD_RATIO)
+
+        voiced = energy_db > threshold
+        unvoiced = (energy_db > (noise + threshold) / 2) & (zcr > self.UNVOICED_ZCR)
+        speech = voiced | unvoiced
+
+        frame_seconds = frame_len / sample_rate
+        return (
+            self._runs(speech, frame_seconds)
+            .merge_gaps(self.MIN_SILENCE)
+            .drop_shorter(self.MIN_SPEECH)
+        )
+
+    def _frame_features(self, samples, frame_len):
+        """Per-frame RMS energy (dBFS) and zero-crossing rate, computed block by block."""
+        n_frames = len(samples) // frame_len
+        energy_db = np.empty(n_frames, dtype=np.float32)
+        zcr = np.empty(n_frames, dtype=np.float32)
+
+        for first in range(0, n_frames, self.BLOCK_FRAMES):
+            last = min(n_frames, first + self.BLOCK_FRAMES)
+            block = np.asarray(samples[first * frame_len:last * frame_len], dtype=np.float32)
+            if block.ndim > 1:
+                block = block.mean(axis=1)
+            frames = block.reshape(-1, frame_len) / 32768.0
+
+            power = np.einsum('ij,ij->i', frames, frames) / frame_len
+            energy_db[first:last] = 10 * np.log10(power + 1e-10)
+            signs = np.signbit(frames)
+            zcr[first:last] = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (frame_len - 1 or 1)
+
+        return energy_db, zcr
+
+    def _runs(self, mask, frame_seconds):
+        """Convert a boolean frame mask into intervals of consecutive True frames."""
+        edges = np.diff(np.concatenate(([0], mask.view(np.int8), [0])))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1)
+        return Intervals(np.column_stack((starts, ends)) * frame_seconds, normalized=True)
+
+
+def read_pcm_memmap(path):
+    """
+    Memory-map the samples of a 16-bit PCM WAV.
+    Returns (int16 array of shape (n,) or (n, channels), sample_rate).
+    """
+    with open(path, 'rb') as f:
+        riff, _, wave_id = struct.unpack('<4sI4s', f.read(12))
+        if riff != b'RIFF' or wave_id != b'WAVE':
+            raise ValueError(f"{path}: not a WAV file")
+
+        channels = sample_rate = bits = None
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                raise ValueError(f"{path}: no data chunk")
+            chunk_id, size = struct.unpack('<4sI', header)
+            if chunk_id == b'fmt ':
+                fmt = f.read(size)
+                audio_format, channels, sample_rate = struct.unpack('<HHI', fmt[:8])
+                bits = struct.unpack('<H', fmt[14:16])[0]
+                if audio_format not in (1, 0xFFFE) or bits != 16:
+                    raise ValueError(f"{path}: expected 16-bit PCM")
+                f.seek(size % 2, 1)
+            elif chunk_id == b'data':
+                offset = f.tell()
+                break
+            else:
+                f.seek(size + size % 2, 1)
+
+    if channels is None:
+        raise ValueError(f"{path}: missing fmt chunk")
+
+    count = size // (2 * channels)
+    samples = np.memmap(path, dtype='<i2', mode='r', offset=offset, shape=(count * channels,))
+    return (samples.reshape(-1, channels) if channels > 1 else samples), sample_rate
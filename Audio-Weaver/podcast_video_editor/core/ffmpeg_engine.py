@@ -1,21 +1,48 @@
 import subprocess
 import os
+import re
+import shutil
+import tempfile
+from .media_info import media_info_cache
+
+# Below this much keyframe-aligned video a segment is simply re-encoded
+MIN_COPY_SECONDS = 1.0
+# Seek just past a keyframe so input seeking can't snap to the previous one
+SEEK_EPSILON = 0.001
+# (audio1, audio2) volumes for each segment priority
+PRIORITY_VOLUMES = {'audio1': (1.0, 0.0), 'audio2': (0.0, 1.0), 'mix': (1.0, 1.0)}
+# "ffmpeg version 7.0.2-static ..." or "n6.1"; git builds ("N-113...") have no release number
+RELEASE_VERSION = re.compile(r'version n?(\d+)\.')
 
 class FFmpegEngine:
+    # Major release of the installed ffmpeg (0 for git builds), read on first use
+    _version = None
+
+    def get_media_info(self, path):
+        return media_info_cache.get(path)
+
     def get_video_duration(self, video_path):
         try:
-            cmd = [
-                'ffprobe', '-v', 'error', '-show_entries', 'format=duration',
-                '-of', 'default=noprint_wrappers=1:nokey=1', video_path
-            ]
-            output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode().strip()
-            return float(output)
+            return self.get_media_info(video_path).duration
         except subprocess.CalledProcessError as e:
             print(f"Error getting duration: {e.output.decode()}")
             return 0.0
+        except (OSError, ValueError) as e:
+            # Missing/unreadable file (stat runs before ffprobe) or unparsable ffprobe output
+            print(f"Error getting duration: {e}")
+            return 0.0
 
     def extract_audio(self, input_path, output_path, sample_rate=16000):
         """Extracts audio to WAV for analysis (16kHz mono recommended for VAD)."""
+        try:
+            already_pcm = self.get_media_info(input_path).is_pcm_wav(sample_rate)
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            already_pcm = False
+        if already_pcm:
+            # Already in the analysis format; skip the decode/resample pass
+            shutil.copyfile(input_path, output_path)
+            return
+
         cmd = [
             'ffmpeg', '-y', '-i', input_path, 
             '-vn', '-acodec', 'pcm_s16le', '-ar', str(sample_rate), '-ac', '1', 
@@ -24,10 +51,15 @@ class FFmpegEngine:
         print(f"Extracting audio from {os.path.basename(input_path)}...")
         subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
     
-    def render_segment(self, video_path, audio1_path, audio2_path, start, end, priority, output_path):
+    def render_segment(self, video_path, audio1_path, audio2_path, start, end, priority, output_path, threads=None):
         """
         Renders a single segment.
         priority: 'audio1', 'audio2', 'mix'
+        threads: ffmpeg thread budget for this render (None lets ffmpeg use every core)
+
+        The video is smart-cut: only the partial GOPs at the segment edges are
+        re-encoded, the keyframe-aligned middle is stream-copied. The audio
+        sources are cut sample-accurately and mixed on their own.
         """
         duration = end - start
         
@@ -46,7 +78,18 @@ class FFmpegEngine:
         # If 'audio1' priority: Volume of audio1 1.0, audio2 0.2 (ducking)? Or just mute others?
         # Let's assume 'priority' means that source is the primary audio.
         
-        cmd = ['ffmpeg', '-y', '-ss', str(start), '-t', str(duration), '-i', video_path]
+        thread_args = ['-threads', str(threads)] if threads else []
+        work_dir = None
+        parts = self.plan_smart_cut(video_path, start, end)
+        if parts is None:
+            # Short segment or a codec we can't match: re-encode the whole segment
+            cmd = ['ffmpeg', '-y', '-ss', str(start), '-t', str(duration), '-i', video_path]
+            video_args = ['-map', '0:v', '-c:v', 'libx264']
+        else:
+            work_dir = tempfile.mkdtemp(prefix='.smartcut_', dir=os.path.dirname(output_path) or '.')
+            list_path = self._render_video_parts(video_path, parts, work_dir, thread_args)
+            cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_path]
+            video_args = ['-map', '0:v', '-c:v', 'copy']
         
         # Add audio inputs (we might need to offset them if they don't start at 0, 
         # but here we assume all files are synced starting at 0)
@@ -55,17 +98,165 @@ class FFmpegEngine:
         
         # Complex filter for audio mixing
         # [1:a] and [2:a] are the audio inputs
-        filter_complex = ""
-        if priority == 'audio1':
-            filter_complex = "[1:a]volume=1.0[a1];[2:a]volume=0.0[a2];[a1][a2]amix=inputs=2:duration=first[outa]"
-        elif priority == 'audio2':
-            filter_complex = "[1:a]volume=0.0[a1];[2:a]volume=1.0[a2];[a1][a2]amix=inputs=2:duration=first[outa]"
-        else: # mix
-            filter_complex = "[1:a]volume=1.0[a1];[2:a]volume=1.0[a2];[a1][a2]amix=inputs=2:duration=first[outa]"
+        vol1, vol2 = PRIORITY_VOLUMES.get(priority, PRIORITY_VOLUMES['mix'])
+        filter_complex = f"[1:a]volume={vol1}[a1];[2:a]volume={vol2}[a2];[a1][a2]amix=inputs=2:duration=first[outa]"
             
-        cmd.extend(['-filter_complex', filter_complex, '-map', '0:v', '-map', '[outa]', '-c:v', 'libx264', '-c:a', 'aac', output_path])
+        cmd.extend(['-filter_complex', filter_complex, *video_args, '-map', '[outa]', '-c:a', 'aac', *thread_args, output_path])
         
-        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        finally:
+            if work_dir:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+    def plan_smart_cut(self, video_path, start, end):
+        """
+        Splits [start, end) into ('encode' | 'copy', start, end) parts, or returns
+        None when the whole segment should simply be re-encoded.
+        """
+        try:
+            info = media_info_cache.get_keyframes(video_path)
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            return None
+        if info.video is None or info.video.get('codec_name') != 'h264':
+            return None
+
+        eps = SEEK_EPSILON
+        inside = [k for k in info.keyframes if start - eps <= k < end]
+        if not inside:
+            return None
+
+        copy_start = inside[0]
+        # A segment running to the end of the file ends on a complete GOP
+        copy_end = end if end >= info.duration - eps else inside[-1]
+        if copy_end - copy_start < MIN_COPY_SECONDS:
+            return None
+
+        parts = []
+        if copy_start - start > eps:
+            parts.append(('encode', start, copy_start))
+        parts.append(('copy', max(start, copy_start), copy_end))
+        if end - copy_end > eps:
+            parts.append(('encode', copy_end, end))
+        return parts
+
+    def _render_video_parts(self, video_path, parts, work_dir, thread_args=()):
+        # MPEG-TS parts carry their own SPS/PPS, so re-encoded edges and the
+        # copied middle can be joined with the concat demuxer
+        info = media_info_cache.get_keyframes(video_path)
+        list_path = os.path.join(work_dir, "parts.txt")
+
+        with open(list_path, "w") as f:
+            for i, (kind, part_start, part_end) in enumerate(parts):
+                part_name = f"part_{i:03d}.ts"
+                if kind == 'copy':
+                    # Stream copy stops on decode timestamps and would let the next
+                    # GOP's reordered frames in, so limit it by frame count instead
+                    frames = info.frames_between(part_start - SEEK_EPSILON, part_end - SEEK_EPSILON)
+                    limit = ['-frames:v', str(frames)] if frames else ['-t', str(part_end - part_start)]
+                    cmd = ['ffmpeg', '-y', '-ss', str(part_start + SEEK_EPSILON), '-i', video_path, *limit, '-c:v', 'copy']
+                else:
+                    cmd = [
+                        'ffmpeg', '-y', '-ss', str(part_start), '-i', video_path, '-t', str(part_end - part_start),
+                        '-c:v', 'libx264', '-preset', 'fast', '-crf', '18',
+                        '-pix_fmt', info.video.get('pix_fmt', 'yuv420p')
+                    ]
+                cmd.extend(['-map', '0:v:0', '-an', '-sn', '-dn', *thread_args, '-f', 'mpegts', os.path.join(work_dir, part_name)])
+                subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                f.write(f"file '{part_name}'\n")
+
+        return list_path
+
+    def build_timeline_filter(self, segments, offset=0.0):
+        """
+        One filter_complex for a whole timeline: each segment is trimmed from the
+        shared inputs, gets its priority's volume routing, and all segments are
+        concatenated into [outv]/[outa]. Times are relative to `offset`.
+        """
+        n = len(segments)
+        chains = [
+            "[0:v]split=%d%s" % (n, ''.join(f"[sv{i}]" for i in range(n))),
+            "[1:a]asplit=%d%s" % (n, ''.join(f"[sa{i}]" for i in range(n))),
+            "[2:a]asplit=%d%s" % (n, ''.join(f"[sb{i}]" for i in range(n))),
+        ]
+        outputs = ""
+        for i, seg in enumerate(segments):
+            start = seg['start'] - offset
+            end = seg['end'] - offset
+            vol1, vol2 = PRIORITY_VOLUMES.get(seg['priority'], PRIORITY_VOLUMES['mix'])
+            chains.append(f"[sv{i}]trim=start={start}:end={end},setpts=PTS-STARTPTS[v{i}]")
+            chains.append(f"[sa{i}]atrim=start={start}:end={end},asetpts=PTS-STARTPTS,volume={vol1}[a1_{i}]")
+            chains.append(f"[sb{i}]atrim=start={start}:end={end},asetpts=PTS-STARTPTS,volume={vol2}[a2_{i}]")
+            chains.append(f"[a1_{i}][a2_{i}]amix=inputs=2:duration=first[a{i}]")
+            outputs += f"[v{i}][a{i}]"
+        chains.append(f"{outputs}concat=n={n}:v=1:a=1[outv][outa]")
+        return ";\n".join(chains)
+
+    def render_timeline(self, video_path, audio1_path, audio2_path, segments, output_path, threads=None):
+        """
+        Renders every segment in a single ffmpeg pass: three inputs opened once,
+        one encode, no intermediate files or concat pass. Segments must be sorted
+        and must not overlap (split would otherwise buffer raw frames).
+        """
+        if not segments:
+            raise ValueError("render_timeline needs at least one segment")
+        # setpts leaves the frame rate unset, which would make the encoder fall back to 25 fps
+        frame_rate = self._frame_rate(video_path)
+        if not frame_rate:
+            raise RuntimeError(f"Could not read the frame rate of {video_path}; refusing to render at 25 fps")
+
+        # Fast-seek all inputs to the first segment so nothing before it is decoded
+        offset = segments[0]['start']
+        end = max(seg['end'] for seg in segments)
+
+        # Long timelines exceed command line limits, so the graph goes in a script file
+        script_path = output_path + ".filter.txt"
+        with open(script_path, "w") as f:
+            f.write(self.build_timeline_filter(segments, offset))
+
+        cmd = ['ffmpeg', '-y']
+        for path in (video_path, audio1_path, audio2_path):
+            cmd.extend(['-ss', str(offset), '-t', str(end - offset), '-i', path])
+        cmd.extend([
+            self.filter_complex_file_option(), script_path,
+            '-map', '[outv]', '-map', '[outa]',
+            '-c:v', 'libx264', '-c:a', 'aac',
+            '-r', frame_rate
+        ])
+        if threads:
+            cmd.extend(['-threads', str(threads)])
+        cmd.append(output_path)
+
+        try:
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        finally:
+            if os.path.exists(script_path):
+                os.remove(script_path)
+
+    def filter_complex_file_option(self):
+        """
+        Option that reads the filter graph from a file: the generic
+        "-/filter_complex" on FFmpeg 7+ (and git builds), where
+        "-filter_complex_script" is deprecated, and the latter before.
+        """
+        if FFmpegEngine._version is None:
+            try:
+                output = subprocess.run(['ffmpeg', '-version'], capture_output=True, check=True).stdout.decode()
+            except (subprocess.CalledProcessError, OSError):
+                output = ''
+            match = RELEASE_VERSION.search(output)
+            FFmpegEngine._version = int(match.group(1)) if match else 0
+        if 0 < FFmpegEngine._version < 7:
+            return '-filter_complex_script'
+        return '-/filter_complex'
+
+    def _frame_rate(self, video_path):
+        try:
+            video = self.get_media_info(video_path).video
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            return None
+        rate = (video or {}).get('avg_frame_rate', '0/0')
+        return None if rate.startswith('0') else rate
 
     def merge_videos(self, list_file_path, output_path):
         cmd = ['ffmpeg', '-y', '-f', 'concat', '-safe', '0', '-i', list_file_path, '-c', 'copy', output_path]
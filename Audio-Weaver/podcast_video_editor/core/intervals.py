@@ -0,0 +1,116 @@
+import numpy as np
+
+
+class Intervals:
+    """
+    Sorted, non-overlapping set of (start, end) time intervals in seconds.
+
+    Backed by an (n, 2) float64 array; every operation is vectorized and costs
+    at most one sort, so tens of thousands of speech turns stay cheap.
+    """
+
+    def __init__(self, data=None, normalized=False):
+        arr = np.asarray(data if data is not None else [], dtype=np.float64).reshape(-1, 2)
+        self.data = arr if normalized else self._normalize(arr)
+
+    @classmethod
+    def from_timestamps(cls, timestamps):
+        """From a list of {'start', 'end'} dicts (VAD output format)."""
+        return cls([(ts['start'], ts['end']) for ts in timestamps])
+
+    def to_timestamps(self):
+        return [{'start': float(s), 'end': float(e)} for s, e in self.data]
+
+    @property
+    def starts(self):
+        return self.data[:, 0]
+
+    @property
+    def ends(self):
+        return self.data[:, 1]
+
+    @property
+    def total(self):
+        return float((self.ends - self.starts).sum())
+
+    def __len__(self):
+        return len(self.data)
+
+    def __iter__(self):
+        return iter(map(tuple, self.data.tolist()))
+
+    def __repr__(self):
+        return f"Intervals({self.data.tolist()})"
+
+    def union(self, *others):
+        return Intervals(np.concatenate([self.data] + [o.data for o in others]))
+
+    def intersection(self, *others):
+        """Time covered by every set."""
+        return Intervals._coverage([self] + list(others), 1 + len(others))
+
+    def complement(self, start, end):
+        """Gaps within [start, end) not covered by any interval."""
+        clipped = self.clip(start, end).data
+        bounds = np.concatenate(([start], clipped.ravel(), [end])).reshape(-1, 2)
+        keep = bounds[:, 1] > bounds[:, 0]
+        return Intervals(bounds[keep], normalized=True)
+
+    def pad(self, before, after=None):
+        """Grow every interval (before/after may be negative to shrink)."""
+        after = before if after is None else after
+        padded = self.data + np.array([-before, after])
+        return Intervals(padded[padded[:, 1] > padded[:, 0]])
+
+    def clip(self, start, end):
+        clipped = np.clip(self.data, start, end)
+        return Intervals(clipped[clipped[:, 1] > clipped[:, 0]], normalized=True)
+
+    def merge_gaps(self, min_gap):
+        """Join neighbours separated by less than min_gap seconds."""
+        if len(self.data) < 2:
+            return Intervals(self.data, normalized=True)
+        gaps = self.starts[1:] - self.ends[:-1]
+        joined = Intervals._join_groups(self.data, np.concatenate(([True], gaps >= min_gap)))
+        return Intervals(joined, normalized=True)
+
+    def drop_shorter(self, min_length):
+        return Intervals(self.data[(self.ends - self.starts) >= min_length], normalized=True)
+
+    @staticmethod
+    def _normalize(arr):
+        """Sort and merge overlapping or touching intervals."""
+        arr = arr[arr[:, 1] > arr[:, 0]]
+        if len(arr) < 2:
+            return arr
+        arr = arr[np.argsort(arr[:, 0], kind='stable')]
+        # An interval starts a new group when it begins after every earlier end
+        reach = np.maximum.accumulate(arr[:, 1])
+        new_group = np.concatenate(([True], arr[1:, 0] > reach[:-1]))
+        return Intervals._join_groups(arr, new_group, reach)
+
+    @staticmethod
+    def _join_groups(arr, new_group, reach=None):
+        """Collapse each run of rows starting at a new_group flag into one interval."""
+        reach = np.maximum.accumulate(arr[:, 1]) if reach is None else reach
+        first = np.flatnonzero(new_group)
+        last = np.concatenate((first[1:] - 1, [len(arr) - 1]))
+        return np.column_stack((arr[first, 0], reach[last]))
+
+    @staticmethod
+    def _coverage(sets, min_count):
+        """Intervals covered by at least min_count of the (normalized) sets."""
+        starts = np.concatenate([s.starts for s in sets])
+        ends = np.concatenate([s.ends for s in sets])
+        times = np.concatenate((starts, ends))
+        deltas = np.concatenate((np.ones(len(starts)), -np.ones(len(ends))))
+        # At equal times close before opening so touching intervals don't overlap
+        order = np.lexsort((deltas, times))
+        times = times[order]
+        depth = np.cumsum(deltas[order])
+
+        inside = depth >= min_count
+        enter = np.flatnonzero(inside & ~np.concatenate(([False], inside[:-1])))
+        leave = np.flatnonzero(~inside & np.concatenate(([False], inside[:-1])))
+        result = np.column_stack((times[enter], times[leave]))
+        return Intervals(result[result[:, 1] > result[:, 0]], normalized=True)
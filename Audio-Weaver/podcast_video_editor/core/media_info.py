@@ -0,0 +1,164 @@
+import bisect
+import hashlib
+import json
+import os
+import subprocess
+import threading
+
+
+class MediaInfo:
+    def __init__(self, path, format, streams, keyframes=None, gop_sizes=None):
+        self.path = path
+        self.format = format
+        self.streams = streams
+        # Keyframe times and frames per GOP, filled in on demand
+        self.keyframes = keyframes
+        self.gop_sizes = gop_sizes
+
+    @property
+    def duration(self):
+        value = self.format.get('duration')
+        return float(value) if value not in (None, 'N/A') else 0.0
+
+    @property
+    def video(self):
+        for stream in self.streams:
+            if stream.get('codec_type') == 'video' and not stream.get('disposition', {}).get('attached_pic'):
+                return stream
+        return None
+
+    @property
+    def audio(self):
+        for stream in self.streams:
+            if stream.get('codec_type') == 'audio':
+                return stream
+        return None
+
+    @property
+    def sample_rate(self):
+        if self.audio and self.audio.get('sample_rate'):
+            return int(self.audio['sample_rate'])
+        return None
+
+    @property
+    def channels(self):
+        return self.audio.get('channels') if self.audio else None
+
+    @property
+    def audio_codec(self):
+        return self.audio.get('codec_name') if self.audio else None
+
+    def is_pcm_wav(self, sample_rate, channels=1):
+        """True if the file is already PCM s16le WAV at the given rate/channels (no conversion needed)."""
+        return (
+            self.video is None
+            and 'wav' in self.format.get('format_name', '')
+            and self.audio_codec == 'pcm_s16le'
+            and self.sample_rate == sample_rate
+            and self.channels == channels
+        )
+
+    def frames_between(self, start, end):
+        if self.keyframes is None or self.gop_sizes is None:
+            return None
+        return sum(size for kf, size in zip(self.keyframes, self.gop_sizes) if start <= kf < end)
+
+    def to_dict(self):
+        return {
+            'path': self.path, 'format': self.format, 'streams': self.streams,
+            'keyframes': self.keyframes, 'gop_sizes': self.gop_sizes,
+        }
+
+
+class MediaInfoCache:
+    """
+    Runs ffprobe once per file (-show_streams -show_format) and caches the result
+    in memory and as JSON under cache_dir, keyed by path, size and mtime.
+    """
+
+    def __init__(self, cache_dir=".media_cache"):
+        self.cache_dir = cache_dir
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        key = self._key(path)
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key]
+
+        disk_path = self._disk_path(key)
+        info = self._load(disk_path)
+        if info is None:
+            info = self.probe(path)
+            self._save(disk_path, info)
+
+        with self._lock:
+            self._entries[key] = info
+        return info
+
+    def get_keyframes(self, path):
+        """Returns the MediaInfo with its keyframe index (read from packet flags once)."""
+        info = self.get(path)
+        if info.keyframes is None or info.gop_sizes is None:
+            info.keyframes, info.gop_sizes = self.probe_keyframes(path)
+            self._save(self._disk_path(self._key(path)), info)
+        return info
+
+    def probe_keyframes(self, path):
+        cmd = [
+            'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', path
+        ]
+        output = subprocess.check_output(cmd, stderr=subprocess.DEVNULL).decode()
+
+        frames = []
+        keyframes = set()
+        for line in output.splitlines():
+            pts_time, _, flags = line.partition(',')
+            try:
+                pts = float(pts_time)
+            except ValueError:
+                continue
+            frames.append(pts)
+            if 'K' in flags:
+                keyframes.add(pts)
+
+        frames.sort()
+        keyframes = sorted(keyframes)
+        bounds = [bisect.bisect_left(frames, k) for k in keyframes] + [len(frames)]
+        return keyframes, [b - a for a, b in zip(bounds, bounds[1:])]
+
+    def probe(self, path):
+        cmd = ['ffprobe', '-v', 'error', '-show_format', '-show_streams', '-of', 'json', path]
+        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode()
+        data = json.loads(output)
+        return MediaInfo(path, data.get('format', {}), data.get('streams', []))
+
+    def _key(self, path):
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".json")
+
+    def _load(self, disk_path):
+        try:
+            with open(disk_path) as f:
+                data = json.load(f)
+            return MediaInfo(data['path'], data['format'], data['streams'], data.get('keyframes'), data.get('gop_sizes'))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, disk_path, info):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(disk_path + ".tmp", "w") as f:
+                json.dump(info.to_dict(), f)
+            os.replace(disk_path + ".tmp", disk_path)
+        except OSError:
+            pass
+
+
+media_info_cache = MediaInfoCache()
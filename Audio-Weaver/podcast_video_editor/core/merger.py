@@ -1,44 +1,68 @@
 import os
 import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 from .ffmpeg_engine import FFmpegEngine
+from .media_info import media_info_cache
+
+# Attempts per segment before the merge is aborted
+MAX_ATTEMPTS = 3
 
 class Merger:
-    def __init__(self):
+    def __init__(self, workers=None):
         self.engine = FFmpegEngine()
         self.output_dir = "output"
+        # Parallel segment renders (default: one per core, capped by segment count)
+        self.workers = workers or os.cpu_count() or 1
         os.makedirs(self.output_dir, exist_ok=True)
 
-    def merge_segments(self, segments, video_path, audio1_path, audio2_path, final_output_name="final_podcast.mp4"):
+    def merge_segments(self, segments, video_path, audio1_path, audio2_path, final_output_name="final_podcast.mp4", parallel=True):
+        if not segments:
+            print("\nNo segments to render; nothing exported.")
+            return
         temp_files = []
         list_file_path = os.path.join(self.output_dir, "segments.txt")
-        
-        print(f"\nRendering {len(segments)} segments...")
-        
+
+        workers = min(self.workers, len(segments)) if parallel else 1
+        # Split the cores between concurrent renders so ffmpeg doesn't oversubscribe the CPU
+        threads = max(1, (os.cpu_count() or 1) // max(1, workers))
+        print(f"\nRendering {len(segments)} segments ({workers} parallel, {threads} threads each)...")
+
         try:
+            # Probe once up front instead of in every worker
+            try:
+                media_info_cache.get_keyframes(video_path)
+            except (subprocess.CalledProcessError, OSError, ValueError):
+                pass
+
+            seg_filenames = [f"segment_{i:03d}.mp4" for i in range(len(segments))]
+            temp_files.extend(seg_filenames)
+
+            with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+                futures = [
+                    pool.submit(self._render_with_retries, seg, os.path.join(self.output_dir, name),
+                                video_path, audio1_path, audio2_path, threads)
+                    for seg, name in zip(segments, seg_filenames)
+                ]
+                try:
+                    for future in tqdm(as_completed(futures), total=len(futures)):
+                        future.result()
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            # Concat list in timeline order, regardless of completion order
             with open(list_file_path, "w") as f:
-                for i, seg in enumerate(tqdm(segments)):
-                    seg_filename = f"segment_{i:03d}.mp4"
-                    seg_path = os.path.join(self.output_dir, seg_filename)
-                    
-                    self.engine.render_segment(
-                        video_path, 
-                        audio1_path, 
-                        audio2_path, 
-                        seg['start'], 
-                        seg['end'], 
-                        seg['priority'], 
-                        seg_path
-                    )
-                    
-                    temp_files.append(seg_filename)
+                for seg_filename in seg_filenames:
                     f.write(f"file '{seg_filename}'\n")
 
             final_path = os.path.join(self.output_dir, final_output_name)
             print("Merging segments into final video...")
             self.engine.merge_videos(list_file_path, final_path)
             print(f"\nSuccess! Output saved to: {final_path}")
-            
+
         finally:
             # Cleanup temp segment files
             print("Cleaning up temporary files...")
@@ -49,3 +73,37 @@ class Merger:
                     pass
             if os.path.exists(list_file_path):
                 os.remove(list_file_path)
+
+    def render_single_pass(self, segments, video_path, audio1_path, audio2_path, final_output_name="final_podcast.mp4"):
+        if not segments:
+            print("\nNo segments to render; nothing exported.")
+            return
+        # One filter graph over the whole timeline: no segment files and no concat pass
+        overlapping = any(a['end'] > b['start'] for a, b in zip(segments, segments[1:]))
+        if overlapping:
+            print("\nSegments overlap; falling back to per-segment rendering.")
+            return self.merge_segments(segments, video_path, audio1_path, audio2_path, final_output_name)
+
+        final_path = os.path.join(self.output_dir, final_output_name)
+        print(f"\nRendering {len(segments)} segments in a single pass...")
+        self.engine.render_timeline(video_path, audio1_path, audio2_path, segments, final_path)
+        print(f"\nSuccess! Output saved to: {final_path}")
+
+    def _render_with_retries(self, seg, seg_path, video_path, audio1_path, audio2_path, threads):
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            try:
+                self.engine.render_segment(
+                    video_path,
+                    audio1_path,
+                    audio2_path,
+                    seg['start'],
+                    seg['end'],
+                    seg['priority'],
+                    seg_path,
+                    threads=threads
+                )
+                return seg_path
+            except subprocess.CalledProcessError:
+                if attempt == MAX_ATTEMPTS:
+                    raise
+                print(f"\nSegment {seg['start']}-{seg['end']} failed (attempt {attempt}/{MAX_ATTEMPTS}), retrying...")
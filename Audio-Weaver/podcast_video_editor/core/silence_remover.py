@@ -1,22 +1,36 @@
+from .intervals import Intervals
+
 class SilenceRemover:
+    # Seconds kept around speech so words aren't clipped
+    PADDING = 0.2
+    # Pauses shorter than this stay in (natural breathing room)
+    MIN_GAP = 0.5
+    # Keep-segments shorter than this are dropped (clicks, coughs)
+    MIN_SEGMENT = 0.3
+
     def __init__(self, analyzer):
         self.analyzer = analyzer
 
     def detect_silence(self, audio_paths, start, end, threshold_db=-40):
-        # Basic placeholder for silence removal logic.
-        # Uses VAD timestamps to find non-speech areas.
-        pass
-    
+        """
+        Returns the non-speech areas within [start, end) as {'start', 'end'} dicts:
+        time where none of the given audio tracks has VAD speech.
+        """
+        speech = Intervals()
+        for path in audio_paths:
+            speech = speech.union(Intervals.from_timestamps(self.analyzer.get_speech_timestamps(path)))
+        return speech.complement(start, end).to_timestamps()
+
     def suggest_cuts(self, audio1_ts, audio2_ts, total_duration):
         """
         Returns a list of 'keep' segments where at least one person is speaking.
         """
-        # Merge timestamps
-        # Simplified: We assume anything not in audio1_ts OR audio2_ts is silence.
-        # This requires robust boolean interval merging.
-        
-        # 1. Create a mask or timeline of speech
-        # For simplicity in this CLI:
         print("Analyzing silence overlap...")
-        # (Implementation omitted for brevity in this MVP, returning full duration)
-        return [{'start': 0, 'end': total_duration}]
+        speech = Intervals.from_timestamps(audio1_ts).union(Intervals.from_timestamps(audio2_ts))
+        keep = (
+            speech.pad(self.PADDING)
+            .merge_gaps(self.MIN_GAP)
+            .clip(0, total_duration)
+            .drop_shorter(self.MIN_SEGMENT)
+        )
+        return keep.to_timestamps()
@@ -1,3 +1,5 @@
+from .intervals import Intervals
+
 class TimelineManager:
     def __init__(self):
         self.segments = [] # List of {'start': float, 'end': float, 'priority': str}
@@ -15,6 +17,19 @@ class TimelineManager:
         self.segments.sort(key=lambda x: x['start'])
         return True
 
+    def restrict_to(self, keep_segments):
+        # Trim every segment to the keep-segments (e.g. from silence removal), keeping its priority.
+        # Returns False and leaves the timeline unchanged when nothing would be left.
+        keep = Intervals.from_timestamps(keep_segments)
+        segments = []
+        for seg in self.segments:
+            for start, end in keep.clip(seg['start'], seg['end']):
+                segments.append({'start': start, 'end': end, 'priority': seg['priority']})
+        if not segments:
+            return False
+        self.segments = sorted(segments, key=lambda x: x['start'])
+        return True
+
     def get_segments(self):
         return self.segments
 
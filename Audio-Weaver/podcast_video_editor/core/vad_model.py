@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+import warnings
+
+import torch
+
+# Explicit model file (.jit/.pt TorchScript or .onnx); takes precedence over everything else
+MODEL_ENV = "SILERO_VAD_MODEL"
+# Set to 0 on air-gapped machines to never touch the network
+ALLOW_DOWNLOAD_ENV = "SILERO_VAD_ALLOW_DOWNLOAD"
+# Vendored model shipped next to the tool
+BUNDLED_MODEL_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+BUNDLED_MODEL_NAMES = ("silero_vad.jit", "silero_vad.onnx")
+
+
+class VADModelRegistry:
+    """
+    Process-wide Silero VAD model, loaded once without network access when possible.
+
+    Sources are tried in order: $SILERO_VAD_MODEL, a model vendored in models/,
+    the silero-vad pip package (ships its weights), an existing torch.hub
+    checkout, and only then a torch.hub download.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._model = None
+        self._utils = None
+        self._error = None
+        self._preload_thread = None
+        self.metrics = {'source': None, 'load_seconds': None, 'loads': 0, 'hits': 0}
+
+    def get(self):
+        """Returns (model, utils) or (None, None) if no source worked."""
+        with self._lock:
+            if self._model is not None:
+                self.metrics['hits'] += 1
+                return self._model, self._utils
+            if self._error is not None:
+                return None, None
+
+            started = time.perf_counter()
+            warnings.filterwarnings("ignore")
+            for source, loader in self._sources():
+                try:
+                    self._model, self._utils = loader()
+                except Exception as e:
+                    self._error = e
+                    continue
+                self._error = None
+                self.metrics['source'] = source
+                self.metrics['load_seconds'] = round(time.perf_counter() - started, 3)
+                self.metrics['loads'] += 1
+                return self._model, self._utils
+            return None, None
+
+    def preload(self, background=True):
+        """Warm the model up front (in a daemon thread by default) so first use doesn't wait."""
+        if not background:
+            self.get()
+            return
+        if self._preload_thread is None:
+            self._preload_thread = threading.Thread(target=self.get, daemon=True)
+            self._preload_thread.start()
+
+    @property
+    def error(self):
+        return self._error
+
+    def _sources(self):
+        explicit = os.environ.get(MODEL_ENV)
+        if explicit:
+            yield f"file:{explicit}", lambda: self._load_file(explicit)
+
+        for name in BUNDLED_MODEL_NAMES:
+            path = os.path.join(BUNDLED_MODEL_DIR, name)
+            if os.path.exists(path):
+                yield f"bundled:{path}", lambda path=path: self._load_file(path)
+
+        yield "package:silero_vad", self._load_package
+
+        hub_repo = os.path.join(torch.hub.get_dir(), "snakers4_silero-vad_master")
+        if os.path.isdir(hub_repo):
+            yield f"hub-cache:{hub_repo}", lambda: torch.hub.load(
+                repo_or_dir=hub_repo, model='silero_vad', source='local', trust_repo=True
+            )
+
+        if os.environ.get(ALLOW_DOWNLOAD_ENV, "1") != "0":
+            yield "hub-download", lambda: torch.hub.load(
+                repo_or_dir='snakers4/silero-vad', model='silero_vad', force_reload=False, trust_repo=True
+            )
+
+    def _load_file(self, path):
+        utils = self._package_utils()
+        if path.endswith(".onnx"):
+            from silero_vad.utils_vad import OnnxWrapper
+            return OnnxWrapper(path), utils
+        model = torch.jit.load(path, map_location="cpu")
+        model.eval()
+        return model, utils
+
+    def _load_package(self):
+        from silero_vad import load_silero_vad
+        return load_silero_vad(), self._package_utils()
+
+    def _package_utils(self):
+        # Same tuple torch.hub returns: (get_speech_timestamps, save_audio, read_audio, VADIterator, collect_chunks)
+        from silero_vad.utils_vad import get_speech_timestamps, save_audio, read_audio, VADIterator, collect_chunks
+        return (get_speech_timestamps, save_audio, read_audio, VADIterator, collect_chunks)
+
+
+vad_registry = VADModelRegistry()
@@ -5,6 +5,8 @@ from core.ffmpeg_engine import FFmpegEngine
 from core.audio_analyzer import AudioAnalyzer
 from core.timeline_manager import TimelineManager
 from core.merger import Merger
+from core.silence_remover import SilenceRemover
+from core.vad_model import vad_registry
 from utils.time_parser import seconds_to_hms
 
 def main():
@@ -14,6 +16,8 @@ def main():
     
     input_handler = InputHandler()
     ffmpeg = FFmpegEngine()
+    # Load the VAD model while the user is typing paths
+    vad_registry.preload()
     
     # 1. Get Inputs
     print("\n--- Input Files ---")
@@ -32,7 +36,7 @@ def main():
     ffmpeg.extract_audio(audio1_path, temp_audio1)
     ffmpeg.extract_audio(audio2_path, temp_audio2)
     
-    analyzer = AudioAnalyzer()
+    analyzer = AudioAnalyzer(prefilter=True)
     # In a full run, we would analyze here. For now we load model to ensure it works.
     analyzer.load_model()
     
@@ -59,15 +63,26 @@ def main():
     # 4. Silence Removal Option
     remove_silence = input_handler.get_yes_no("\nRun silence removal (experimental)?")
     if remove_silence:
-        print("Silence removal is enabled (simulation mode for this version).")
-        # In full version, we'd modify timeline segments here
+        print("Detecting speech in both tracks...")
+        audio1_ts, audio2_ts = analyzer.analyze_tracks([temp_audio1, temp_audio2], concurrent=True)
+        if audio1_ts or audio2_ts:
+            keep = SilenceRemover(analyzer).suggest_cuts(audio1_ts, audio2_ts, duration)
+            if timeline.restrict_to(keep):
+                print(f"Silence removed: {len(timeline.get_segments())} segments remain.")
+            else:
+                print("No speech inside the timeline segments; keeping the timeline as is.")
+        else:
+            print("No speech detected (or VAD unavailable); keeping the timeline as is.")
     
     # 5. Export
     merge_files = input_handler.get_yes_no("\nMerge all segments into one final video?")
     
     if merge_files:
         merger = Merger()
-        merger.merge_segments(timeline.get_segments(), video_path, audio1_path, audio2_path)
+        if input_handler.get_yes_no("Render in a single pass (no intermediate segment files)?"):
+            merger.render_single_pass(timeline.get_segments(), video_path, audio1_path, audio2_path)
+        else:
+            merger.merge_segments(timeline.get_segments(), video_path, audio1_path, audio2_path)
     else:
         print("Skipping merge. Segments defined but not rendered.")
     
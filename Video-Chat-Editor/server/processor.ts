@@ -0,0 +1,94 @@
+import { spawn, type ChildProcessWithoutNullStreams } from "child_process";
+import readline from "readline";
+
+export interface ProcessorUpdate {
+  status?: string;
+  progress?: string;
+  processedFilename?: string;
+}
+
+type UpdateHandler = (update: ProcessorUpdate) => void | Promise<void>;
+
+// One long-running `processor.py --worker` serves every job, so Python startup,
+// imports and Whisper models are paid once instead of per request.
+let worker: ChildProcessWithoutNullStreams | null = null;
+const handlers = new Map<string, (update: ProcessorUpdate) => void>();
+let nextJobId = 1;
+
+function startWorker(): ChildProcessWithoutNullStreams {
+  const args = ["server/py/processor.py", "--worker"];
+  if (process.env.PROCESSOR_MAX_JOBS) {
+    args.push("--jobs", process.env.PROCESSOR_MAX_JOBS);
+  }
+  const child = spawn("python3", args);
+
+  readline.createInterface({ input: child.stdout }).on("line", (line) => {
+    if (!line.trim()) return;
+    let message: any;
+    try {
+      message = JSON.parse(line);
+    } catch (e) {
+      console.log("Python stdout (not JSON):", line);
+      return;
+    }
+
+    const { jobId, ...update } = message;
+    const handler = jobId !== undefined ? handlers.get(String(jobId)) : undefined;
+    if (!handler) {
+      console.log("Python worker:", message);
+      return;
+    }
+    console.log("Python update:", message);
+    if (update.status === "completed" || update.status === "error") {
+      handlers.delete(String(jobId));
+    }
+    if (update.status || update.progress || update.processedFilename) {
+      handler(update);
+    }
+  });
+
+  child.stderr.on("data", (data) => {
+    console.error("Python stderr:", data.toString());
+  });
+
+  child.on("error", (err) => {
+    console.error("Python worker failed:", err);
+    failPending(child);
+  });
+  child.stdin.on("error", (err) => {
+    console.error("Python worker stdin:", err);
+  });
+
+  child.on("close", (code) => {
+    console.log(`Python worker exited with code ${code}`);
+    failPending(child);
+  });
+
+  return child;
+}
+
+function failPending(child: ChildProcessWithoutNullStreams) {
+  if (worker !== child) return;
+  // The next job starts a new worker; jobs sent to this one can no longer report back
+  worker = null;
+  const pending = Array.from(handlers.values());
+  handlers.clear();
+  for (const handler of pending) {
+    handler({ status: "error", progress: "Processing failed" });
+  }
+}
+
+export function submitJob(videoId: number, filename: string, command: string, onUpdate: UpdateHandler): string {
+  if (!worker) worker = startWorker();
+
+  const jobId = String(nextJobId++);
+  // Apply a job's updates one at a time, in the order they were written
+  let applied: Promise<void> = Promise.resolve();
+  handlers.set(jobId, (update) => {
+    applied = applied
+      .then(() => onUpdate(update))
+      .catch((err) => console.error("Failed to apply update:", err));
+  });
+  worker.stdin.write(JSON.stringify({ jobId, videoId, filename, command }) + "\n");
+  return jobId;
+}
@@ -1,8 +1,11 @@
 import sys
 import json
 import os
-import time
+import re
 import subprocess
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 
 # Configure FFmpeg path - using local installation
 FFMPEG_PATH = os.path.join(os.path.dirname(__file__), "..", "..", "ffmpeg-8.0.1", "bin", "ffmpeg.exe")
@@ -18,28 +21,165 @@ try:
 except ImportError:
     whisper = None
 
-# Simple ffmpeg wrapper using subprocess
+# Preferred when installed: faster on CPU and yields segments while decoding
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+# Loaded models stay resident for the life of the process, keyed by (size, language)
+_whisper_models = {}
+_whisper_lock = threading.Lock()
+
+# Jobs run concurrently in worker mode (--worker); override with --jobs N
+MAX_JOBS = int(os.environ.get("PROCESSOR_MAX_JOBS", "2"))
+
+# Job whose progress is being logged; progress lines are tagged with it in worker mode
+_current_job = contextvars.ContextVar("job_id", default=None)
+_log_lock = threading.Lock()
+
+# Encoder threads per ffmpeg call (None: ffmpeg's default); worker mode divides the CPUs
+# between concurrent jobs so they don't oversubscribe them
+FFMPEG_THREADS = int(os.environ["PROCESSOR_FFMPEG_THREADS"]) if os.environ.get("PROCESSOR_FFMPEG_THREADS") else None
+
+# ffmpeg-python style option names that aren't ffmpeg flags
+_OPTION_ALIASES = {"vcodec": "c:v", "acodec": "c:a", "codec": "c"}
+
+def _option_args(options):
+    args = []
+    for key, value in options.items():
+        if value is None:
+            continue
+        args += [f"-{_OPTION_ALIASES.get(key, key)}", str(value)]
+    return args
+
+# Small ffmpeg command builder using subprocess, in the style of ffmpeg-python:
+#   ffmpeg.input(path, ss=10, t=5).output(out, c="copy").run(overwrite_output=True)
+class FFmpegStream:
+    def __init__(self, path, **options):
+        # Input options (ss, t, to) go before -i, so seeking skips straight to the position
+        self.input_path = path
+        self.input_options = options
+        self.video_filters = []
+        self.audio_filters = []
+        self.output_path = None
+        self.output_options = {}
+
+    def filter(self, name, *args, **kwargs):
+        self.video_filters.append(_filter_spec(name, args, kwargs))
+        return self
+
+    def audio_filter(self, name, *args, **kwargs):
+        self.audio_filters.append(_filter_spec(name, args, kwargs))
+        return self
+
+    def output(self, path, **options):
+        # e.g. c="copy" to copy streams without re-encoding, threads=N to limit encoder threads
+        self.output_path = path
+        self.output_options = options
+        return self
+
+    def compile(self, overwrite_output=False):
+        if self.output_path is None:
+            raise ValueError("No output set")
+        if (self.video_filters or self.audio_filters) and self.output_options.get("c") == "copy":
+            raise ValueError("Filters need re-encoding and cannot be combined with codec copy")
+
+        cmd = [FFMPEG_PATH, "-nostdin", "-hide_banner", *_option_args(self.input_options), "-i", self.input_path]
+        if self.video_filters:
+            cmd += ["-vf", ",".join(self.video_filters)]
+        if self.audio_filters:
+            cmd += ["-af", ",".join(self.audio_filters)]
+        options = dict(self.output_options)
+        if options.get("c") != "copy":
+            options.setdefault("threads", FFMPEG_THREADS)
+        cmd += _option_args(options)
+        cmd.append("-y" if overwrite_output else "-n")
+        cmd.append(self.output_path)
+        return cmd
+
+    def run(self, overwrite_output=False):
+        cmd = self.compile(overwrite_output)
+        try:
+            subprocess.run(cmd, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            lines = e.stderr.decode(errors="replace").strip().splitlines()
+            raise RuntimeError(f"ffmpeg failed: {lines[-1] if lines else e}") from e
+
+def _filter_spec(name, args, kwargs):
+    params = [str(arg) for arg in args] + [f"{key}={value}" for key, value in kwargs.items()]
+    return f"{name}={':'.join(params)}" if params else name
+
 class FFmpegWrapper:
     @staticmethod
-    def input(path):
-        return {"input": path}
-    
+    def input(path, **options):
+        return FFmpegStream(path, **options)
+
     @staticmethod
-    def output(stream, output_path):
-        return {"input": stream.get("input"), "output": output_path}
-    
+    def output(stream, output_path, **options):
+        return stream.output(output_path, **options)
+
     @staticmethod
     def run(stream, overwrite_output=False):
-        cmd = [FFMPEG_PATH, "-i", stream["input"]]
-        if overwrite_output:
-            cmd.append("-y")
-        cmd.append(stream["output"])
-        subprocess.run(cmd, check=True, capture_output=True)
+        stream.run(overwrite_output)
 
 ffmpeg = FFmpegWrapper()
 
+def copy_video(input_path, output_path, start=None, end=None):
+    # Stream copy: no decoding or encoding, so this runs at disk speed.
+    # With a start, the cut snaps back to the keyframe at or before it.
+    stream = ffmpeg.input(input_path, ss=start, t=(end - start) if end is not None and start is not None else None)
+    options = {"c": "copy"}
+    if start:
+        # Shift timestamps so the copied cut starts at zero
+        options["avoid_negative_ts"] = "make_zero"
+    ffmpeg.run(ffmpeg.output(stream, output_path, **options), overwrite_output=True)
+
+def parse_time(value):
+    # "90", "1:30" or "00:01:30.5" to seconds
+    seconds = 0.0
+    for part in value.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+def parse_cut(command):
+    match = re.search(r"from\s+([\d:.]+)\s+to\s+([\d:.]+)", command.lower())
+    if not match:
+        return None
+    start, end = parse_time(match.group(1)), parse_time(match.group(2))
+    return (start, end) if end > start else None
+
 def log(data):
-    print(json.dumps(data), flush=True)
+    job_id = _current_job.get()
+    if job_id is not None:
+        data = {"jobId": job_id, **data}
+    # Lines from concurrent jobs must not interleave
+    with _log_lock:
+        print(json.dumps(data), flush=True)
+
+def get_whisper_model(size="base", language=None):
+    # English-only variants are more accurate than multilingual ones of the same size
+    name = f"{size}.en" if language == "en" and size != "large" else size
+    key = (size, language)
+    # Concurrent jobs wait for one load instead of loading the model twice
+    with _whisper_lock:
+        if key not in _whisper_models:
+            if WhisperModel is not None:
+                _whisper_models[key] = WhisperModel(name, device="cpu", compute_type="int8")
+            else:
+                _whisper_models[key] = whisper.load_model(name)
+        return _whisper_models[key]
+
+def transcribe_segments(path, size="base", language=None):
+    # Yields (start, end, text) as each segment is decoded
+    model = get_whisper_model(size, language)
+    if WhisperModel is not None:
+        segments, _ = model.transcribe(path, language=language)
+        for segment in segments:
+            yield segment.start, segment.end, segment.text
+    else:
+        for segment in model.transcribe(path, language=language)["segments"]:
+            yield segment["start"], segment["end"], segment["text"]
 
 def process_video(video_id, filename, command):
     input_path = os.path.join("uploads", filename)
@@ -50,53 +190,49 @@ def process_video(video_id, filename, command):
     os.makedirs("processed", exist_ok=True)
 
     log({"status": "processing", "progress": "Analyzing command..."})
-    time.sleep(1)
 
     try:
         if "remove silence" in command.lower():
             log({"progress": "Detecting silence..."})
-            # Real implementation would use ffmpeg-python here
-            # ffmpeg.input(input_path).filter('silenceremove', ...).output(output_path).run()
+            # Real implementation would filter here, e.g.
+            # ffmpeg.input(input_path).audio_filter('silenceremove', ...).output(output_path).run()
             
-            # Mock implementation: just copy for MVP if ffmpeg fails
-            stream = ffmpeg.input(input_path)
-            # Add a dummy filter to show we are doing something
-            # Using a simple trim or copy
-            stream = ffmpeg.output(stream, output_path)
-            ffmpeg.run(stream, overwrite_output=True)
+            # Mock implementation: just copy for MVP
+            copy_video(input_path, output_path)
             
             log({"progress": "Silence removed"})
 
         elif "subtitle" in command.lower():
-            if whisper is None:
+            if whisper is None and WhisperModel is None:
                 log({"progress": "Whisper not installed, skipping subtitles"})
                 # Just copy
-                stream = ffmpeg.input(input_path).output(output_path)
-                ffmpeg.run(stream, overwrite_output=True)
+                copy_video(input_path, output_path)
             else:
-                log({"progress": "Loading Whisper model..."})
-                model = whisper.load_model("base")
+                if not _whisper_models:
+                    log({"progress": "Loading Whisper model..."})
                 log({"progress": "Transcribing audio..."})
-                result = model.transcribe(input_path)
                 # In a real app, we would generate SRT and burn it
                 # For MVP, we just log the text
-                print(f"Transcription: {result['text']}", file=sys.stderr)
+                for start, end, text in transcribe_segments(input_path):
+                    print(f"Transcription [{start:.1f}-{end:.1f}]: {text}", file=sys.stderr)
+                    log({"progress": f"Transcribed {end:.0f}s"})
                 
                 # Copy video
-                stream = ffmpeg.input(input_path).output(output_path)
-                ffmpeg.run(stream, overwrite_output=True)
+                copy_video(input_path, output_path)
 
         elif "cut" in command.lower():
-             # Basic parsing: "cut from 00:00:10 to 00:00:20"
-             # Mock: just copy
-             log({"progress": "Cutting video..."})
-             stream = ffmpeg.input(input_path).output(output_path)
-             ffmpeg.run(stream, overwrite_output=True)
+            # Basic parsing: "cut from 00:00:10 to 00:00:20"
+            cut = parse_cut(command)
+            if cut:
+                log({"progress": f"Cutting video from {cut[0]:g}s to {cut[1]:g}s..."})
+                copy_video(input_path, output_path, *cut)
+            else:
+                log({"progress": "No cut range found, copying original"})
+                copy_video(input_path, output_path)
 
         else:
             log({"progress": "Unknown command, copying original"})
-            stream = ffmpeg.input(input_path).output(output_path)
-            ffmpeg.run(stream, overwrite_output=True)
+            copy_video(input_path, output_path)
 
         log({"status": "completed", "progress": "Done", "processedFilename": output_filename})
 
@@ -104,9 +240,62 @@ def process_video(video_id, filename, command):
         log({"status": "error", "progress": f"Error: {str(e)}"})
         raise e
 
+def preload_whisper_model():
+    try:
+        get_whisper_model()
+    except Exception as e:
+        # Not fatal: subtitle jobs load the model themselves and report the error
+        print(f"Whisper preload failed: {e}", file=sys.stderr)
+
+def run_job(request):
+    token = _current_job.set(request.get("jobId"))
+    try:
+        process_video(request["videoId"], request["filename"], request["command"])
+    except Exception:
+        # Already reported as an error line; the worker keeps serving other jobs
+        pass
+    finally:
+        _current_job.reset(token)
+
+def run_worker(max_jobs=MAX_JOBS):
+    # Long-running mode: one JSON job per stdin line, e.g.
+    # {"jobId": "1", "videoId": 3, "filename": "a.mp4", "command": "remove silence"}
+    # Imports and loaded models stay warm between jobs.
+    global FFMPEG_THREADS
+    if FFMPEG_THREADS is None:
+        FFMPEG_THREADS = max(1, (os.cpu_count() or 1) // max_jobs)
+    executor = ThreadPoolExecutor(max_workers=max_jobs)
+    if whisper is not None or WhisperModel is not None:
+        # Load the default model in the background so the first subtitle job doesn't wait
+        threading.Thread(target=preload_whisper_model, daemon=True).start()
+    log({"worker": "ready", "maxJobs": max_jobs})
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            request = json.loads(line)
+            if not all(key in request for key in ("jobId", "videoId", "filename", "command")):
+                raise ValueError("jobId, videoId, filename and command are required")
+        except (ValueError, TypeError) as e:
+            log({"status": "error", "progress": f"Error: invalid job request: {e}"})
+            continue
+        executor.submit(contextvars.copy_context().run, run_job, request)
+
+    # stdin closed: finish the running jobs, then exit
+    executor.shutdown(wait=True)
+
 if __name__ == "__main__":
+    if "--worker" in sys.argv:
+        max_jobs = MAX_JOBS
+        if "--jobs" in sys.argv:
+            max_jobs = int(sys.argv[sys.argv.index("--jobs") + 1])
+        run_worker(max(1, max_jobs))
+        sys.exit(0)
+
     if len(sys.argv) < 4:
         print("Usage: python processor.py <id> <filename> <command>")
+        print("       python processor.py --worker [--jobs N]")
         sys.exit(1)
 
     video_id = sys.argv[1]
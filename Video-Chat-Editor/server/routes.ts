@@ -6,8 +6,8 @@ import { z } from "zod";
 import multer from "multer";
 import path from "path";
 import fs from "fs";
-import { spawn } from "child_process";
 import express from "express";
+import { submitJob } from "./processor";
 
 const upload = multer({
   storage: multer.diskStorage({
@@ -68,39 +68,9 @@ export async function registerRoutes(
       // Update status
       await storage.updateVideo(id, { status: "processing", progress: "Starting processing..." });
 
-      // Spawn Python process
-      const pythonProcess = spawn("python3", [
-        "server/py/processor.py",
-        String(id),
-        video.filename,
-        input.command
-      ]);
-
-      pythonProcess.stdout.on("data", async (data) => {
-        const lines = data.toString().split("\n");
-        for (const line of lines) {
-          if (!line.trim()) continue;
-          try {
-            const update = JSON.parse(line);
-            console.log("Python update:", update);
-            if (update.status || update.progress || update.processedFilename) {
-              await storage.updateVideo(id, update);
-            }
-          } catch (e) {
-            console.log("Python stdout (not JSON):", line);
-          }
-        }
-      });
-
-      pythonProcess.stderr.on("data", (data) => {
-        console.error("Python stderr:", data.toString());
-      });
-
-      pythonProcess.on("close", async (code) => {
-        console.log(`Python process exited with code ${code}`);
-        if (code !== 0) {
-          await storage.updateVideo(id, { status: "error", progress: "Processing failed" });
-        }
+      // Hand the job to the resident Python worker
+      submitJob(id, video.filename, input.command, async (update) => {
+        await storage.updateVideo(id, update);
       });
 
       res.json({ message: "Processing started", status: "processing" });
@@ -1,10 +1,11 @@
 """FFmpeg integration for video/audio processing."""
 
 import subprocess
-import json
 import os
 from pathlib import Path
 
+from .media_info import MediaInfoCache
+
 
 class FFmpegEngine:
     """Handles all FFmpeg operations."""
@@ -20,20 +21,10 @@ class FFmpegEngine:
         Returns:
             Duration in seconds
         """
-        cmd = [
-            'ffprobe',
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'json',
-            video_path
-        ]
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            data = json.loads(result.stdout)
-            return int(float(data['format']['duration']))
-        except (subprocess.CalledProcessError, json.JSONDecodeError, KeyError):
+        duration = MediaInfoCache.get(video_path).duration
+        if duration is None:
             raise RuntimeError(f"Failed to get duration for {video_path}")
+        return int(duration)
     
     @staticmethod
     def extract_audio(video_path: str, output_path: str, audio_index: int = 0) -> str:
@@ -48,6 +39,9 @@ class FFmpegEngine:
         Returns:
             Path to extracted audio
         """
+        if audio_index >= len(MediaInfoCache.get(video_path).audio_streams):
+            raise RuntimeError(f"No audio stream {audio_index} in {video_path}")
+        
         cmd = [
             'ffmpeg',
             '-i', video_path,
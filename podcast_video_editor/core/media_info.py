@@ -0,0 +1,139 @@
+"""Probe-once media information cache."""
+
+import hashlib
+import json
+import os
+import subprocess
+from typing import Optional
+
+
+class MediaInfo:
+    """Parsed ffprobe result for one media file."""
+
+    def __init__(self, path: str, format: dict, streams: list[dict]):
+        self.path = path
+        self.format = format
+        self.streams = streams
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Container duration in seconds."""
+        value = self.format.get('duration')
+        return float(value) if value not in (None, 'N/A') else None
+
+    def get_streams(self, codec_type: str) -> list[dict]:
+        """
+        Get all streams of one type.
+
+        Args:
+            codec_type: 'video', 'audio' or 'subtitle'
+
+        Returns:
+            Matching streams in file order
+        """
+        return [s for s in self.streams if s.get('codec_type') == codec_type]
+
+    @property
+    def audio_streams(self) -> list[dict]:
+        """Audio streams in file order (index matches ``0:a:N``)."""
+        return self.get_streams('audio')
+
+    @property
+    def video_codec(self) -> Optional[str]:
+        """Codec of the first video stream."""
+        video = self.get_streams('video')
+        return video[0].get('codec_name') if video else None
+
+    def to_dict(self) -> dict:
+        """Serializable form used for the on-disk cache."""
+        return {'path': self.path, 'format': self.format, 'streams': self.streams}
+
+
+class MediaInfoCache:
+    """Runs ffprobe once per file, caching results by path, size and mtime."""
+
+    CACHE_DIR = '.media_cache'
+
+    _entries: dict[tuple, MediaInfo] = {}
+
+    @staticmethod
+    def get(path: str) -> MediaInfo:
+        """
+        Get media info, probing the file only if it is new or changed.
+
+        Args:
+            path: Path to media file
+
+        Returns:
+            MediaInfo for the file
+
+        Raises:
+            RuntimeError: If the file can't be read or probed
+        """
+        try:
+            stat = os.stat(path)
+        except OSError as e:
+            raise RuntimeError(f"Failed to probe {path}: {e}")
+        key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+
+        info = MediaInfoCache._entries.get(key)
+        if info is not None:
+            return info
+
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        disk_path = os.path.join(MediaInfoCache.CACHE_DIR, f"{digest}.json")
+
+        info = MediaInfoCache._load(disk_path)
+        if info is None:
+            info = MediaInfoCache.probe(path)
+            MediaInfoCache._save(disk_path, info)
+
+        MediaInfoCache._entries[key] = info
+        return info
+
+    @staticmethod
+    def probe(path: str) -> MediaInfo:
+        """
+        Run ffprobe for format and stream information.
+
+        Args:
+            path: Path to media file
+
+        Returns:
+            MediaInfo for the file
+        """
+        cmd = [
+            'ffprobe',
+            '-v', 'error',
+            '-show_format',
+            '-show_streams',
+            '-of', 'json',
+            path
+        ]
+
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            data = json.loads(result.stdout)
+        except (subprocess.CalledProcessError, json.JSONDecodeError, OSError):
+            raise RuntimeError(f"Failed to probe {path}")
+
+        return MediaInfo(path, data.get('format', {}), data.get('streams', []))
+
+    @staticmethod
+    def _load(disk_path: str) -> Optional[MediaInfo]:
+        try:
+            with open(disk_path) as f:
+                data = json.load(f)
+            return MediaInfo(data['path'], data['format'], data['streams'])
+        except (OSError, ValueError, KeyError):
+            return None
+
+    @staticmethod
+    def _save(disk_path: str, info: MediaInfo):
+        try:
+            os.makedirs(MediaInfoCache.CACHE_DIR, exist_ok=True)
+            with open(f"{disk_path}.tmp", 'w') as f:
+                json.dump(info.to_dict(), f)
+            os.replace(f"{disk_path}.tmp", disk_path)
+        except OSError:
+            pass
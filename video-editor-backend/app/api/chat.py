@@ -2,20 +2,28 @@
 
 from fastapi import APIRouter, HTTPException
 from pathlib import Path
-import os
+import json
 
 from ..models.schemas import ChatMessage, ChatResponse
 from ..core.command_parser import CommandParser
+from ..core.edit_plan import EditPlan
 from ..core.ffmpeg_engine import FFmpegEngine
 from ..core.whisper_engine import WhisperEngine
 from ..core.silence_remover import SilenceRemover
+from ..core.smart_cut import SmartCut
+from ..core.speed_engine import SpeedEngine
+from ..core.job_queue import Job, QueueFullError, job_queue
+from ..core.render_cache import render_cache
+from ..core.reverser import ChunkedReverser
+from ..core.transcript_store import Transcript, transcript_store
+from ..core.status_store import bind_video, status_store
 from ..utils.file_manager import FileManager
 
 
 router = APIRouter(prefix="/api", tags=["chat"])
 
-# Global status tracking
-processing_status = {}
+# Operations executed by the job queue
+QUEUED_OPERATIONS = {'remove_silence', 'cut_segment', 'trim', 'change_speed', 'transcribe', 'resize', 'reverse'}
 
 
 @router.post("/chat", response_model=ChatResponse)
@@ -23,167 +31,233 @@ async def chat_edit(message: ChatMessage):
     """
     Process natural language video editing command.
     
+    The operation is queued and runs in the background; poll
+    /api/jobs/{job_id} or /api/status/{video_id} for the result.
+    
+    Chained commands ("remove silence, speed up 1.5x and resize to 1280x720")
+    and previews are compiled into one edit plan and rendered in a single pass.
+    
     Input JSON:
     {
         "video_id": "string",
-        "message": "remove silence / cut from 00:01:20 to 00:02:10"
+        "message": "remove silence / cut from 00:01:20 to 00:02:10",
+        "preview": false
     }
     """
     video_id = message.video_id
     command = message.message
     
     # Validate video exists
-    video_files = []
-    FileManager.ensure_directories()
+    input_video = FileManager.find_upload(video_id)
     
-    for file in os.listdir(FileManager.UPLOAD_DIR):
-        if file.startswith(video_id):
-            video_files.append(os.path.join(FileManager.UPLOAD_DIR, file))
-    
-    if not video_files:
+    if input_video is None:
         raise HTTPException(status_code=404, detail=f"Video {video_id} not found")
     
-    input_video = video_files[0]
-    
     # Parse command
-    parsed = CommandParser.parse(command)
+    plan = EditPlan.from_command(command)
+    
+    if len(plan.operations) > 1 or message.preview:
+        return _submit_plan(video_id, input_video, plan, message.preview)
+    
+    parsed = plan.operations[0]
     operation = parsed.get('operation')
     
-    # Update status
-    processing_status[video_id] = {
-        'status': 'processing',
-        'operation': operation,
-        'progress': 0.5
-    }
+    if operation == 'add_subtitles':
+        # This would require whisper to generate subtitles
+        status_store.set(video_id, status='complete', progress=100, operation=operation)
+        
+        return ChatResponse(
+            status="processing",
+            message="Subtitle generation in progress (requires Whisper model download)",
+            video_id=video_id,
+            operation=operation
+        )
+    
+    if operation not in QUEUED_OPERATIONS:
+        return ChatResponse(
+            status="error",
+            message=f"Unknown operation: {operation}. Try: 'remove silence', 'cut from X to Y', 'transcribe'",
+            video_id=video_id,
+            operation=operation
+        )
     
     try:
-        # Check FFmpeg
-        if not FFmpegEngine.check_installed():
-            raise RuntimeError("FFmpeg not installed")
-        
-        # Process based on operation
-        if operation == 'remove_silence':
-            output_path = FileManager.get_output_path(video_id, 'no_silence')
-            SilenceRemover.remove_silence(input_video, output_path)
-            
-            processing_status[video_id] = {'status': 'complete', 'progress': 100}
-            
-            return ChatResponse(
-                status="success",
-                message="Silence removed successfully",
-                video_id=video_id,
-                output_path=output_path,
-                operation=operation
-            )
-        
-        elif operation == 'cut_segment':
-            start = parsed.get('start', 0)
-            end = parsed.get('end', 0)
-            output_path = FileManager.get_output_path(video_id, f'cut_{int(start)}_to_{int(end)}')
-            
-            FFmpegEngine.cut_segment(input_video, output_path, start, end)
-            
-            processing_status[video_id] = {'status': 'complete', 'progress': 100}
-            
-            return ChatResponse(
-                status="success",
-                message=f"Segment cut from {start}s to {end}s",
-                video_id=video_id,
-                output_path=output_path,
-                operation=operation
-            )
-        
-        elif operation == 'trim':
-            duration = parsed.get('duration', 60)
-            output_path = FileManager.get_output_path(video_id, f'trimmed_{duration}s')
-            
-            FFmpegEngine.cut_segment(input_video, output_path, 0, duration)
-            
-            processing_status[video_id] = {'status': 'complete', 'progress': 100}
-            
-            return ChatResponse(
-                status="success",
-                message=f"Video trimmed to {duration} seconds",
-                video_id=video_id,
-                output_path=output_path,
-                operation=operation
-            )
-        
-        elif operation == 'change_speed':
-            speed = parsed.get('speed', 1.0)
-            output_path = FileManager.get_output_path(video_id, f'speed_{speed}x')
-            
-            FFmpegEngine.speed_video(input_video, output_path, speed)
-            
-            processing_status[video_id] = {'status': 'complete', 'progress': 100}
-            
-            return ChatResponse(
-                status="success",
-                message=f"Video speed changed to {speed}x",
-                video_id=video_id,
-                output_path=output_path,
-                operation=operation
-            )
-        
-        elif operation == 'add_subtitles':
-            # This would require whisper to generate subtitles
-            output_path = FileManager.get_output_path(video_id, 'with_subtitles')
-            
-            # For now, we'll just indicate it's in progress
-            processing_status[video_id] = {'status': 'complete', 'progress': 100}
-            
-            return ChatResponse(
-                status="processing",
-                message="Subtitle generation in progress (requires Whisper model download)",
-                video_id=video_id,
-                operation=operation
-            )
-        
-        elif operation == 'transcribe':
-            output_path = FileManager.get_output_path(video_id, 'transcript')
-            
-            # Transcribe video
-            result = WhisperEngine.transcribe_video(input_video, output_path)
-            
-            processing_status[video_id] = {'status': 'complete', 'progress': 100}
-            
-            return ChatResponse(
-                status="success",
-                message="Video transcribed successfully",
-                video_id=video_id,
-                output_path=output_path,
-                operation=operation
-            )
-        
-        elif operation == 'resize':
-            width = parsed.get('width', 1280)
-            height = parsed.get('height', 720)
-            output_path = FileManager.get_output_path(video_id, f'resized_{width}x{height}')
-            
-            FFmpegEngine.resize_video(input_video, output_path, width, height)
-            
-            processing_status[video_id] = {'status': 'complete', 'progress': 100}
-            
-            return ChatResponse(
-                status="success",
-                message=f"Video resized to {width}x{height}",
-                video_id=video_id,
-                output_path=output_path,
-                operation=operation
-            )
+        job = job_queue.submit(video_id, operation, run_operation, video_id, input_video, parsed)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return ChatResponse(
+        status="queued",
+        message=f"{CommandParser.explain_operation(parsed)} (job {job.job_id})",
+        video_id=video_id,
+        operation=operation,
+        job_id=job.job_id
+    )
+
+
+def _submit_plan(video_id: str, input_video: str, plan: EditPlan, preview: bool) -> ChatResponse:
+    """Queue a single-pass render of an edit plan."""
+    unsupported = plan.unsupported_operations()
+    if unsupported:
+        return ChatResponse(
+            status="error",
+            message=f"Cannot combine operations: {', '.join(unsupported)}. "
+                    f"Chain only: remove silence, cut, trim, speed, resize",
+            video_id=video_id,
+            operation=plan.name
+        )
+    
+    try:
+        job = job_queue.submit(video_id, plan.name, run_plan, video_id, input_video, plan, preview)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    prefix = "Preview: " if preview else ""
+    return ChatResponse(
+        status="queued",
+        message=f"{prefix}{plan.explain()} (job {job.job_id})",
+        video_id=video_id,
+        operation=plan.name,
+        job_id=job.job_id
+    )
+
+
+def run_plan(video_id: str, input_video: str, plan: EditPlan, preview: bool) -> dict:
+    """
+    Render an edit plan in one ffmpeg pass. Blocking; runs on a job queue worker.
+    
+    Args:
+        video_id: Video ID
+        input_video: Path to the uploaded video
+        plan: Edit plan to render
+        preview: Render a short low-resolution preview
         
-        else:
-            return ChatResponse(
-                status="error",
-                message=f"Unknown operation: {operation}. Try: 'remove silence', 'cut from X to Y', 'transcribe'",
-                video_id=video_id,
-                operation=operation
-            )
-    
-    except Exception as e:
-        processing_status[video_id] = {'status': 'error', 'progress': 0}
+    Returns:
+        Dictionary with a result message and output path
+    """
+    bind_video(video_id)
+    
+    if not FFmpegEngine.check_installed():
+        raise RuntimeError("FFmpeg not installed")
+    
+    suffix = f'preview_{plan.output_suffix}' if preview else plan.output_suffix
+    output_path = FileManager.get_output_path(video_id, suffix)
+    
+    params = {'plan': plan.operations, 'preview': preview}
+    cached = render_cache.get_or_render(
+        input_video, params, output_path,
+        lambda: plan.render(input_video, output_path, preview=preview)
+    )
+    FileManager.register_output(video_id, output_path)
+    
+    message = f"{'Preview rendered' if preview else 'Edits applied'}: {plan.explain()}"
+    return {'message': message, 'output_path': output_path, 'cached': cached}
+
+
+def run_operation(video_id: str, input_video: str, parsed: dict) -> dict:
+    """
+    Execute a parsed operation. Blocking; runs on a job queue worker.
+    
+    Outputs go through the render cache, so repeating an operation on the
+    same content returns the earlier output without running ffmpeg.
+    
+    Args:
+        video_id: Video ID
+        input_video: Path to the uploaded video
+        parsed: Output of CommandParser.parse
         
-        raise HTTPException(
-            status_code=500,
-            detail=f"Operation failed: {str(e)}"
+    Returns:
+        Dictionary with a result message and output path
+    """
+    operation = parsed.get('operation')
+    params = parsed
+    bind_video(video_id)
+    
+    # Check FFmpeg
+    if not FFmpegEngine.check_installed():
+        raise RuntimeError("FFmpeg not installed")
+    
+    if operation == 'remove_silence':
+        output_path = FileManager.get_output_path(video_id, 'no_silence')
+        message = "Silence removed successfully"
+        render = lambda: SilenceRemover.remove_silence(input_video, output_path)
+    
+    elif operation == 'cut_segment':
+        start = parsed.get('start', 0)
+        end = parsed.get('end', 0)
+        output_path = FileManager.get_output_path(video_id, f'cut_{int(start)}_to_{int(end)}')
+        message = f"Segment cut from {start}s to {end}s"
+        render = lambda: SmartCut.cut_segment(input_video, output_path, start, end)
+    
+    elif operation == 'trim':
+        duration = parsed.get('duration', 60)
+        output_path = FileManager.get_output_path(video_id, f'trimmed_{duration}s')
+        message = f"Video trimmed to {duration} seconds"
+        render = lambda: SmartCut.cut_segment(input_video, output_path, 0, duration)
+    
+    elif operation == 'change_speed':
+        speed = parsed.get('speed', 1.0)
+        output_path = FileManager.get_output_path(video_id, f'speed_{speed}x')
+        message = f"Video speed changed to {speed}x"
+        render = lambda: SpeedEngine.change_speed(input_video, output_path, speed)
+    
+    elif operation == 'transcribe':
+        output_path = FileManager.get_output_path(video_id, 'transcript', extension='.json')
+        message = "Video transcribed successfully"
+        # The transcript depends on the Whisper model, not on the FFmpeg version alone
+        params = {**parsed, 'model': WhisperEngine.MODEL, 'language': 'en'}
+        # Stored per content hash; later subtitle/search requests read it instead of re-running Whisper
+        transcript = transcript_store.get_or_transcribe(
+            video_id, input_video, WhisperEngine.MODEL, 'en',
+            lambda: WhisperEngine.transcribe_video(input_video)
         )
+        render = lambda: _write_transcript(transcript, output_path)
+    
+    elif operation == 'resize':
+        width = parsed.get('width', 1280)
+        height = parsed.get('height', 720)
+        output_path = FileManager.get_output_path(video_id, f'resized_{width}x{height}')
+        message = f"Video resized to {width}x{height}"
+        render = lambda: FFmpegEngine.resize_video(input_video, output_path, width, height)
+    
+    elif operation == 'reverse':
+        output_path = FileManager.get_output_path(video_id, 'reversed')
+        message = "Video reversed"
+        render = lambda: ChunkedReverser.reverse(input_video, output_path)
+    
+    else:
+        raise ValueError(f"Unsupported operation: {operation}")
+    
+    cached = render_cache.get_or_render(input_video, params, output_path, render)
+    FileManager.register_output(video_id, output_path)
+    if cached:
+        message += " (cached)"
+    return {'message': message, 'output_path': output_path, 'cached': cached}
+
+
+def _write_transcript(transcript: Transcript, output_path: str):
+    """Save a transcript as Whisper-style JSON."""
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(transcript.to_dict(), f)
+
+
+def _track_job_status(job: Job):
+    """Mirror job state changes into the shared per-video status."""
+    fields = {'operation': job.operation, 'job_id': job.job_id}
+    
+    if job.status == 'queued':
+        status_store.set(job.video_id, status='queued', progress=0, **fields)
+    elif job.status == 'running':
+        status_store.set(job.video_id, status='processing', progress=0, **fields)
+    elif job.status == 'complete':
+        status_store.update(job.video_id, status='complete', progress=100, eta_seconds=0, **fields)
+    elif job.status == 'cancelled':
+        status_store.update(job.video_id, status='cancelled', eta_seconds=None, **fields)
+    else:
+        status_store.update(job.video_id, status='error', error=job.error, eta_seconds=None, **fields)
+    
+    if job.done:
+        FileManager.index.record_job(job.video_id, job.to_dict())
+
+
+job_queue.add_listener(_track_job_status)
@@ -1,40 +1,46 @@
 """Download endpoint."""
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, HTTPException, Request
+import mimetypes
 import os
 
 from ..utils.file_manager import FileManager
+from ..utils.range_response import RangeFileResponse
 
 
 router = APIRouter(prefix="/api", tags=["download"])
 
 
-@router.get("/download/{video_id}")
-async def download_video(video_id: str):
+@router.api_route("/download/{video_id}", methods=["GET", "HEAD"])
+async def download_video(video_id: str, request: Request, filename: str = None):
     """
     Download processed video.
     
-    Returns the latest processed output video.
+    Returns the latest processed output video, or the output named by the
+    ``filename`` query parameter. Supports byte ranges (206 Partial Content)
+    so players can seek, and ETag / If-None-Match revalidation.
     """
-    FileManager.ensure_directories()
-    
-    # Find latest output file
-    outputs = FileManager.list_outputs(video_id)
-    
-    if not outputs:
+    if filename:
+        path = os.path.join(FileManager.OUTPUT_DIR, os.path.basename(filename))
+        if path not in FileManager.list_outputs(video_id):
+            raise HTTPException(status_code=404, detail=f"Output {filename} not found for video {video_id}")
+    else:
+        path = FileManager.latest_output(video_id, extension='.mp4')
+    
+    if not path:
         raise HTTPException(status_code=404, detail=f"No output found for video {video_id}")
     
-    # Get most recent file
-    latest = max(outputs, key=os.path.getctime)
-    
-    if not os.path.exists(latest):
+    if not os.path.exists(path):
         raise HTTPException(status_code=404, detail="Output file not found")
     
-    return FileResponse(
-        path=latest,
-        media_type='video/mp4',
-        filename=os.path.basename(latest)
+    media_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    
+    return RangeFileResponse(
+        path=path,
+        request_headers=request.headers,
+        media_type=media_type,
+        filename=os.path.basename(path),
+        method=request.method
     )
 
 
@@ -42,8 +48,6 @@ async def download_video(video_id: str):
 async def list_outputs(video_id: str):
     """List all output files for a video."""
     
-    FileManager.ensure_directories()
-    
     outputs = FileManager.list_outputs(video_id)
     
     return {
@@ -0,0 +1,39 @@
+"""Job queue endpoints."""
+
+from fastapi import APIRouter, HTTPException
+from typing import Optional
+
+from ..models.schemas import JobResponse
+from ..core.job_queue import job_queue
+
+
+router = APIRouter(prefix="/api", tags=["jobs"])
+
+
+@router.get("/jobs", response_model=list[JobResponse])
+async def list_jobs(video_id: Optional[str] = None):
+    """List queued, running and recently finished jobs."""
+    return [JobResponse(**job.to_dict()) for job in job_queue.list_jobs(video_id)]
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+async def get_job(job_id: str):
+    """Get the state of a job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    return JobResponse(**job.to_dict())
+
+
+@router.delete("/jobs/{job_id}", response_model=JobResponse)
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    
+    if not job_queue.cancel(job_id):
+        raise HTTPException(status_code=409, detail=f"Job {job_id} already finished")
+    
+    return JobResponse(**job.to_dict())
@@ -1,16 +1,43 @@
 """Status endpoint."""
 
-from fastapi import APIRouter, HTTPException
-import os
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
 
 from app.models.schemas import StatusResponse
+from app.core.status_store import status_store
 from app.utils.file_manager import FileManager
 
 
 router = APIRouter(prefix="/api", tags=["status"])
 
-# Global status tracking
-processing_status = {}
+# Seconds between keep-alive comments on idle event streams
+KEEPALIVE_INTERVAL = 15
+
+DEFAULT_STATUS = {
+    'status': 'ready',
+    'progress': 0,
+    'operation': None
+}
+
+
+def _video_exists(video_id: str) -> bool:
+    """Check whether an upload exists for a video."""
+    return FileManager.find_upload(video_id) is not None
+
+
+def _to_response(video_id: str, status: dict) -> StatusResponse:
+    return StatusResponse(
+        video_id=video_id,
+        status=status.get('status', 'unknown'),
+        progress=status.get('progress', 0),
+        current_operation=status.get('operation'),
+        job_id=status.get('job_id'),
+        speed=status.get('speed'),
+        eta_seconds=status.get('eta_seconds'),
+        error=status.get('error')
+    )
 
 
 @router.get("/status/{video_id}", response_model=StatusResponse)
@@ -18,27 +45,50 @@ async def get_status(video_id: str):
     """Get processing status of a video."""
     
     # Check if video exists
-    FileManager.ensure_directories()
+    if video_id not in status_store and not _video_exists(video_id):
+        raise HTTPException(status_code=404, detail=f"Video {video_id} not found")
     
-    video_exists = False
-    for file in os.listdir(FileManager.UPLOAD_DIR):
-        if file.startswith(video_id):
-            video_exists = True
-            break
+    # Get status
+    status = status_store.get(video_id) or DEFAULT_STATUS
     
-    if not video_exists and video_id not in processing_status:
+    return _to_response(video_id, status)
+
+
+@router.get("/status/{video_id}/events")
+async def stream_status(video_id: str, request: Request):
+    """
+    Stream status updates as Server-Sent Events.
+    
+    Sends the current status immediately, then one ``status`` event per
+    change (progress, encode speed, ETA) until the client disconnects.
+    """
+    if video_id not in status_store and not _video_exists(video_id):
         raise HTTPException(status_code=404, detail=f"Video {video_id} not found")
     
-    # Get status
-    status = processing_status.get(video_id, {
-        'status': 'ready',
-        'progress': 0,
-        'operation': None
-    })
+    queue = status_store.subscribe(video_id)
     
-    return StatusResponse(
-        video_id=video_id,
-        status=status.get('status', 'unknown'),
-        progress=status.get('progress', 0),
-        current_operation=status.get('operation')
+    async def events():
+        try:
+            status = status_store.get(video_id) or DEFAULT_STATUS
+            yield _format_event(video_id, status)
+            
+            while not await request.is_disconnected():
+                try:
+                    status = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield _format_event(video_id, status)
+        finally:
+            status_store.unsubscribe(video_id, queue)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
+
+
+def _format_event(video_id: str, status: dict) -> str:
+    data = _to_response(video_id, status).model_dump()
+    return f"event: status\ndata: {json.dumps(data)}\n\n"
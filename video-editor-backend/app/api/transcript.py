@@ -0,0 +1,62 @@
+"""Transcript endpoints."""
+
+from fastapi import APIRouter, HTTPException, Query
+import asyncio
+
+from ..models.schemas import TranscriptResponse, TranscriptSegment
+from ..core.transcript_store import Transcript, transcript_store
+
+
+router = APIRouter(prefix="/api", tags=["transcript"])
+
+
+async def _load_transcript(video_id: str) -> Transcript:
+    """Stored transcript of a video, or 404 if it was never transcribed."""
+    transcript = await asyncio.to_thread(transcript_store.get_for_video, video_id)
+    if transcript is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"No transcript for video {video_id}. Send the 'transcribe' command first."
+        )
+    return transcript
+
+
+@router.get("/transcript/{video_id}", response_model=TranscriptResponse)
+async def get_transcript(video_id: str, start: float = None, end: float = None):
+    """
+    Get the stored transcript of a video.
+
+    ``start``/``end`` limit the result to segments overlapping that range.
+    """
+    transcript = await _load_transcript(video_id)
+
+    if start is not None or end is not None:
+        segments = transcript.segments_between(start or 0.0, end if end is not None else float('inf'))
+    else:
+        segments = transcript.segments()
+
+    return TranscriptResponse(
+        video_id=video_id,
+        transcript=[TranscriptSegment(**segment) for segment in segments],
+        language=transcript.language or 'unknown'
+    )
+
+
+@router.get("/transcript/{video_id}/at")
+async def text_at(video_id: str, t: float = Query(..., ge=0)):
+    """Get the text spoken at a time (null during silence)."""
+    transcript = await _load_transcript(video_id)
+    return {'video_id': video_id, 'time': t, 'text': transcript.text_at(t)}
+
+
+@router.get("/transcript/{video_id}/search")
+async def search_transcript(video_id: str, q: str = Query(..., min_length=1)):
+    """Find the times where a word or phrase is spoken."""
+    transcript = await _load_transcript(video_id)
+    matches = transcript.find(q)
+
+    return {
+        'video_id': video_id,
+        'query': q,
+        'matches': [{'start': start, 'end': end} for start, end in matches]
+    }
@@ -1,54 +1,264 @@
 """Upload endpoint."""
 
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import JSONResponse
+import asyncio
+import hashlib
 import os
 
-from ..models.schemas import UploadResponse
+from ..core.ffmpeg_engine import FFmpegEngine
+from ..models.schemas import UploadResponse, UploadSessionCreate, UploadSessionResponse
 from ..utils.file_manager import FileManager
+from ..utils.multipart_stream import iter_multipart
+from ..utils.resumable_upload import UploadSession, upload_sessions
 
 
 router = APIRouter(prefix="/api", tags=["upload"])
 
+# Bytes of file data collected from the request per write
+CHUNK_SIZE = 1024 * 1024
 
-@router.post("/upload", response_model=UploadResponse)
-async def upload_video(file: UploadFile = File(...)):
+
+@router.post("/upload", response_model=UploadResponse, openapi_extra={
+    'requestBody': {
+        'required': True,
+        'content': {'multipart/form-data': {'schema': {
+            'type': 'object',
+            'properties': {'file': {'type': 'string', 'format': 'binary'}},
+            'required': ['file']
+        }}}
+    }
+})
+async def upload_video(request: Request):
     """
-    Upload a video file.
+    Upload a video file (multipart form field ``file``).
+    
+    The request body is parsed as it arrives and the file part is written
+    straight to its final path and hashed on the way, so the upload is
+    stored once and memory use does not depend on the file size.
     
     Returns:
         UploadResponse with video_id
     """
-    # Validate file
-    if not FileManager.validate_video_file(file.filename):
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid file type. Allowed: {', '.join(FileManager.ALLOWED_EXTENSIONS)}"
-        )
-    
-    # Generate video ID
     video_id = FileManager.generate_video_id()
-    
-    # Save file
     FileManager.ensure_directories()
-    file_path = FileManager.get_upload_path(video_id, file.filename)
+    
+    filename = None
+    file_path = None
+    f = None
+    complete = False
+    in_file = False
+    sha256 = hashlib.sha256()
+    file_size = 0
+    buffer = bytearray()
+    stored = False
     
     try:
-        with open(file_path, 'wb') as f:
-            content = await file.read()
-            f.write(content)
+        try:
+            async for event, value in iter_multipart(request.headers.get('content-type', ''), request.stream()):
+                if event == 'part':
+                    name, part_filename = value
+                    # Only the first file field is stored; other fields are skipped unread
+                    in_file = name == 'file' and part_filename is not None and f is None
+                    if not in_file:
+                        continue
+                    filename = os.path.basename(part_filename)
+                    if not FileManager.validate_video_file(filename):
+                        raise HTTPException(
+                            status_code=400,
+                            detail=f"Invalid file type. Allowed: {', '.join(FileManager.ALLOWED_EXTENSIONS)}"
+                        )
+                    file_path = FileManager.get_upload_path(video_id, filename)
+                    f = await asyncio.to_thread(open, file_path, 'wb')
+                elif event == 'data' and in_file:
+                    buffer += value
+                    if len(buffer) >= CHUNK_SIZE:
+                        await asyncio.to_thread(_write_chunk, f, sha256, bytes(buffer))
+                        file_size += len(buffer)
+                        buffer.clear()
+                elif event == 'end' and in_file:
+                    in_file = False
+                    complete = True
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        if f is None:
+            raise HTTPException(status_code=400, detail="No file field in upload")
+        if not complete:
+            raise HTTPException(status_code=400, detail="Upload body ended before the file was complete")
         
-        file_size = len(content)
+        if buffer:
+            await asyncio.to_thread(_write_chunk, f, sha256, bytes(buffer))
+            file_size += len(buffer)
+        await asyncio.to_thread(f.close)
+        
+        digest = sha256.hexdigest()
+        FileManager.register_upload(video_id, file_path, filename, digest)
+        stored = True
+        await asyncio.to_thread(_probe_upload, video_id, file_path)
         
         return UploadResponse(
             video_id=video_id,
-            filename=file.filename,
+            filename=filename,
             size=file_size,
+            sha256=digest,
             message=f"Video uploaded successfully. ID: {video_id}"
         )
+    except HTTPException:
+        raise
     except Exception as e:
-        # Clean up on error
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    finally:
+        # Clean up on error, including a client disconnect mid-upload
+        if not stored:
+            if f is not None:
+                await asyncio.to_thread(f.close)
+            if file_path:
+                FileManager.cleanup_file(file_path)
+
+
+@router.post("/uploads", response_model=UploadSessionResponse, status_code=201)
+async def create_upload(request: UploadSessionCreate):
+    """
+    Start a resumable upload.
+    
+    Send the file with PATCH /api/uploads/{upload_id} (header Upload-Offset),
+    query the received offset with HEAD or GET after a dropped connection,
+    and call POST /api/uploads/{upload_id}/finalize once all bytes are sent.
+    """
+    if not FileManager.validate_video_file(request.filename):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid file type. Allowed: {', '.join(FileManager.ALLOWED_EXTENSIONS)}"
+        )
+    if request.size <= 0:
+        raise HTTPException(status_code=400, detail="Upload size must be positive")
+    
+    FileManager.ensure_directories()
+    session = upload_sessions.create(os.path.basename(request.filename), request.size)
+    
+    return _session_response(session)
+
+
+@router.head("/uploads/{upload_id}")
+async def upload_offset(upload_id: str):
+    """Report the received offset in the Upload-Offset header."""
+    session = _get_session(upload_id)
+    return Response(status_code=200, headers=_offset_headers(session))
+
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload(upload_id: str):
+    """Get the state of a resumable upload."""
+    return _session_response(_get_session(upload_id))
+
+
+@router.patch("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def append_upload(upload_id: str, request: Request):
+    """
+    Append a chunk to a resumable upload.
+    
+    The Upload-Offset header must equal the number of bytes already received;
+    the request body is streamed straight to disk.
+    """
+    session = _get_session(upload_id)
+    
+    try:
+        client_offset = int(request.headers.get('upload-offset', ''))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Missing or invalid Upload-Offset header")
+    
+    async with session.lock:
+        if client_offset != session.offset:
+            return JSONResponse(
+                status_code=409,
+                content={'detail': f"Offset mismatch: server has {session.offset} bytes"},
+                headers=_offset_headers(session)
+            )
+        
+        try:
+            await session.append(request.stream())
+        except ValueError as e:
+            raise HTTPException(status_code=413, detail=str(e))
+    
+    return JSONResponse(
+        content=_session_response(session).model_dump(),
+        headers=_offset_headers(session)
+    )
+
+
+@router.post("/uploads/{upload_id}/finalize", response_model=UploadResponse)
+async def finalize_upload(upload_id: str):
+    """Complete a resumable upload and register it as a video."""
+    session = _get_session(upload_id)
+    
+    async with session.lock:
+        video_id = FileManager.generate_video_id()
+        file_path = FileManager.get_upload_path(video_id, session.filename)
+        
+        try:
+            digest = await asyncio.to_thread(session.finalize, file_path)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        
+        upload_sessions.remove(upload_id)
+        FileManager.register_upload(video_id, file_path, session.filename, digest)
+        await asyncio.to_thread(_probe_upload, video_id, file_path)
+    
+    return UploadResponse(
+        video_id=video_id,
+        filename=session.filename,
+        size=session.size,
+        sha256=digest,
+        message=f"Video uploaded successfully. ID: {video_id}"
+    )
+
+
+@router.delete("/uploads/{upload_id}", status_code=204)
+async def discard_upload(upload_id: str):
+    """Abort a resumable upload and delete the received data."""
+    session = _get_session(upload_id)
+    
+    async with session.lock:
+        session.discard()
+        upload_sessions.remove(upload_id)
+    
+    return Response(status_code=204)
+
+
+def _write_chunk(f, sha256, chunk: bytes):
+    f.write(chunk)
+    sha256.update(chunk)
+
+
+def _probe_upload(video_id: str, path: str):
+    """Probe a new upload once; later edits reuse the cached result."""
+    try:
+        info = FFmpegEngine.get_media_info(path)
+    except (RuntimeError, OSError):
+        return
+    FileManager.index.set_media_info(video_id, info.summary())
+
+
+def _get_session(upload_id: str) -> UploadSession:
+    session = upload_sessions.get(upload_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Upload {upload_id} not found")
+    return session
+
+
+def _offset_headers(session: UploadSession) -> dict:
+    return {
+        'Upload-Offset': str(session.offset),
+        'Upload-Length': str(session.size),
+        'Cache-Control': 'no-store'
+    }
+
+
+def _session_response(session: UploadSession) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        upload_id=session.upload_id,
+        filename=session.filename,
+        size=session.size,
+        offset=session.offset
+    )
@@ -0,0 +1,175 @@
+"""Cached audio level envelopes for silence detection."""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+from .ffmpeg_engine import FFmpegEngine
+from ..utils.file_manager import FileManager
+
+
+class AudioLevels:
+    """
+    Peak level of an audio track in short frames, in dBFS.
+
+    Silence is a run of frames whose peak stays below a threshold, the same
+    criterion as ffmpeg's ``silencedetect`` (every sample under the noise
+    level). Because the envelope is kept rather than the intervals, any
+    threshold, minimum duration or padding can be evaluated without decoding
+    the audio again.
+    """
+
+    SAMPLE_RATE = 16000
+    FRAME_SECONDS = 0.01
+    # Level reported for digital silence
+    FLOOR_DB = -120.0
+
+    def __init__(self, peak_db: np.ndarray, frame_seconds: float, duration: float):
+        self.peak_db = peak_db
+        self.frame_seconds = frame_seconds
+        self.duration = duration
+
+    @staticmethod
+    def analyze(input_path: str) -> 'AudioLevels':
+        """Decode the audio track once (audio only, PCM over a pipe) and measure it."""
+        frame = int(AudioLevels.SAMPLE_RATE * AudioLevels.FRAME_SECONDS)
+        peaks = []
+        # Carries an odd trailing byte and the partial last frame between chunks
+        pending = bytearray()
+        samples = 0
+
+        def consume(chunk: bytes):
+            nonlocal pending, samples
+            pending += chunk
+            usable = len(pending) // (2 * frame) * (2 * frame)
+            if not usable:
+                return
+            block = np.frombuffer(bytes(pending[:usable]), dtype='<i2').reshape(-1, frame)
+            peaks.append(np.abs(block.astype(np.int32)).max(axis=1))
+            samples += usable // 2
+            del pending[:usable]
+
+        FFmpegEngine.extract_pcm(input_path, AudioLevels.SAMPLE_RATE, on_chunk=consume)
+
+        tail = np.frombuffer(bytes(pending[:len(pending) // 2 * 2]), dtype='<i2')
+        if len(tail):
+            peaks.append(np.abs(tail.astype(np.int32)).max(keepdims=True))
+            samples += len(tail)
+
+        peak = np.concatenate(peaks) if peaks else np.zeros(0, dtype=np.int32)
+        with np.errstate(divide='ignore'):
+            peak_db = np.maximum(20 * np.log10(peak / 32768.0), AudioLevels.FLOOR_DB).astype(np.float32)
+        return AudioLevels(peak_db, AudioLevels.FRAME_SECONDS, samples / AudioLevels.SAMPLE_RATE)
+
+    def silences(self, threshold_db: float, min_duration: float) -> list[tuple[float, float]]:
+        """
+        Silent regions: runs of frames below threshold_db lasting at least min_duration.
+
+        Returns:
+            List of (start_time, end_time) tuples
+        """
+        quiet = np.concatenate(([False], self.peak_db < threshold_db, [False]))
+        edges = np.diff(quiet.view(np.int8))
+        starts = np.flatnonzero(edges == 1) * self.frame_seconds
+        ends = np.minimum(np.flatnonzero(edges == -1) * self.frame_seconds, self.duration)
+        keep = ends - starts >= min_duration
+        return [(float(start), float(end)) for start, end in zip(starts[keep], ends[keep])]
+
+    def keep_intervals(self, threshold_db: float, min_duration: float,
+                       padding: float = 0.0) -> list[tuple[float, float]]:
+        """
+        Non-silent regions to keep when silences are removed.
+
+        Args:
+            threshold_db: Silence threshold in dBFS
+            min_duration: Shortest silence that is removed
+            padding: Silence kept next to sound on each side of a removed region
+
+        Returns:
+            List of (start_time, end_time) tuples in order
+        """
+        keep = []
+        position = 0.0
+        for start, end in self.silences(threshold_db, min_duration):
+            # Leading and trailing silence is removed entirely
+            cut_start = start + padding if start > 0 else start
+            cut_end = end - padding if end < self.duration else end
+            if cut_end <= cut_start:
+                continue
+            if cut_start > position:
+                keep.append((position, cut_start))
+            position = cut_end
+        if position < self.duration:
+            keep.append((position, self.duration))
+        return keep
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, peak_db=self.peak_db, frame_seconds=self.frame_seconds, duration=self.duration)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> 'AudioLevels':
+        with np.load(path, allow_pickle=False) as data:
+            return AudioLevels(data['peak_db'], float(data['frame_seconds']), float(data['duration']))
+
+
+class AudioLevelsCache:
+    """
+    Audio level envelopes keyed by content hash, in memory and in ``outputs/.levels``.
+
+    Silence reports, detection and removal renders with any threshold or
+    padding share one decode per file content.
+    """
+
+    CACHE_DIR = os.path.join(FileManager.OUTPUT_DIR, '.levels')
+    MAX_LOADED = 32
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or AudioLevelsCache.CACHE_DIR
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._loaded: OrderedDict[str, AudioLevels] = OrderedDict()
+        self.analyses = 0
+
+    def get(self, input_path: str) -> AudioLevels:
+        """Levels of a file, decoding its audio only on the first request."""
+        key = FileManager.get_content_hash(input_path)
+        with self._lock:
+            levels = self._loaded.get(key)
+            if levels is not None:
+                self._loaded.move_to_end(key)
+                return levels
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            path = os.path.join(self.cache_dir, f"{key}.npz")
+            levels = self._load(path)
+            if levels is None:
+                levels = AudioLevels.analyze(input_path)
+                levels.save(path)
+                with self._lock:
+                    self.analyses += 1
+
+        with self._lock:
+            self._loaded[key] = levels
+            while len(self._loaded) > self.MAX_LOADED:
+                self._loaded.popitem(last=False)
+        return levels
+
+    @staticmethod
+    def _load(path: str) -> Optional[AudioLevels]:
+        if not os.path.exists(path):
+            return None
+        try:
+            return AudioLevels.load(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+audio_levels_cache = AudioLevelsCache()
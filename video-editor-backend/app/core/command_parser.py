@@ -69,6 +69,28 @@ class CommandParser:
         # Unknown command
         return {'operation': 'unknown', 'raw_command': command}
     
+    @staticmethod
+    def parse_chain(command: str) -> list[dict]:
+        """
+        Parse a command that may chain several operations.
+        
+        Steps are separated by commas, semicolons, "then" or "and", e.g.
+        "remove silence, speed up 1.5x and resize to 1280x720".
+        
+        Args:
+            command: User text input
+            
+        Returns:
+            List of parsed operations, in order
+        """
+        steps = re.split(r'\s*(?:[,;]|\band then\b|\bthen\b|\band\b)\s*', command.strip().lower())
+        operations = [CommandParser.parse(step) for step in steps if step.strip()]
+        
+        # Not a chain after all (e.g. "merge and combine"): parse as one command
+        if not operations or any(op['operation'] == 'unknown' for op in operations):
+            return [CommandParser.parse(command)]
+        return operations
+    
     @staticmethod
     def _parse_time(hours: str, minutes: str, seconds: str = None) -> float:
         """Parse time string to seconds."""
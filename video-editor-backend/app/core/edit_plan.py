@@ -0,0 +1,299 @@
+"""Edit plans: chained operations compiled into a single FFmpeg filtergraph."""
+
+import os
+import subprocess
+from typing import Optional
+
+from .command_parser import CommandParser
+from .ffmpeg_engine import FFmpegEngine
+from .silence_remover import SilenceRemover
+from .speed_engine import SpeedEngine
+
+
+class EditPlan:
+    """
+    An ordered list of parsed operations rendered in one ffmpeg invocation.
+
+    Instead of decoding and re-encoding the whole video once per operation,
+    the plan is compiled into a single ``-filter_complex`` graph. A leading
+    cut or trim becomes an input-side seek so the skipped part is never decoded.
+    Silence removal uses cached audio levels and cuts video and audio together.
+    Inputs without an audio stream get a video-only graph.
+    """
+
+    FILTERABLE_OPERATIONS = {'remove_silence', 'cut_segment', 'trim', 'change_speed', 'resize'}
+
+    # Preview renders: short, small and fast
+    PREVIEW_SECONDS = 30
+    PREVIEW_MAX_WIDTH = 640
+
+    # Longer graphs are passed as a file (Windows limits command lines to 32K characters)
+    MAX_INLINE_GRAPH = 8000
+
+    def __init__(self, operations: list[dict]):
+        """
+        Args:
+            operations: Parsed operations, as returned by CommandParser.parse
+        """
+        self.operations = operations
+
+    @staticmethod
+    def from_command(command: str) -> 'EditPlan':
+        """Build a plan from a (possibly chained) natural language command."""
+        return EditPlan(CommandParser.parse_chain(command))
+
+    @property
+    def name(self) -> str:
+        """Operation name, e.g. 'remove_silence+change_speed'."""
+        return '+'.join(op.get('operation', 'unknown') for op in self.operations)
+
+    @property
+    def output_suffix(self) -> str:
+        """Output file suffix describing every step of the plan."""
+        return '_'.join(EditPlan._step_suffix(op) for op in self.operations)
+
+    def unsupported_operations(self) -> list[str]:
+        """Operations in the plan that cannot be compiled into a filtergraph."""
+        return [
+            op.get('operation') for op in self.operations
+            if op.get('operation') not in EditPlan.FILTERABLE_OPERATIONS
+        ]
+
+    def explain(self) -> str:
+        """Human-readable description of the plan."""
+        return '; then '.join(CommandParser.explain_operation(op) for op in self.operations)
+
+    def expected_duration(self, input_duration: Optional[float]) -> Optional[float]:
+        """Estimate the output duration (silence removal makes it an upper bound)."""
+        duration = input_duration
+        for op in self.operations:
+            operation = op.get('operation')
+            if operation == 'cut_segment':
+                start, end = op.get('start', 0), op.get('end', 0)
+                duration = end - start if duration is None else max(0.0, min(end, duration) - start)
+            elif operation == 'trim':
+                trim = op.get('duration', 60)
+                duration = trim if duration is None else min(trim, duration)
+            elif operation == 'change_speed' and duration is not None:
+                duration = duration / op.get('speed', 1.0)
+        return duration
+
+    def compile(self, input_path: str, output_path: str, preview: bool = False,
+                frame_rate: Optional[str] = None, has_audio: bool = True) -> list[str]:
+        """
+        Compile the plan into ffmpeg arguments.
+
+        Args:
+            input_path: Input video
+            output_path: Output video
+            preview: Render a short low-resolution preview instead of the full output
+            frame_rate: Source frame rate; trims and retiming leave the output
+                rate unset, which encoders would otherwise default to 25 fps
+            has_audio: Whether the input has an audio stream to carry through
+
+        Returns:
+            ffmpeg arguments (without the executable)
+        """
+        unsupported = self.unsupported_operations()
+        if unsupported:
+            raise ValueError(f"Cannot combine operations: {', '.join(unsupported)}")
+
+        operations = list(self.operations)
+        input_args = []
+        # Where the running timeline sits on the source: start, end and speed,
+        # so silence detected on the source can be placed after cuts and speed changes
+        window = _SourceWindow()
+
+        # A leading cut/trim is applied as an input-side seek
+        if operations and operations[0].get('operation') in ('cut_segment', 'trim'):
+            first = operations.pop(0)
+            if first['operation'] == 'cut_segment':
+                start = first.get('start', 0)
+                input_args = ['-ss', str(start), '-t', str(max(0, first.get('end', 0) - start))]
+            else:
+                input_args = ['-t', str(first.get('duration', 60))]
+            window.apply(first)
+
+        statements = []
+        labels = ('0:v', '0:a' if has_audio else None)
+        video_filters = []
+        audio_filters = []
+        for index, op in enumerate(operations):
+            if op.get('operation') != 'remove_silence':
+                video, audio = EditPlan._step_filters(op)
+                video_filters.extend(video)
+                audio_filters.extend(audio)
+                window.apply(op)
+                continue
+
+            if window.silence_removed:
+                # The running timeline has no silences left
+                continue
+            if not has_audio:
+                raise ValueError("Cannot remove silence: the video has no audio stream")
+            keep = window.to_running(SilenceRemover.keep_intervals(
+                input_path,
+                op.get('threshold_db', SilenceRemover.DEFAULT_THRESHOLD_DB),
+                op.get('min_duration_ms', SilenceRemover.DEFAULT_MIN_DURATION_MS),
+                op.get('padding_ms', SilenceRemover.DEFAULT_PADDING_MS),
+            ))
+            labels = EditPlan._flush(statements, labels, video_filters, audio_filters, f'p{index}')
+            video_filters, audio_filters = [], []
+            statements.append(SilenceRemover.build_filter(
+                keep, *labels, f'r{index}v', f'r{index}a', prefix=f's{index}'
+            ))
+            labels = (f'r{index}v', f'r{index}a')
+            window.silence_removed = True
+
+        if preview:
+            video_filters.append(f"scale='min(iw,{EditPlan.PREVIEW_MAX_WIDTH})':-2")
+
+        statements.append(f"[{labels[0]}]{','.join(video_filters) or 'null'}[v]")
+        maps = ['-map', '[v]']
+        if has_audio:
+            statements.append(f"[{labels[1]}]{','.join(audio_filters) or 'anull'}[a]")
+            maps += ['-map', '[a]']
+        graph = ';'.join(statements)
+
+        args = [*input_args, '-i', input_path, '-filter_complex', graph, *maps]
+        if frame_rate:
+            args += ['-r', frame_rate]
+        if preview:
+            args += ['-t', str(EditPlan.PREVIEW_SECONDS), '-preset', 'ultrafast', '-crf', '32']
+        args += ['-y', output_path]
+        return args
+
+    def render(self, input_path: str, output_path: str, preview: bool = False) -> bool:
+        """
+        Render the plan in a single ffmpeg pass.
+
+        Args:
+            input_path: Input video
+            output_path: Output video
+            preview: Render a short low-resolution preview
+        """
+        try:
+            info = FFmpegEngine.get_media_info(input_path)
+        except (RuntimeError, OSError):
+            info = None
+        frame_rate = info.frame_rate_fraction if info else None
+        has_audio = info.has_audio if info else True
+
+        args = self.compile(input_path, output_path, preview=preview, frame_rate=frame_rate,
+                            has_audio=has_audio)
+        duration = self.expected_duration(info.duration if info else None)
+        if preview and duration is not None:
+            duration = min(duration, EditPlan.PREVIEW_SECONDS)
+
+        script_path = None
+        graph_index = args.index('-filter_complex') + 1
+        if len(args[graph_index]) > EditPlan.MAX_INLINE_GRAPH:
+            script_path = f"{output_path}.filtergraph"
+            with open(script_path, 'w', encoding='utf-8') as f:
+                f.write(args[graph_index])
+            # "-/filter_complex file" on FFmpeg 7+, "-filter_complex_script file" before
+            option = FFmpegEngine.capabilities().option_from_file('filter_complex')
+            args[graph_index - 1:graph_index + 1] = [f'-{option}', script_path]
+
+        try:
+            FFmpegEngine.run_ffmpeg(args, duration=duration)
+            return True
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to render edit plan: {e.stderr.decode()}")
+        finally:
+            if script_path and os.path.exists(script_path):
+                os.remove(script_path)
+
+    @staticmethod
+    def _flush(statements: list[str], labels: tuple[str, str], video_filters: list[str],
+               audio_filters: list[str], name: str) -> tuple[str, str]:
+        """Close the pending filter chains into labelled pads; returns the labels to continue from."""
+        video_label, audio_label = labels
+        if video_filters:
+            statements.append(f"[{video_label}]{','.join(video_filters)}[{name}v]")
+            video_label = f'{name}v'
+        if audio_filters:
+            statements.append(f"[{audio_label}]{','.join(audio_filters)}[{name}a]")
+            audio_label = f'{name}a'
+        return video_label, audio_label
+
+    @staticmethod
+    def _step_filters(op: dict) -> tuple[list[str], list[str]]:
+        """Video and audio filters for one operation, applied on the running timeline."""
+        operation = op.get('operation')
+
+        if operation == 'cut_segment':
+            start, end = op.get('start', 0), op.get('end', 0)
+            return (
+                [f'trim=start={start}:end={end}', 'setpts=PTS-STARTPTS'],
+                [f'atrim=start={start}:end={end}', 'asetpts=PTS-STARTPTS'],
+            )
+
+        if operation == 'trim':
+            duration = op.get('duration', 60)
+            return [f'trim=duration={duration}'], [f'atrim=duration={duration}']
+
+        if operation == 'change_speed':
+            speed = op.get('speed', 1.0)
+            if speed <= 0:
+                raise ValueError("Speed must be positive")
+            return [f'setpts=PTS/{speed}'], SpeedEngine.atempo_chain(speed)
+
+        if operation == 'resize':
+            return [f"scale={op.get('width', 1280)}:{op.get('height', 720)}"], []
+
+        raise ValueError(f"Operation {operation} cannot be compiled into a filtergraph")
+
+    @staticmethod
+    def _step_suffix(op: dict) -> str:
+        """Output name fragment for one operation, matching the single-operation names."""
+        operation = op.get('operation')
+
+        if operation == 'remove_silence':
+            return 'no_silence'
+        if operation == 'cut_segment':
+            return f"cut_{int(op.get('start', 0))}_to_{int(op.get('end', 0))}"
+        if operation == 'trim':
+            return f"trimmed_{op.get('duration', 60)}s"
+        if operation == 'change_speed':
+            return f"speed_{op.get('speed', 1.0)}x"
+        if operation == 'resize':
+            return f"resized_{op.get('width', 1280)}x{op.get('height', 720)}"
+        return operation or 'unknown'
+
+
+class _SourceWindow:
+    """Maps the running timeline of a plan back onto the source while it is still linear."""
+
+    def __init__(self):
+        self.start = 0.0
+        self.end: Optional[float] = None
+        self.speed = 1.0
+        self.silence_removed = False
+
+    def apply(self, op: dict):
+        """Account for an operation applied to the running timeline."""
+        operation = op.get('operation')
+        if self.silence_removed:
+            return
+        if operation == 'cut_segment':
+            start, end = op.get('start', 0), op.get('end', 0)
+            self._limit(self.start + end * self.speed)
+            self.start += start * self.speed
+        elif operation == 'trim':
+            self._limit(self.start + op.get('duration', 60) * self.speed)
+        elif operation == 'change_speed':
+            self.speed *= op.get('speed', 1.0)
+
+    def to_running(self, intervals: list[tuple[float, float]]) -> list[tuple[float, float]]:
+        """Clip source intervals to the window and convert them to running time."""
+        running = []
+        for start, end in intervals:
+            start = max(start, self.start)
+            end = end if self.end is None else min(end, self.end)
+            if end > start:
+                running.append(((start - self.start) / self.speed, (end - self.start) / self.speed))
+        return running
+
+    def _limit(self, end: float):
+        self.end = end if self.end is None else min(self.end, end)
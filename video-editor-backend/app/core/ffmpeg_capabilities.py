@@ -0,0 +1,206 @@
+"""FFmpeg capability discovery, run once and kept in memory."""
+
+import re
+import subprocess
+import threading
+import time
+from typing import Optional
+
+
+# " V.F..D libx264   libx264 H.264 ... (codec h264)": type, threading and other flags
+ENCODER_LINE = re.compile(r'^\s*([VAS])([F.])([S.])[X.][B.][D.]\s+(\S+)\s+(.*)$')
+# " TSC scale   V->V   Scale the input video size ...": timeline, slice threading, command flags
+FILTER_LINE = re.compile(r'^\s*[T.]([S.])[C.]\s+(\S+)\s+(\S+->\S+)\s')
+CODEC_NAME = re.compile(r'\(codec (\w+)\)')
+# "ffmpeg version 7.0.2-static ..." or "ffmpeg version n6.1 ..."; git builds ("N-113...") have no release number
+RELEASE_VERSION = re.compile(r'version n?(\d+)\.')
+
+
+class FFmpegCapabilities:
+    """
+    What the installed ffmpeg can do: binaries, version, encoders, filters
+    and hardware acceleration methods.
+
+    Built from ``-version``, ``-encoders``, ``-filters`` and ``-hwaccels``
+    output, so callers can check for an encoder or filter without starting
+    a process.
+    """
+
+    def __init__(self, ffmpeg_path: str, ffprobe_path: str, installed: bool,
+                 version: Optional[str] = None, ffprobe_version: Optional[str] = None,
+                 encoders: Optional[dict[str, dict]] = None, filters: Optional[dict[str, dict]] = None,
+                 hwaccels: Optional[list[str]] = None):
+        self.ffmpeg_path = ffmpeg_path
+        self.ffprobe_path = ffprobe_path
+        self.installed = installed
+        self.version = version
+        self.ffprobe_version = ffprobe_version
+        # name -> {'type': 'video' | 'audio' | 'subtitle', 'codec': ..., 'threads': bool}
+        self.encoders = encoders or {}
+        # name -> {'io': 'V->V', 'threads': bool}
+        self.filters = filters or {}
+        self.hwaccels = hwaccels or []
+        self.discovered_at = time.time()
+
+    @staticmethod
+    def discover(ffmpeg_path: str, ffprobe_path: str) -> 'FFmpegCapabilities':
+        """Query both binaries once; a missing or broken binary gives installed=False."""
+        try:
+            version = _first_line(_query([ffmpeg_path, '-version']))
+            ffprobe_version = _first_line(_query([ffprobe_path, '-version']))
+            encoders = FFmpegCapabilities.parse_encoders(_query([ffmpeg_path, '-hide_banner', '-encoders']))
+            filters = FFmpegCapabilities.parse_filters(_query([ffmpeg_path, '-hide_banner', '-filters']))
+            hwaccels = FFmpegCapabilities.parse_hwaccels(_query([ffmpeg_path, '-hide_banner', '-hwaccels']))
+        except (subprocess.CalledProcessError, OSError):
+            return FFmpegCapabilities(ffmpeg_path, ffprobe_path, installed=False)
+
+        return FFmpegCapabilities(ffmpeg_path, ffprobe_path, True, version, ffprobe_version,
+                                  encoders, filters, hwaccels)
+
+    @staticmethod
+    def parse_encoders(output: str) -> dict[str, dict]:
+        """Parse ``ffmpeg -encoders`` output."""
+        types = {'V': 'video', 'A': 'audio', 'S': 'subtitle'}
+        encoders = {}
+        # The flag legend comes before a "------" line
+        listing = output.split('------', 1)[-1]
+        for line in listing.splitlines():
+            match = ENCODER_LINE.match(line)
+            if not match:
+                continue
+            kind, frame_threads, slice_threads, name, description = match.groups()
+            codec = CODEC_NAME.search(description)
+            encoders[name] = {
+                'type': types[kind],
+                'codec': codec.group(1) if codec else name,
+                'threads': frame_threads == 'F' or slice_threads == 'S',
+            }
+        return encoders
+
+    @staticmethod
+    def parse_filters(output: str) -> dict[str, dict]:
+        """Parse ``ffmpeg -filters`` output."""
+        filters = {}
+        for line in output.splitlines():
+            match = FILTER_LINE.match(line)
+            if match:
+                slice_threads, name, io = match.groups()
+                filters[name] = {'io': io, 'threads': slice_threads == 'S'}
+        return filters
+
+    @staticmethod
+    def parse_hwaccels(output: str) -> list[str]:
+        """Parse ``ffmpeg -hwaccels`` output."""
+        lines = [line.strip() for line in output.splitlines()]
+        return [line for line in lines if line and not line.endswith(':')]
+
+    @property
+    def major_version(self) -> Optional[int]:
+        """Major release number of ffmpeg, or None for git builds and unknown versions."""
+        match = RELEASE_VERSION.search(self.version or '')
+        return int(match.group(1)) if match else None
+
+    def option_from_file(self, option: str) -> str:
+        """
+        Option name that reads the value of ``option`` from a file.
+
+        FFmpeg 7 added the generic ``-/option file`` form and deprecated
+        ``-filter_script``/``-filter_complex_script``; older releases only
+        have the latter. Git builds are newer than any release and get the
+        generic form.
+        """
+        major = self.major_version
+        if major is not None and major < 7:
+            return f'{option}_script'
+        return f'/{option}'
+
+    def has_encoder(self, name: str) -> bool:
+        return name in self.encoders
+
+    def has_filter(self, name: str) -> bool:
+        return name in self.filters
+
+    def encoder_threads(self, name: str) -> bool:
+        """
+        Whether libavcodec can run an encoder on several threads (frame or slice threading).
+
+        Wrapped libraries such as libx264 thread internally and report False here.
+        """
+        return self.encoders.get(name, {}).get('threads', False)
+
+    def pick_encoder(self, *candidates: str) -> Optional[str]:
+        """First of the candidate encoders that this build has."""
+        for name in candidates:
+            if name in self.encoders:
+                return name
+        return None
+
+    def encoders_for(self, codec: str) -> list[str]:
+        """Every encoder producing a codec, e.g. 'h264' -> ['libx264', 'h264_nvenc']."""
+        return [name for name, encoder in self.encoders.items() if encoder['codec'] == codec]
+
+    def summary(self) -> dict:
+        """Compact description for the health check."""
+        return {
+            'installed': self.installed,
+            'ffmpeg': self.ffmpeg_path,
+            'ffprobe': self.ffprobe_path,
+            'version': self.version,
+            'encoders': len(self.encoders),
+            'filters': len(self.filters),
+            'hwaccels': self.hwaccels,
+            'discovered_at': self.discovered_at,
+        }
+
+
+class CapabilityRegistry:
+    """
+    Holds the discovered capabilities; discovery runs on first use (or at
+    startup) and again only when refreshed.
+
+    A failed discovery is retried after ``RETRY_SECONDS``, so ffmpeg
+    installed while the server runs is picked up without a restart.
+    """
+
+    RETRY_SECONDS = 30.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._capabilities: Optional[FFmpegCapabilities] = None
+
+    def get(self, ffmpeg_path: str, ffprobe_path: str) -> FFmpegCapabilities:
+        """Capabilities of the given binaries, discovering them if needed."""
+        capabilities = self._capabilities
+        if capabilities is not None and self._current(capabilities, ffmpeg_path, ffprobe_path):
+            return capabilities
+
+        with self._lock:
+            # Another request may have finished discovery while this one waited
+            capabilities = self._capabilities
+            if capabilities is None or not self._current(capabilities, ffmpeg_path, ffprobe_path):
+                capabilities = self._capabilities = FFmpegCapabilities.discover(ffmpeg_path, ffprobe_path)
+            return capabilities
+
+    def refresh(self, ffmpeg_path: str, ffprobe_path: str) -> FFmpegCapabilities:
+        """Discover the capabilities again, e.g. after ffmpeg was upgraded."""
+        with self._lock:
+            self._capabilities = FFmpegCapabilities.discover(ffmpeg_path, ffprobe_path)
+            return self._capabilities
+
+    def _current(self, capabilities: FFmpegCapabilities, ffmpeg_path: str, ffprobe_path: str) -> bool:
+        if (capabilities.ffmpeg_path, capabilities.ffprobe_path) != (ffmpeg_path, ffprobe_path):
+            return False
+        return capabilities.installed or time.time() - capabilities.discovered_at < self.RETRY_SECONDS
+
+
+def _query(cmd: list[str]) -> str:
+    result = subprocess.run(cmd, capture_output=True, check=True)
+    return result.stdout.decode(errors='replace')
+
+
+def _first_line(output: str) -> Optional[str]:
+    lines = output.strip().splitlines()
+    return lines[0].strip() if lines else None
+
+
+capability_registry = CapabilityRegistry()
@@ -1,9 +1,60 @@
 """FFmpeg video processing engine."""
 
 import subprocess
-import json
 import os
-from typing import Optional
+from typing import Callable, Optional
+
+from .ffmpeg_capabilities import FFmpegCapabilities, capability_registry
+from .media_info import MediaInfo, media_info_cache
+from .process_runner import run_process
+from .status_store import report_progress
+
+
+class FFmpegProgress:
+    """Incremental parser for ffmpeg ``-progress`` key=value output."""
+    
+    def __init__(self, duration: Optional[float] = None):
+        """
+        Args:
+            duration: Expected output duration in seconds, used for percent and ETA
+        """
+        self.duration = duration
+        self.out_time = 0.0
+        self.speed: Optional[float] = None
+    
+    def feed(self, line: str):
+        """Consume one line of progress output, reporting at the end of each block."""
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            return
+        
+        if key in ('out_time_us', 'out_time_ms'):
+            # Both keys are in microseconds
+            try:
+                self.out_time = max(0.0, int(value) / 1_000_000)
+            except ValueError:
+                pass
+        elif key == 'speed':
+            try:
+                self.speed = float(value.rstrip('x'))
+            except ValueError:
+                self.speed = None
+        elif key == 'progress':
+            self._report(finished=(value == 'end'))
+    
+    def _report(self, finished: bool):
+        fields = {'out_time': round(self.out_time, 3), 'speed': self.speed}
+        
+        if finished:
+            fields['progress'] = 100
+            fields['eta_seconds'] = 0
+        elif self.duration:
+            fields['progress'] = round(min(99.9, 100 * self.out_time / self.duration), 1)
+            if self.speed:
+                remaining = max(0.0, self.duration - self.out_time)
+                fields['eta_seconds'] = round(remaining / self.speed, 1)
+        
+        report_progress(**fields)
 
 
 class FFmpegEngine:
@@ -11,6 +62,9 @@ class FFmpegEngine:
     
     FFMPEG_CMD = None
     FFPROBE_CMD = None
+    # Encoder threads per ffmpeg run; the job queue sets it to its share of the cores
+    # so concurrent jobs don't each start one thread per core
+    THREADS = int(os.environ.get('VIDEO_EDITOR_FFMPEG_THREADS', 0)) or None
     
     @staticmethod
     def _find_ffmpeg():
@@ -35,35 +89,90 @@ class FFmpegEngine:
         FFmpegEngine.FFMPEG_CMD = "ffmpeg"
         FFmpegEngine.FFPROBE_CMD = "ffprobe"
     
+    @staticmethod
+    def capabilities(refresh: bool = False) -> FFmpegCapabilities:
+        """
+        Binaries, version, encoders, filters and hwaccels of the installed FFmpeg.
+        
+        Discovered once (at startup) and answered from memory afterwards.
+        
+        Args:
+            refresh: Discover again, e.g. after FFmpeg was upgraded
+        """
+        FFmpegEngine._find_ffmpeg()
+        if refresh:
+            return capability_registry.refresh(FFmpegEngine.FFMPEG_CMD, FFmpegEngine.FFPROBE_CMD)
+        return capability_registry.get(FFmpegEngine.FFMPEG_CMD, FFmpegEngine.FFPROBE_CMD)
+    
     @staticmethod
     def check_installed() -> bool:
         """Check if FFmpeg is installed."""
+        return FFmpegEngine.capabilities().installed
+    
+    @staticmethod
+    def get_version() -> str:
+        """Get the FFmpeg version line."""
+        return FFmpegEngine.capabilities().version or 'unknown'
+    
+    @staticmethod
+    def get_media_info(video_path: str) -> MediaInfo:
+        """
+        Get probed streams, codecs and duration of a file.
+        
+        ffprobe runs once per file; results are cached by path, size and
+        modification time in memory and on disk.
+        """
         FFmpegEngine._find_ffmpeg()
-        try:
-            subprocess.run([FFmpegEngine.FFMPEG_CMD, '-version'], capture_output=True, check=True)
-            subprocess.run([FFmpegEngine.FFPROBE_CMD, '-version'], capture_output=True, check=True)
-            return True
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return False
+        return media_info_cache.get(video_path, FFmpegEngine.FFPROBE_CMD)
+    
+    @staticmethod
+    def get_keyframes(video_path: str) -> MediaInfo:
+        """Get media info including the keyframe index of the first video stream (cached)."""
+        FFmpegEngine._find_ffmpeg()
+        return media_info_cache.get_keyframes(video_path, FFmpegEngine.FFPROBE_CMD)
     
     @staticmethod
     def get_duration(video_path: str) -> float:
         """Get video duration in seconds."""
-        FFmpegEngine._find_ffmpeg()
-        cmd = [
-            FFmpegEngine.FFPROBE_CMD,
-            '-v', 'error',
-            '-show_entries', 'format=duration',
-            '-of', 'json',
-            video_path
-        ]
-        
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            data = json.loads(result.stdout)
-            return float(data['format']['duration'])
-        except Exception as e:
+            duration = FFmpegEngine.get_media_info(video_path).duration
+        except (RuntimeError, OSError) as e:
             raise RuntimeError(f"Failed to get duration: {e}")
+        if duration is None:
+            raise RuntimeError(f"Failed to get duration: no duration reported for {video_path}")
+        return duration
+    
+    @staticmethod
+    def probe_duration(video_path: str) -> Optional[float]:
+        """Get video duration in seconds, or None if it cannot be probed."""
+        try:
+            return FFmpegEngine.get_duration(video_path)
+        except RuntimeError:
+            return None
+    
+    @staticmethod
+    def run_ffmpeg(args: list[str], duration: Optional[float] = None):
+        """
+        Run ffmpeg with live progress reporting.
+        
+        Progress is read from ``-progress pipe:1`` while ffmpeg runs and
+        published to the status of the video bound to the current job.
+        Unless the arguments set ``-threads``, the output is encoded with
+        ``THREADS`` threads.
+        
+        Args:
+            args: ffmpeg arguments (without the executable), ending with the output
+            duration: Expected output duration in seconds
+            
+        Raises:
+            subprocess.CalledProcessError: If ffmpeg fails
+        """
+        FFmpegEngine._find_ffmpeg()
+        if FFmpegEngine.THREADS and '-threads' not in args:
+            args = [*args[:-1], '-threads', str(FFmpegEngine.THREADS), args[-1]]
+        cmd = [FFmpegEngine.FFMPEG_CMD, '-nostats', '-progress', 'pipe:1', *args]
+        progress = FFmpegProgress(duration)
+        return run_process(cmd, check=True, on_stdout_line=progress.feed)
     
     @staticmethod
     def cut_segment(input_path: str, output_path: str, start: float, end: float) -> bool:
@@ -76,9 +185,7 @@ class FFmpegEngine:
             start: Start time in seconds
             end: End time in seconds
         """
-        FFmpegEngine._find_ffmpeg()
         cmd = [
-            FFmpegEngine.FFMPEG_CMD,
             '-i', input_path,
             '-ss', str(start),
             '-to', str(end),
@@ -88,7 +195,7 @@ class FFmpegEngine:
         ]
         
         try:
-            subprocess.run(cmd, capture_output=True, check=True)
+            FFmpegEngine.run_ffmpeg(cmd, duration=end - start)
             return True
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to cut segment: {e.stderr.decode()}")
@@ -111,9 +218,7 @@ class FFmpegEngine:
                 escaped_file = file.replace('\\', '\\\\')
                 f.write(f"file '{escaped_file}'\n")
         
-        FFmpegEngine._find_ffmpeg()
         cmd = [
-            FFmpegEngine.FFMPEG_CMD,
             '-f', 'concat',
             '-safe', '0',
             '-i', concat_file,
@@ -123,7 +228,7 @@ class FFmpegEngine:
         ]
         
         try:
-            subprocess.run(cmd, capture_output=True, check=True)
+            FFmpegEngine.run_ffmpeg(cmd)
             os.remove(concat_file)
             return True
         except subprocess.CalledProcessError as e:
@@ -141,9 +246,7 @@ class FFmpegEngine:
             subtitle_path: Subtitle file path
             output_path: Output video
         """
-        FFmpegEngine._find_ffmpeg()
         cmd = [
-            FFmpegEngine.FFMPEG_CMD,
             '-i', video_path,
             '-i', subtitle_path,
             '-c', 'copy',
@@ -153,7 +256,7 @@ class FFmpegEngine:
         ]
         
         try:
-            subprocess.run(cmd, capture_output=True, check=True)
+            FFmpegEngine.run_ffmpeg(cmd, duration=FFmpegEngine.probe_duration(video_path))
             return True
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to add subtitles: {e.stderr.decode()}")
@@ -161,38 +264,21 @@ class FFmpegEngine:
     @staticmethod
     def speed_video(input_path: str, output_path: str, speed: float) -> bool:
         """
-        Change video speed.
+        Change video speed (see ``SpeedEngine``: the video is copied when possible).
         
         Args:
             input_path: Input video
             output_path: Output video
             speed: Speed multiplier (0.5 = half speed, 2.0 = double speed)
         """
-        if speed <= 0:
-            raise ValueError("Speed must be positive")
-        
-        FFmpegEngine._find_ffmpeg()
-        cmd = [
-            FFmpegEngine.FFMPEG_CMD,
-            '-i', input_path,
-            '-filter:v', f'setpts=PTS/{speed}',
-            '-filter:a', f'atempo={speed}',
-            '-y',
-            output_path
-        ]
+        from .speed_engine import SpeedEngine
         
-        try:
-            subprocess.run(cmd, capture_output=True, check=True)
-            return True
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to change speed: {e.stderr.decode()}")
+        return SpeedEngine.change_speed(input_path, output_path, speed)
     
     @staticmethod
     def extract_audio(video_path: str, output_path: str) -> bool:
         """Extract audio from video."""
-        FFmpegEngine._find_ffmpeg()
         cmd = [
-            FFmpegEngine.FFMPEG_CMD,
             '-i', video_path,
             '-q:a', '9',
             '-n',
@@ -200,17 +286,53 @@ class FFmpegEngine:
         ]
         
         try:
-            subprocess.run(cmd, capture_output=True, check=True)
+            FFmpegEngine.run_ffmpeg(cmd, duration=FFmpegEngine.probe_duration(video_path))
             return True
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to extract audio: {e.stderr.decode()}")
     
+    @staticmethod
+    def extract_pcm(input_path: str, sample_rate: int = 16000,
+                    audio_filter: Optional[str] = None,
+                    on_chunk: Optional[Callable[[bytes], None]] = None,
+                    on_stderr_line: Optional[Callable[[str], None]] = None,
+                    progress_period: Optional[float] = None) -> tuple[Optional[bytes], str]:
+        """
+        Decode the audio track to mono 16-bit little-endian PCM through a pipe.
+        
+        Args:
+            input_path: Input media path
+            sample_rate: Output sample rate
+            audio_filter: Optional filter applied before resampling; analysis
+                filters (e.g. silencedetect) log their results to stderr
+            on_chunk: Receive the PCM incrementally instead of as one buffer
+            on_stderr_line: Receive ffmpeg's log lines (e.g. filter results) as they are written
+            progress_period: Also write ``-progress`` blocks to stderr every
+                this many seconds; an ``out_time_us`` line follows the filter
+                logs of everything before it
+            
+        Returns:
+            Tuple of (raw PCM bytes, or None when streamed to on_chunk, ffmpeg stderr)
+        """
+        FFmpegEngine._find_ffmpeg()
+        cmd = [FFmpegEngine.FFMPEG_CMD, '-nostdin', '-nostats']
+        if progress_period:
+            cmd += ['-progress', 'pipe:2', '-stats_period', str(progress_period)]
+        cmd += ['-i', input_path, '-vn']
+        if audio_filter:
+            cmd += ['-af', audio_filter]
+        cmd += ['-ac', '1', '-ar', str(sample_rate), '-f', 's16le', 'pipe:1']
+        
+        try:
+            result = run_process(cmd, check=True, on_stdout_chunk=on_chunk, on_stderr_line=on_stderr_line)
+            return result.stdout, result.stderr.decode(errors='replace')
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to extract audio: {e.stderr.decode(errors='replace')}")
+    
     @staticmethod
     def resize_video(input_path: str, output_path: str, width: int, height: int) -> bool:
         """Resize video."""
-        FFmpegEngine._find_ffmpeg()
         cmd = [
-            FFmpegEngine.FFMPEG_CMD,
             '-i', input_path,
             '-vf', f'scale={width}:{height}',
             '-y',
@@ -218,7 +340,7 @@ class FFmpegEngine:
         ]
         
         try:
-            subprocess.run(cmd, capture_output=True, check=True)
+            FFmpegEngine.run_ffmpeg(cmd, duration=FFmpegEngine.probe_duration(input_path))
             return True
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Failed to resize: {e.stderr.decode()}")
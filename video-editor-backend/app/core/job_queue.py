@@ -0,0 +1,182 @@
+"""Bounded asynchronous job queue for long-running video operations."""
+
+import asyncio
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+from .ffmpeg_engine import FFmpegEngine
+from .process_runner import ProcessGroup, set_process_group
+
+
+class QueueFullError(RuntimeError):
+    """Raised when too many jobs are waiting to run."""
+
+
+class Job:
+    """A single queued video operation."""
+
+    def __init__(self, video_id: str, operation: str):
+        self.job_id = str(uuid.uuid4())
+        self.video_id = video_id
+        self.operation = operation
+        self.status = 'queued'
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.processes = ProcessGroup()
+        self.task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        """Whether the job has reached a terminal state."""
+        return self.status in ('complete', 'error', 'cancelled')
+
+    def to_dict(self) -> dict:
+        """Serialize job state for API responses."""
+        result = self.result or {}
+        return {
+            'job_id': self.job_id,
+            'video_id': self.video_id,
+            'operation': self.operation,
+            'status': self.status,
+            'message': result.get('message'),
+            'output_path': result.get('output_path'),
+            'cached': result.get('cached'),
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    Runs blocking operations on a bounded pool of worker threads.
+
+    Each job runs in its own thread so the event loop stays responsive;
+    the engines' subprocesses are registered with the job's process group
+    so a cancelled job terminates its ffmpeg/whisper children. Every ffmpeg
+    encoder already uses several threads, so only a few jobs run at once and
+    each gets an equal share of the cores.
+    """
+
+    MAX_CONCURRENT_JOBS = int(os.environ.get('VIDEO_EDITOR_MAX_JOBS', 0)) or 2
+    MAX_PENDING_JOBS = int(os.environ.get('VIDEO_EDITOR_MAX_PENDING_JOBS', 100))
+    MAX_FINISHED_JOBS = 500
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_pending: Optional[int] = None):
+        self.max_concurrent = max_concurrent or JobQueue.MAX_CONCURRENT_JOBS
+        self.max_pending = max_pending or JobQueue.MAX_PENDING_JOBS
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        if FFmpegEngine.THREADS is None:
+            FFmpegEngine.THREADS = max(1, (os.cpu_count() or 1) // self.max_concurrent)
+        self._jobs: OrderedDict[str, Job] = OrderedDict()
+        self._listeners: list[Callable[[Job], None]] = []
+
+    def add_listener(self, listener: Callable[[Job], None]):
+        """Register a callback invoked on every job state change."""
+        self._listeners.append(listener)
+
+    def submit(self, video_id: str, operation: str, func: Callable[..., dict], *args: Any) -> Job:
+        """
+        Enqueue a blocking operation.
+
+        Args:
+            video_id: Video the job operates on
+            operation: Operation name
+            func: Blocking callable returning a result dict
+            *args: Arguments passed to func
+
+        Returns:
+            The queued Job
+        """
+        pending = sum(1 for job in self._jobs.values() if job.status == 'queued')
+        if pending >= self.max_pending:
+            raise QueueFullError(f"Job queue is full ({pending} jobs waiting)")
+
+        job = Job(video_id, operation)
+        self._jobs[job.job_id] = job
+        self._prune()
+        self._notify(job)
+        job.task = asyncio.create_task(self._run(job, func, args))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by ID."""
+        return self._jobs.get(job_id)
+
+    def list_jobs(self, video_id: Optional[str] = None) -> list[Job]:
+        """List jobs, optionally filtered by video."""
+        return [job for job in self._jobs.values() if video_id is None or job.video_id == video_id]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            True if the job was cancelled, False if it was unknown or already finished
+        """
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return False
+
+        job.processes.cancel()
+        if job.status == 'queued' and job.task is not None:
+            job.task.cancel()
+        return True
+
+    async def shutdown(self):
+        """Cancel every unfinished job and wait for the workers to stop."""
+        tasks = []
+        for job in self._jobs.values():
+            if not job.done:
+                self.cancel(job.job_id)
+                if job.task is not None:
+                    tasks.append(job.task)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, job: Job, func: Callable[..., dict], args: tuple):
+        try:
+            async with self._semaphore:
+                if job.processes.cancelled:
+                    raise asyncio.CancelledError()
+                job.status = 'running'
+                job.started_at = time.time()
+                self._notify(job)
+
+                # The worker thread inherits this task's context, and with it the process group
+                set_process_group(job.processes)
+                job.result = await asyncio.to_thread(func, *args)
+                job.status = 'cancelled' if job.processes.cancelled else 'complete'
+        except asyncio.CancelledError:
+            job.status = 'cancelled'
+        except Exception as e:
+            if job.processes.cancelled:
+                job.status = 'cancelled'
+            else:
+                job.status = 'error'
+                job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            self._notify(job)
+
+    def _notify(self, job: Job):
+        for listener in self._listeners:
+            try:
+                listener(job)
+            except Exception as e:
+                print(f"Job listener failed: {e}")
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - JobQueue.MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+
+job_queue = JobQueue()
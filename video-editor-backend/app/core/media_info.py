@@ -0,0 +1,338 @@
+"""Probe-once media information cache."""
+
+import bisect
+import hashlib
+import json
+import os
+import statistics
+import subprocess
+import threading
+from typing import Optional
+
+from .process_runner import run_process
+from ..utils.file_manager import FileManager
+
+
+class MediaInfo:
+    """Parsed ffprobe result (format, streams, keyframe spacing) for one file."""
+
+    def __init__(self, path: str, format: dict, streams: list[dict],
+                 keyframe_interval: Optional[float] = None,
+                 keyframes: Optional[list[float]] = None,
+                 gop_sizes: Optional[list[int]] = None):
+        self.path = path
+        self.format = format
+        self.streams = streams
+        self.keyframe_interval = keyframe_interval
+        # Full keyframe index (times and frames per GOP), probed on demand
+        self.keyframes = keyframes
+        self.gop_sizes = gop_sizes
+
+    @property
+    def duration(self) -> Optional[float]:
+        """Container duration in seconds."""
+        value = self.format.get('duration')
+        return float(value) if value not in (None, 'N/A') else None
+
+    @property
+    def video(self) -> Optional[dict]:
+        """First video stream (ignoring attached cover art)."""
+        for stream in self.streams:
+            if stream.get('codec_type') == 'video' and not stream.get('disposition', {}).get('attached_pic'):
+                return stream
+        return None
+
+    @property
+    def audio(self) -> Optional[dict]:
+        """First audio stream."""
+        for stream in self.streams:
+            if stream.get('codec_type') == 'audio':
+                return stream
+        return None
+
+    @property
+    def has_video(self) -> bool:
+        return self.video is not None
+
+    @property
+    def has_audio(self) -> bool:
+        return self.audio is not None
+
+    @property
+    def video_codec(self) -> Optional[str]:
+        return self.video.get('codec_name') if self.video else None
+
+    @property
+    def audio_codec(self) -> Optional[str]:
+        return self.audio.get('codec_name') if self.audio else None
+
+    @property
+    def width(self) -> Optional[int]:
+        return self.video.get('width') if self.video else None
+
+    @property
+    def height(self) -> Optional[int]:
+        return self.video.get('height') if self.video else None
+
+    @property
+    def frame_rate(self) -> Optional[float]:
+        """Average video frame rate in frames per second."""
+        if not self.video:
+            return None
+        return _parse_rate(self.video.get('avg_frame_rate')) or _parse_rate(self.video.get('r_frame_rate'))
+
+    @property
+    def frame_rate_fraction(self) -> Optional[str]:
+        """Frame rate as ffprobe reports it (e.g. '30000/1001'), exact for ``-r``."""
+        if not self.video:
+            return None
+        for key in ('avg_frame_rate', 'r_frame_rate'):
+            if _parse_rate(self.video.get(key)):
+                return self.video[key]
+        return None
+
+    @property
+    def sample_rate(self) -> Optional[int]:
+        if not self.audio or not self.audio.get('sample_rate'):
+            return None
+        return int(self.audio['sample_rate'])
+
+    @property
+    def channels(self) -> Optional[int]:
+        return self.audio.get('channels') if self.audio else None
+
+    def frames_between(self, start: float, end: float) -> Optional[int]:
+        """Number of frames in the GOPs whose keyframes lie in [start, end)."""
+        if self.keyframes is None or self.gop_sizes is None:
+            return None
+        return sum(
+            size for keyframe, size in zip(self.keyframes, self.gop_sizes)
+            if start <= keyframe < end
+        )
+
+    def to_dict(self) -> dict:
+        """Serializable form (also used for the on-disk cache)."""
+        return {
+            'path': self.path,
+            'format': self.format,
+            'streams': self.streams,
+            'keyframe_interval': self.keyframe_interval,
+            'keyframes': self.keyframes,
+            'gop_sizes': self.gop_sizes,
+        }
+
+    def summary(self) -> dict:
+        """Compact description for the metadata index and API responses."""
+        return {
+            'duration': self.duration,
+            'format': self.format.get('format_name'),
+            'video_codec': self.video_codec,
+            'audio_codec': self.audio_codec,
+            'width': self.width,
+            'height': self.height,
+            'frame_rate': self.frame_rate,
+            'sample_rate': self.sample_rate,
+            'channels': self.channels,
+            'keyframe_interval': self.keyframe_interval,
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> 'MediaInfo':
+        return MediaInfo(data['path'], data['format'], data['streams'],
+                         data.get('keyframe_interval'), data.get('keyframes'), data.get('gop_sizes'))
+
+
+class MediaInfoCache:
+    """
+    Runs ffprobe once per file and caches the result.
+
+    Entries are keyed by path, size and modification time, held in memory
+    and persisted as JSON so restarts do not re-probe unchanged files.
+    """
+
+    CACHE_DIR = os.path.join(FileManager.OUTPUT_DIR, '.probe')
+
+    # Seconds of packets read to estimate the keyframe interval
+    KEYFRAME_PROBE_SECONDS = 30
+
+    def __init__(self, cache_dir: Optional[str] = None):
+        self.cache_dir = cache_dir or MediaInfoCache.CACHE_DIR
+        self._lock = threading.Lock()
+        self._entries: dict[tuple, MediaInfo] = {}
+
+    def get(self, path: str, ffprobe_cmd: str = 'ffprobe') -> MediaInfo:
+        """
+        Get media info for a file, probing it only if it is new or changed.
+
+        Args:
+            path: Media file path
+            ffprobe_cmd: ffprobe executable
+
+        Raises:
+            RuntimeError: If the file cannot be probed
+        """
+        key = MediaInfoCache._key(path)
+
+        with self._lock:
+            info = self._entries.get(key)
+        if info is not None:
+            return info
+
+        disk_path = self._disk_path(key)
+        info = self._load(disk_path)
+        if info is None:
+            info = MediaInfoCache.probe(path, ffprobe_cmd)
+            self._save(disk_path, info)
+
+        with self._lock:
+            self._entries[key] = info
+        return info
+
+    def get_keyframes(self, path: str, ffprobe_cmd: str = 'ffprobe') -> MediaInfo:
+        """
+        Get media info with its keyframe index filled in.
+
+        The index is read from packet flags (no decoding) the first time it
+        is needed and stored with the file's cached media info.
+
+        Raises:
+            RuntimeError: If the file cannot be probed
+        """
+        info = self.get(path, ffprobe_cmd)
+        if info.keyframes is None or info.gop_sizes is None:
+            info.keyframes, info.gop_sizes = MediaInfoCache.probe_keyframes(path, ffprobe_cmd)
+            self._save(self._disk_path(MediaInfoCache._key(path)), info)
+        return info
+
+    def invalidate(self, path: str):
+        """Forget cached entries of a path."""
+        path = os.path.abspath(path)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == path]:
+                del self._entries[key]
+
+    @staticmethod
+    def probe(path: str, ffprobe_cmd: str = 'ffprobe') -> MediaInfo:
+        """Run ffprobe once for format, streams and the first packets' keyframe flags."""
+        cmd = [
+            ffprobe_cmd,
+            '-v', 'error',
+            '-show_format',
+            '-show_streams',
+            '-show_entries', 'packet=stream_index,pts_time,flags',
+            '-read_intervals', f'%+{MediaInfoCache.KEYFRAME_PROBE_SECONDS}',
+            '-of', 'json',
+            path
+        ]
+
+        try:
+            result = run_process(cmd, check=True, text=True)
+            data = json.loads(result.stdout)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to probe {path}: {e.stderr}")
+        except (FileNotFoundError, ValueError) as e:
+            raise RuntimeError(f"Failed to probe {path}: {e}")
+
+        info = MediaInfo(path, data.get('format', {}), data.get('streams', []))
+        if info.video is not None:
+            info.keyframe_interval = _keyframe_interval(data.get('packets', []), info.video.get('index'))
+        return info
+
+    @staticmethod
+    def probe_keyframes(path: str, ffprobe_cmd: str = 'ffprobe') -> tuple[list[float], list[int]]:
+        """
+        Read the keyframe index of the first video stream from packet flags.
+
+        Returns:
+            Sorted keyframe times and the number of frames in each GOP
+        """
+        cmd = [
+            ffprobe_cmd,
+            '-v', 'error',
+            '-select_streams', 'v:0',
+            '-show_entries', 'packet=pts_time,flags',
+            '-of', 'csv=p=0',
+            path
+        ]
+
+        try:
+            result = run_process(cmd, check=True, text=True)
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to read keyframes of {path}: {e.stderr}")
+        except FileNotFoundError as e:
+            raise RuntimeError(f"Failed to read keyframes of {path}: {e}")
+
+        frames = []
+        keyframes = set()
+        for line in result.stdout.splitlines():
+            pts_time, _, flags = line.partition(',')
+            try:
+                pts = float(pts_time)
+            except ValueError:
+                continue
+            frames.append(pts)
+            if 'K' in flags:
+                keyframes.add(pts)
+
+        frames.sort()
+        keyframes = sorted(keyframes)
+        bounds = [bisect.bisect_left(frames, k) for k in keyframes] + [len(frames)]
+        gop_sizes = [b - a for a, b in zip(bounds, bounds[1:])]
+        return keyframes, gop_sizes
+
+    @staticmethod
+    def _key(path: str) -> tuple:
+        stat = os.stat(path)
+        return os.path.abspath(path), stat.st_size, stat.st_mtime_ns
+
+    def _disk_path(self, key: tuple) -> str:
+        digest = hashlib.sha1(repr(key).encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _load(self, disk_path: str) -> Optional[MediaInfo]:
+        try:
+            with open(disk_path, encoding='utf-8') as f:
+                return MediaInfo.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _save(self, disk_path: str, info: MediaInfo):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{disk_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(info.to_dict(), f)
+            os.replace(tmp_path, disk_path)
+        except OSError:
+            pass
+
+
+def _parse_rate(value: Optional[str]) -> Optional[float]:
+    """Parse an ffprobe rational like '30000/1001'."""
+    if not value:
+        return None
+    num, _, den = value.partition('/')
+    try:
+        rate = float(num) / float(den or 1)
+    except (ValueError, ZeroDivisionError):
+        return None
+    return rate or None
+
+
+def _keyframe_interval(packets: list[dict], video_index: Optional[int]) -> Optional[float]:
+    """Median spacing in seconds between video keyframes."""
+    times = []
+    for packet in packets:
+        if packet.get('stream_index') != video_index or 'K' not in packet.get('flags', ''):
+            continue
+        try:
+            times.append(float(packet['pts_time']))
+        except (KeyError, ValueError):
+            continue
+
+    times.sort()
+    gaps = [b - a for a, b in zip(times, times[1:]) if b > a]
+    return round(statistics.median(gaps), 3) if gaps else None
+
+
+media_info_cache = MediaInfoCache()
@@ -0,0 +1,161 @@
+"""Cancellable subprocess execution for engine commands."""
+
+import contextvars
+import subprocess
+import threading
+from typing import Callable, Optional
+
+
+class ProcessCancelled(RuntimeError):
+    """Raised when a command is interrupted because its job was cancelled."""
+
+
+class ProcessGroup:
+    """Tracks the child processes started on behalf of one job."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._processes: set[subprocess.Popen] = set()
+        self.cancelled = False
+
+    def add(self, process: subprocess.Popen):
+        """Register a running process, killing it at once if already cancelled."""
+        with self._lock:
+            self._processes.add(process)
+            cancelled = self.cancelled
+        if cancelled:
+            _terminate(process)
+
+    def discard(self, process: subprocess.Popen):
+        """Forget a finished process."""
+        with self._lock:
+            self._processes.discard(process)
+
+    def cancel(self):
+        """Mark the group cancelled and terminate every running process."""
+        with self._lock:
+            self.cancelled = True
+            processes = list(self._processes)
+        for process in processes:
+            _terminate(process)
+
+
+_current_group: contextvars.ContextVar[Optional[ProcessGroup]] = contextvars.ContextVar(
+    'process_group', default=None
+)
+
+
+def set_process_group(group: Optional[ProcessGroup]) -> contextvars.Token:
+    """Attach a process group to the current context (inherited by worker threads)."""
+    return _current_group.set(group)
+
+
+def get_process_group() -> Optional[ProcessGroup]:
+    """Return the process group of the current context, if any."""
+    return _current_group.get()
+
+
+def check_cancelled():
+    """Raise ProcessCancelled if the current job has been cancelled."""
+    group = _current_group.get()
+    if group is not None and group.cancelled:
+        raise ProcessCancelled("Job cancelled")
+
+
+# Bytes per read when stdout is streamed as raw chunks
+STDOUT_CHUNK_SIZE = 1024 * 1024
+
+
+def run_process(cmd: list[str], check: bool = False, text: bool = False,
+                on_stdout_line: Optional[Callable[[str], None]] = None,
+                on_stdout_chunk: Optional[Callable[[bytes], None]] = None,
+                on_stderr_line: Optional[Callable[[str], None]] = None) -> subprocess.CompletedProcess:
+    """
+    Run a command with captured output, like ``subprocess.run(capture_output=True)``.
+
+    The process is registered with the current job's process group so that
+    cancelling the job terminates it.
+
+    Args:
+        cmd: Command and arguments
+        check: Raise CalledProcessError on a non-zero exit code
+        text: Decode stdout/stderr as text
+        on_stdout_line: Called with each decoded stdout line while the process
+            runs; stdout is then consumed and not returned
+        on_stdout_chunk: Called with raw stdout chunks (binary output such as
+            piped PCM), so large outputs are never held in memory at once
+        on_stderr_line: Called with each decoded stderr line while the process
+            runs (e.g. filter logs); stderr is still returned in full
+
+    Returns:
+        CompletedProcess with captured stdout and stderr
+    """
+    check_cancelled()
+    group = _current_group.get()
+
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=text)
+    if group is not None:
+        group.add(process)
+    try:
+        if on_stdout_chunk is not None:
+            stdout, stderr = _stream_stdout(process, on_stdout_chunk, on_stderr_line, text, chunked=True)
+        elif on_stdout_line is not None or on_stderr_line is not None:
+            stdout, stderr = _stream_stdout(process, on_stdout_line, on_stderr_line, text)
+        else:
+            stdout, stderr = process.communicate()
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    finally:
+        if group is not None:
+            group.discard(process)
+
+    check_cancelled()
+    if check and process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, cmd, stdout, stderr)
+    return subprocess.CompletedProcess(cmd, process.returncode, stdout, stderr)
+
+
+def _stream_stdout(process: subprocess.Popen, on_output: Optional[Callable],
+                   on_stderr_line: Optional[Callable[[str], None]] = None, text: bool = False,
+                   chunked: bool = False) -> tuple:
+    """Feed stdout lines (or raw chunks) to a callback while stderr is read on a helper thread."""
+    stderr_chunks = []
+
+    def read_stderr():
+        if on_stderr_line is None:
+            stderr_chunks.append(process.stderr.read())
+            return
+        for line in process.stderr:
+            stderr_chunks.append(line)
+            on_stderr_line(line.decode(errors='replace') if isinstance(line, bytes) else line)
+
+    # The callback runs in the caller's context, so it can report progress for the job
+    reader = threading.Thread(target=contextvars.copy_context().run, args=(read_stderr,), daemon=True)
+    reader.start()
+
+    stdout = None
+    if on_output is None:
+        # Only stderr is streamed; stdout is captured as usual
+        stdout = process.stdout.read()
+    elif chunked:
+        for chunk in iter(lambda: process.stdout.read(STDOUT_CHUNK_SIZE), b''):
+            on_output(chunk)
+    else:
+        for line in process.stdout:
+            on_output(line.decode(errors='replace') if isinstance(line, bytes) else line)
+    process.wait()
+    reader.join()
+
+    return stdout, ('' if text else b'').join(stderr_chunks)
+
+
+def _terminate(process: subprocess.Popen):
+    """Terminate a process without waiting; its runner thread reaps it."""
+    if process.poll() is not None:
+        return
+    try:
+        process.terminate()
+    except OSError:
+        pass
@@ -0,0 +1,243 @@
+"""Content-addressed cache of rendered outputs."""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from .ffmpeg_engine import FFmpegEngine
+from ..utils.file_manager import FileManager
+
+
+class RenderCache:
+    """
+    Caches rendered artifacts keyed by what produced them.
+
+    The key is a hash of the input's content, the normalized operation
+    parameters and the FFmpeg version, so identical requests on identical
+    uploads (under any video ID) reuse the earlier output. Entries live in
+    ``outputs/.cache`` and are hardlinked to the per-video output names.
+    Least recently used entries are evicted once the cache exceeds its size
+    bound; the per-video outputs linked to an evicted entry are removed
+    with it, since the disk space is only freed once every link is gone.
+    Renders of the same key are serialized, so concurrent misses render once.
+    """
+
+    CACHE_DIR = os.path.join(FileManager.OUTPUT_DIR, '.cache')
+    MAX_BYTES = int(os.environ.get('VIDEO_EDITOR_CACHE_MAX_BYTES', 20 * 1024 ** 3))
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or RenderCache.CACHE_DIR
+        # Per-video outputs hardlinked to the entries live next to the cache directory
+        self.outputs_dir = os.path.dirname(os.path.abspath(self.cache_dir))
+        self.max_bytes = max_bytes or RenderCache.MAX_BYTES
+        self._lock = threading.Lock()
+        # key -> [lock, holders and waiters] for renders in flight
+        self._key_locks: dict[str, list] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(input_hash: str, params: dict, ffmpeg_version: str) -> str:
+        """Build a cache key from the input hash, operation parameters and FFmpeg version."""
+        payload = json.dumps(
+            {'input': input_hash, 'params': RenderCache._normalize(params), 'ffmpeg': ffmpeg_version},
+            sort_keys=True,
+            separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def key_for(self, input_path: str, params: dict) -> str:
+        """Build the cache key for rendering an input file with the given parameters."""
+        return RenderCache.make_key(
+            FileManager.get_content_hash(input_path),
+            params,
+            FFmpegEngine.get_version()
+        )
+
+    def get_or_render(self, input_path: str, params: dict, output_path: str,
+                      render: Callable[[], object]) -> bool:
+        """
+        Produce output_path from the cache, or render it and cache the result.
+
+        Args:
+            input_path: Input file the output is derived from
+            params: Operation parameters (anything JSON-serializable)
+            output_path: Per-video output path to create
+            render: Callable that writes output_path
+
+        Returns:
+            True on a cache hit, False if the output was rendered
+        """
+        extension = os.path.splitext(output_path)[1]
+        key = self.key_for(input_path, params)
+
+        # A concurrent miss on the same key waits here and then links the first render
+        with self._key_lock(key):
+            if self.materialize(key, extension, output_path):
+                return True
+
+            # Never render into an existing file: it may be a hardlink of another cache entry
+            FileManager.cleanup_file(output_path)
+            render()
+            self.store(key, extension, output_path)
+            return False
+
+    def materialize(self, key: str, extension: str, output_path: str) -> bool:
+        """Link a cached entry to output_path. Returns False on a cache miss."""
+        entry = self._entry_path(key, extension)
+        with self._lock:
+            if not os.path.exists(entry):
+                self.misses += 1
+                return False
+            self.hits += 1
+            # Mark as recently used
+            os.utime(entry)
+
+        if os.path.exists(output_path) and os.path.samefile(entry, output_path):
+            return True
+        _link_or_copy(entry, output_path)
+        return True
+
+    def store(self, key: str, extension: str, output_path: str):
+        """Add a freshly rendered output to the cache and enforce the size bound."""
+        if not os.path.exists(output_path):
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entry = self._entry_path(key, extension)
+        with self._lock:
+            if not os.path.exists(entry):
+                _link_or_copy(output_path, entry)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove least recently used entries until the cache fits in max_bytes.
+
+        Outputs hardlinked to an evicted entry are removed too; entries whose
+        key is being rendered or linked right now are skipped.
+        """
+        with self._lock:
+            entries = self._entries()
+            total = sum(size for _, size, _ in entries)
+            evicted = set()
+            for path, size, _ in sorted(entries, key=lambda e: e[2]):
+                if total <= self.max_bytes:
+                    break
+                key = os.path.splitext(os.path.basename(path))[0]
+                if key in self._key_locks:
+                    continue
+                try:
+                    stat = os.stat(path)
+                    os.remove(path)
+                except OSError:
+                    continue
+                if stat.st_nlink > 1:
+                    evicted.add((stat.st_dev, stat.st_ino))
+                total -= size
+                self.evictions += 1
+
+            if evicted:
+                self._remove_links(evicted)
+
+    def clear(self):
+        """Remove every cache entry."""
+        with self._lock:
+            for path, _, _ in self._entries():
+                FileManager.cleanup_file(path)
+
+    def stats(self) -> dict:
+        """Cache hit/miss counters and current size."""
+        with self._lock:
+            entries = self._entries()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+                'max_bytes': self.max_bytes,
+            }
+
+    @contextmanager
+    def _key_lock(self, key: str):
+        """Hold the render lock of one cache key."""
+        with self._lock:
+            holder = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            holder[1] += 1
+        try:
+            with holder[0]:
+                yield
+        finally:
+            with self._lock:
+                holder[1] -= 1
+                if not holder[1]:
+                    del self._key_locks[key]
+
+    def _remove_links(self, inodes: set[tuple[int, int]]):
+        """Remove the per-video outputs that are hardlinks of evicted entries."""
+        try:
+            files = list(os.scandir(self.outputs_dir))
+        except OSError:
+            return
+        for entry in files:
+            try:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if (stat.st_dev, stat.st_ino) in inodes:
+                FileManager.cleanup_file(entry.path)
+
+    def _entry_path(self, key: str, extension: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}{extension}")
+
+    def _entries(self) -> list[tuple[str, int, float]]:
+        """(path, size, last use) of every cache entry."""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_size, stat.st_mtime))
+        return entries
+
+    @staticmethod
+    def _normalize(value):
+        """Normalize parameters so equivalent requests produce the same key."""
+        if isinstance(value, dict):
+            return {str(k): RenderCache._normalize(v) for k, v in value.items() if k != 'raw_command'}
+        if isinstance(value, (list, tuple)):
+            return [RenderCache._normalize(v) for v in value]
+        if isinstance(value, bool) or value is None or isinstance(value, str):
+            return value
+        if isinstance(value, (int, float)):
+            # 2, 2.0 and 2.00000001 all render the same output
+            return repr(round(float(value), 6))
+        return str(value)
+
+
+def _link_or_copy(source: str, destination: str):
+    """Hardlink source to destination, copying when linking is not possible."""
+    tmp = f"{destination}.link.tmp"
+    FileManager.cleanup_file(tmp)
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copy2(source, tmp)
+    os.replace(tmp, destination)
+
+
+render_cache = RenderCache()
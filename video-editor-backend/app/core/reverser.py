@@ -0,0 +1,181 @@
+"""Chunked, parallel video reversal with bounded memory."""
+
+import contextvars
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Optional
+
+from .ffmpeg_engine import FFmpegEngine
+from .media_info import MediaInfo
+from .process_runner import run_process
+from .smart_cut import SmartCut
+from .status_store import report_progress
+
+
+class ChunkedReverser:
+    """
+    Reverses a video a few seconds at a time.
+
+    ffmpeg's ``reverse``/``areverse`` filters buffer the whole input, so
+    reversing an hour-long source at once needs every decoded frame in
+    RAM. Instead the source is split into chunks, at keyframes where
+    possible so no chunk decodes frames it throws away, each sized so its
+    decoded frames fit in ``MAX_CHUNK_BYTES``. Chunks are reversed
+    independently on a thread pool and joined in reverse order. Video parts
+    are encoded with identical settings and stream-copied together; audio
+    parts are kept as PCM so the joins are sample-exact, and the audio is
+    encoded once at the end.
+    """
+
+    # Decoded frames buffered by one chunk's reverse filter
+    MAX_CHUNK_BYTES = 256 * 1024 * 1024
+    # Chunks shorter than this aren't worth an extra ffmpeg process
+    MIN_CHUNK_SECONDS = 1.0
+    # Used when the source has no video to size chunks by
+    AUDIO_CHUNK_SECONDS = 60.0
+
+    @staticmethod
+    def workers() -> int:
+        """Concurrent chunks; peak memory is about workers * MAX_CHUNK_BYTES."""
+        return max(1, min(4, (os.cpu_count() or 1) // 2))
+
+    @staticmethod
+    def chunk_seconds(info: MediaInfo) -> float:
+        """Longest chunk whose decoded frames fit in MAX_CHUNK_BYTES, in whole frames."""
+        video = info.video
+        if not video or not info.frame_rate or not video.get('width') or not video.get('height'):
+            return ChunkedReverser.AUDIO_CHUNK_SECONDS
+        # 4:2:0 frames are 1.5 bytes per pixel; higher bit depths and 4:4:4 take up to 6
+        bytes_per_pixel = 1.5 if video.get('pix_fmt', 'yuv420p') in ('yuv420p', 'yuvj420p', 'nv12') else 6
+        frame_bytes = int(video['width']) * int(video['height']) * bytes_per_pixel
+        # Whole frames, so chunks split between GOPs still start on a frame
+        frames = int(ChunkedReverser.MAX_CHUNK_BYTES // frame_bytes)
+        return max(ChunkedReverser.MIN_CHUNK_SECONDS, frames / info.frame_rate)
+
+    @staticmethod
+    def plan(keyframes: list[float], duration: float, max_seconds: float) -> list[tuple[float, float]]:
+        """
+        Split [0, duration] into chunks no longer than max_seconds.
+
+        Each chunk ends at the last keyframe that keeps it within the limit;
+        a GOP longer than the limit is split mid-GOP.
+
+        Returns:
+            List of (start, end) in source order
+        """
+        chunks = []
+        start = 0.0
+        while duration - start > 1e-3:
+            limit = start + max_seconds
+            if limit >= duration:
+                chunks.append((start, duration))
+                break
+            candidates = [k for k in keyframes if start + ChunkedReverser.MIN_CHUNK_SECONDS <= k <= limit]
+            end = candidates[-1] if candidates else limit
+            chunks.append((start, end))
+            start = end
+        return chunks
+
+    @staticmethod
+    def reverse(input_path: str, output_path: str, workers: Optional[int] = None) -> bool:
+        """
+        Reverse a video and its audio.
+
+        Args:
+            input_path: Input video
+            output_path: Output video
+            workers: Concurrent chunks (default: ``workers()``)
+        """
+        info = FFmpegEngine.get_keyframes(input_path)
+        if not info.duration:
+            raise RuntimeError(f"Failed to reverse: no duration reported for {input_path}")
+        chunks = ChunkedReverser.plan(info.keyframes or [], info.duration, ChunkedReverser.chunk_seconds(info))
+        workers = max(1, min(workers or ChunkedReverser.workers(), len(chunks)))
+
+        capabilities = FFmpegEngine.capabilities()
+        encoder = capabilities.pick_encoder(*SmartCut.FALLBACK_ENCODERS) or 'libx264'
+        # Split the job's threads between the chunks encoding at once
+        threads = max(1, (FFmpegEngine.THREADS or os.cpu_count() or 1) // workers)
+
+        work_dir = tempfile.mkdtemp(prefix='.reverse_', dir=os.path.dirname(output_path) or '.')
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                # Each task gets its own context copy so job cancellation reaches the workers
+                futures = [
+                    pool.submit(contextvars.copy_context().run, ChunkedReverser._reverse_chunk,
+                                input_path, work_dir, index, start, end, encoder, threads, info)
+                    for index, (start, end) in enumerate(chunks)
+                ]
+                try:
+                    for done, future in enumerate(as_completed(futures), 1):
+                        future.result()
+                        # Joining takes the rest
+                        report_progress(progress=round(90 * done / len(chunks), 1))
+                    parts = [future.result() for future in futures]
+                except BaseException:
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+            # The last chunk of the source plays first
+            ChunkedReverser._join(list(reversed(parts)), work_dir, output_path)
+            return True
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to reverse: {e.stderr.decode(errors='replace')}")
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    @staticmethod
+    def _reverse_chunk(input_path: str, work_dir: str, index: int, start: float, end: float,
+                       encoder: str, threads: int, info: MediaInfo) -> tuple[Optional[str], Optional[str]]:
+        """Reverse one chunk into a video part and a PCM audio part."""
+        video_path = os.path.join(work_dir, f"video_{index:04d}.mp4") if info.video else None
+        audio_path = os.path.join(work_dir, f"audio_{index:04d}.wav") if info.audio else None
+
+        # The reverse filters emit nothing until their input ends, so the chunk is
+        # limited on the input side; one decode feeds both outputs
+        cmd = [
+            FFmpegEngine.FFMPEG_CMD, '-nostdin', '-nostats',
+            '-ss', f'{start:.6f}',
+            '-t', f'{end - start:.6f}',
+            '-i', input_path,
+        ]
+        if video_path:
+            cmd += ['-map', '0:v:0', '-vf', 'reverse',
+                    *SmartCut._encoder_args(encoder, info), '-threads', str(threads),
+                    '-an', '-y', video_path]
+        if audio_path:
+            cmd += ['-map', '0:a:0', '-af', 'areverse', '-c:a', 'pcm_s16le', '-vn', '-y', audio_path]
+
+        run_process(cmd, check=True)
+        return video_path, audio_path
+
+    @staticmethod
+    def _join(parts: list[tuple[Optional[str], Optional[str]]], work_dir: str, output_path: str):
+        """Concatenate the reversed parts (given in output order) and encode the audio once."""
+        inputs = []
+        maps = []
+        for position, kind in enumerate(('video', 'audio')):
+            paths = [part[position] for part in parts if part[position]]
+            if not paths:
+                continue
+            list_path = os.path.join(work_dir, f"{kind}.txt")
+            with open(list_path, 'w') as f:
+                for path in paths:
+                    f.write(f"file '{os.path.basename(path)}'\n")
+            maps += ['-map', f'{len(maps) // 2}:{kind[0]}:0']
+            inputs += ['-f', 'concat', '-safe', '0', '-i', list_path]
+
+        cmd = [
+            *inputs,
+            *maps,
+            '-c:v', 'copy',
+            '-c:a', 'aac',
+            '-movflags', '+faststart',
+            '-y',
+            output_path
+        ]
+        FFmpegEngine.run_ffmpeg(cmd)
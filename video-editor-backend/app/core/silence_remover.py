@@ -1,16 +1,75 @@
 """Silence detection and removal."""
 
-import subprocess
-import os
+import re
+from typing import Optional
+
+from .audio_levels import audio_levels_cache
+from .ffmpeg_engine import FFmpegEngine
+
+
+class SilenceDetectParser:
+    """
+    Incremental parser for ffmpeg ``silencedetect`` log lines.
+    
+    Lines are fed one at a time as ffmpeg writes them; each start/end pair
+    is matched in the same pass, so parsing is linear in the log size and
+    regions are available while the run is still going.
+    """
+    
+    # silencedetect logs "silence_start: X" then "silence_end: Y | silence_duration: Z"
+    EVENT = re.compile(r'silence_(start|end):\s+(-?[\d.]+)')
+    
+    def __init__(self):
+        self.regions: list[tuple[float, float]] = []
+        self.start: Optional[float] = None
+    
+    def feed(self, line: str) -> Optional[tuple[float, float]]:
+        """Consume one log line; returns the region it completes, if any."""
+        match = SilenceDetectParser.EVENT.search(line)
+        if not match:
+            return None
+        
+        value = float(match.group(2))
+        if match.group(1) == 'start':
+            self.start = max(0.0, value)
+            return None
+        if self.start is None:
+            return None
+        region = (self.start, value)
+        self.start = None
+        self.regions.append(region)
+        return region
+    
+    def finish(self, duration: Optional[float] = None) -> Optional[tuple[float, float]]:
+        """Close a silence still open at the end of the media; returns it, if any."""
+        if self.start is None or duration is None or duration <= self.start:
+            return None
+        region = (self.start, duration)
+        self.start = None
+        self.regions.append(region)
+        return region
 
 
 class SilenceRemover:
-    """Detects and removes silence from audio."""
+    """
+    Detects and removes silence from video.
+    
+    Detection decodes only the audio track, once per file content (see
+    ``AudioLevels``); reports, detection with other settings and removal
+    renders reuse the cached levels. Removal cuts the silent intervals out
+    of video and audio together, so the two stay in sync.
+    """
+    
+    DEFAULT_THRESHOLD_DB = -40
+    DEFAULT_MIN_DURATION_MS = 500
+    # Silence kept next to sound so speech doesn't start or stop abruptly
+    DEFAULT_PADDING_MS = 100
     
     @staticmethod
     def remove_silence(input_path: str, output_path: str, 
-                      threshold_db: int = -40,
-                      min_duration_ms: int = 500) -> bool:
+                      threshold_db: int = DEFAULT_THRESHOLD_DB,
+                      min_duration_ms: int = DEFAULT_MIN_DURATION_MS,
+                      padding_ms: int = DEFAULT_PADDING_MS) -> bool:
         """
         Remove silence from video using FFmpeg.
         
@@ -19,65 +78,93 @@ class SilenceRemover:
             output_path: Output video path
             threshold_db: Silence threshold in dB
             min_duration_ms: Minimum silent duration to remove
+            padding_ms: Silence kept on each side of a removed region
         """
-        # Use FFmpeg's silenceremove filter
-        filter_str = (
-            f"silenceremove=1:0:{threshold_db}dB:1:{min_duration_ms/1000}:{threshold_db}dB,"
-            "silencedetect=n={threshold_db}dB:d=1"
-        )
+        from .edit_plan import EditPlan
         
-        cmd = [
-            'ffmpeg',
-            '-i', input_path,
-            '-af', f'silenceremove=1:0:{threshold_db}dB:1:{min_duration_ms/1000}:{threshold_db}dB',
-            '-y',
-            output_path
-        ]
+        return EditPlan([{
+            'operation': 'remove_silence',
+            'threshold_db': threshold_db,
+            'min_duration_ms': min_duration_ms,
+            'padding_ms': padding_ms,
+        }]).render(input_path, output_path)
+    
+    @staticmethod
+    def keep_intervals(input_path: str, threshold_db: int = DEFAULT_THRESHOLD_DB,
+                       min_duration_ms: int = DEFAULT_MIN_DURATION_MS,
+                       padding_ms: int = DEFAULT_PADDING_MS) -> list[tuple[float, float]]:
+        """
+        Regions of a file that remain after silence removal.
         
+        Returns:
+            List of (start_time, end_time) tuples in order
+        """
         try:
-            subprocess.run(cmd, capture_output=True, check=True)
-            return True
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"Failed to remove silence: {e.stderr.decode()}")
+            levels = audio_levels_cache.get(input_path)
+        except RuntimeError as e:
+            raise RuntimeError(f"Failed to detect silence: {e}")
+        return levels.keep_intervals(threshold_db, min_duration_ms / 1000, padding_ms / 1000)
+    
+    @staticmethod
+    def build_filter(keep: list[tuple[float, float]], video_in: str, audio_in: str,
+                     video_out: str, audio_out: str, prefix: str = 'keep') -> str:
+        """
+        Filtergraph that keeps only the given intervals of a video and audio stream.
+        
+        Each interval is trimmed from both streams and the pieces are joined
+        with ``concat``, which starts every piece's video and audio together,
+        so cuts never accumulate A/V drift.
+        
+        Args:
+            keep: (start, end) intervals on the input timeline
+            video_in, audio_in: Input pad labels
+            video_out, audio_out: Output pad labels
+            prefix: Label prefix for intermediate pads
+        """
+        if not keep:
+            raise ValueError("Nothing left after removing silence")
+        
+        def trims(start: float, end: float) -> tuple[str, str]:
+            return (
+                f"trim=start={start:.6f}:end={end:.6f},setpts=PTS-STARTPTS",
+                f"atrim=start={start:.6f}:end={end:.6f},asetpts=PTS-STARTPTS",
+            )
+        
+        if len(keep) == 1:
+            video, audio = trims(*keep[0])
+            return f"[{video_in}]{video}[{video_out}];[{audio_in}]{audio}[{audio_out}]"
+        
+        count = len(keep)
+        parts = [
+            f"[{video_in}]split={count}" + ''.join(f"[{prefix}sv{i}]" for i in range(count)),
+            f"[{audio_in}]asplit={count}" + ''.join(f"[{prefix}sa{i}]" for i in range(count)),
+        ]
+        for i, (start, end) in enumerate(keep):
+            video, audio = trims(start, end)
+            parts.append(f"[{prefix}sv{i}]{video}[{prefix}v{i}]")
+            parts.append(f"[{prefix}sa{i}]{audio}[{prefix}a{i}]")
+        parts.append(
+            ''.join(f"[{prefix}v{i}][{prefix}a{i}]" for i in range(count))
+            + f"concat=n={count}:v=1:a=1[{video_out}][{audio_out}]"
+        )
+        return ';'.join(parts)
     
     @staticmethod
-    def detect_silence(input_path: str, threshold_db: int = -40) -> list[tuple[float, float]]:
+    def detect_silence(input_path: str, threshold_db: int = DEFAULT_THRESHOLD_DB,
+                       min_duration: float = 0.1) -> list[tuple[float, float]]:
         """
         Detect silent regions in video.
         
         Args:
             input_path: Input video path
             threshold_db: Silence threshold in dB
+            min_duration: Minimum silent duration in seconds
             
         Returns:
             List of (start_time, end_time) tuples for silent regions
         """
-        cmd = [
-            'ffmpeg',
-            '-i', input_path,
-            '-af', f'silencedetect=n={threshold_db}dB:d=0.1',
-            '-f', 'null',
-            '-'
-        ]
-        
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            stderr = result.stderr
-            
-            # Parse silence regions from output
-            silence_regions = []
-            import re
-            
-            # Pattern: silencedetect outputs "silence_start: X" and "silence_end: Y"
-            for match in re.finditer(r'silence_start:\s+([\d.]+)', stderr):
-                start = float(match.group(1))
-                # Find corresponding silence_end
-                end_match = re.search(r'silence_end:\s+([\d.]+)', stderr[match.end():])
-                if end_match:
-                    end = float(end_match.group(1))
-                    silence_regions.append((start, end))
-            
-            return silence_regions
+            return audio_levels_cache.get(input_path).silences(threshold_db, min_duration)
         except Exception as e:
             raise RuntimeError(f"Failed to detect silence: {e}")
     
@@ -0,0 +1,219 @@
+"""Keyframe-aware smart cutting."""
+
+import os
+import shutil
+import subprocess
+import tempfile
+from typing import Optional
+
+from .ffmpeg_engine import FFmpegEngine
+from .media_info import MediaInfo
+
+
+class SmartCut:
+    """
+    Frame-accurate cuts at close to stream-copy speed.
+
+    Only the partial GOPs at the edges of a cut are re-encoded; the
+    keyframe-aligned middle is stream-copied. Parts are joined as MPEG-TS so
+    every part carries its own parameter sets, and the audio is cut
+    sample-accurately on its own and muxed with the joined video.
+    """
+
+    # Encoders that can produce edges compatible with the copied middle
+    ENCODERS = {'h264': 'libx264', 'hevc': 'libx265'}
+    # Whole-cut re-encodes use the first of these the FFmpeg build has
+    FALLBACK_ENCODERS = ('libx264', 'libopenh264', 'mpeg4')
+
+    H264_PROFILES = {
+        'Constrained Baseline': 'baseline',
+        'Baseline': 'baseline',
+        'Main': 'main',
+        'High': 'high',
+        'High 10': 'high10',
+        'High 4:2:2': 'high422',
+        'High 4:4:4 Predictive': 'high444',
+    }
+
+    # With less copyable video than this, re-encoding the whole cut is cheaper
+    MIN_COPY_SECONDS = 1.0
+
+    # Seek just past a keyframe so input seeking cannot snap to the previous one
+    SEEK_EPSILON = 0.001
+
+    @staticmethod
+    def plan(keyframes: list[float], start: float, end: float,
+             duration: Optional[float] = None) -> list[tuple[str, float, float]]:
+        """
+        Split a cut into re-encoded edges and a stream-copied middle.
+
+        Args:
+            keyframes: Sorted keyframe times of the source
+            start: Cut start in seconds
+            end: Cut end in seconds
+            duration: Source duration; a cut reaching it needs no tail encode
+
+        Returns:
+            List of ('encode' | 'copy', part_start, part_end)
+        """
+        eps = SmartCut.SEEK_EPSILON
+        inside = [k for k in keyframes if start - eps <= k < end]
+        if not inside:
+            return [('encode', start, end)]
+
+        copy_start = inside[0]
+        # A cut running to the end of the file ends on a complete GOP
+        reaches_end = duration is not None and end >= duration - eps
+        copy_end = end if reaches_end else inside[-1]
+
+        if copy_end - copy_start < SmartCut.MIN_COPY_SECONDS:
+            return [('encode', start, end)]
+
+        parts = []
+        if copy_start - start > eps:
+            parts.append(('encode', start, copy_start))
+        parts.append(('copy', max(start, copy_start), copy_end))
+        if end - copy_end > eps:
+            parts.append(('encode', copy_end, end))
+        return parts
+
+    @staticmethod
+    def cut_segment(input_path: str, output_path: str, start: float, end: float) -> bool:
+        """
+        Cut a segment from video with frame accuracy.
+
+        Args:
+            input_path: Input video
+            output_path: Output video
+            start: Start time in seconds
+            end: End time in seconds
+        """
+        start = max(0.0, float(start))
+        info = FFmpegEngine.get_media_info(input_path)
+        if info.duration:
+            end = min(float(end), info.duration)
+        if end <= start:
+            raise ValueError("End time must be after start time")
+
+        capabilities = FFmpegEngine.capabilities()
+        encoder = SmartCut.ENCODERS.get(info.video_codec)
+        if encoder and not capabilities.has_encoder(encoder):
+            # Without a matching encoder the edges can't join the copied middle
+            encoder = None
+        parts = [('encode', start, end)]
+        if encoder:
+            info = FFmpegEngine.get_keyframes(input_path)
+            parts = SmartCut.plan(info.keyframes, start, end, info.duration)
+
+        try:
+            if parts == [('encode', start, end)]:
+                fallback = capabilities.pick_encoder(*SmartCut.FALLBACK_ENCODERS) or 'libx264'
+                SmartCut._reencode(input_path, output_path, start, end, encoder or fallback, info)
+            else:
+                SmartCut._render_parts(input_path, output_path, start, end, parts, encoder, info)
+            return True
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to cut segment: {e.stderr.decode()}")
+
+    @staticmethod
+    def _render_parts(input_path: str, output_path: str, start: float, end: float,
+                      parts: list[tuple[str, float, float]], encoder: str, info: MediaInfo):
+        """Render each video part, then join them and mux the cut audio."""
+        work_dir = tempfile.mkdtemp(prefix='.smartcut_', dir=os.path.dirname(output_path) or '.')
+
+        try:
+            list_path = os.path.join(work_dir, 'parts.txt')
+            with open(list_path, 'w') as f:
+                for i, (kind, part_start, part_end) in enumerate(parts):
+                    part_name = f"part_{i:03d}.ts"
+                    part_path = os.path.join(work_dir, part_name)
+
+                    if kind == 'copy':
+                        cmd = [
+                            '-ss', str(part_start + SmartCut.SEEK_EPSILON),
+                            '-i', input_path,
+                            *SmartCut._copy_limit(info, part_start, part_end),
+                            '-map', '0:v:0',
+                            '-c:v', 'copy'
+                        ]
+                    else:
+                        cmd = [
+                            '-ss', str(part_start),
+                            '-i', input_path,
+                            '-t', str(part_end - part_start),
+                            '-map', '0:v:0',
+                            *SmartCut._encoder_args(encoder, info)
+                        ]
+
+                    cmd += ['-an', '-sn', '-dn', '-f', 'mpegts', '-y', part_path]
+                    FFmpegEngine.run_ffmpeg(cmd, duration=part_end - part_start)
+                    f.write(f"file '{part_name}'\n")
+
+            cmd = [
+                '-f', 'concat',
+                '-safe', '0',
+                '-i', list_path,
+                '-ss', str(start),
+                '-t', str(end - start),
+                '-i', input_path,
+                '-map', '0:v:0',
+                '-map', '1:a:0?',
+                '-c:v', 'copy',
+                '-c:a', 'aac',
+                '-movflags', '+faststart',
+                '-y',
+                output_path
+            ]
+            FFmpegEngine.run_ffmpeg(cmd, duration=end - start)
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    @staticmethod
+    def _reencode(input_path: str, output_path: str, start: float, end: float,
+                  encoder: str, info: MediaInfo):
+        """Re-encode the whole cut (short cuts or codecs that cannot be smart-cut)."""
+        cmd = [
+            '-ss', str(start),
+            '-i', input_path,
+            '-t', str(end - start),
+            '-map', '0:v:0?',
+            '-map', '0:a:0?',
+            *SmartCut._encoder_args(encoder, info),
+            '-c:a', 'aac',
+            '-movflags', '+faststart',
+            '-y',
+            output_path
+        ]
+        FFmpegEngine.run_ffmpeg(cmd, duration=end - start)
+
+    @staticmethod
+    def _copy_limit(info: MediaInfo, start: float, end: float) -> list[str]:
+        """
+        Bound a stream-copied part to whole GOPs.
+
+        Stream copy stops on decode timestamps, which lets the reordered
+        head of the next GOP slip in, so the part is limited by frame count
+        from the keyframe index instead.
+        """
+        eps = SmartCut.SEEK_EPSILON
+        frames = info.frames_between(start - eps, end - eps)
+        if frames:
+            return ['-frames:v', str(frames)]
+        return ['-t', str(end - start)]
+
+    @staticmethod
+    def _encoder_args(encoder: str, info: MediaInfo) -> list[str]:
+        """Encoder options matching the source's pixel format and profile."""
+        if encoder not in SmartCut.ENCODERS.values():
+            # Fallback encoders: no x264/x265 options, fixed high quality
+            return ['-c:v', encoder, '-q:v', '2']
+
+        args = ['-c:v', encoder, '-preset', 'fast', '-crf', '18']
+        video = info.video or {}
+
+        if video.get('pix_fmt'):
+            args += ['-pix_fmt', video['pix_fmt']]
+        profile = SmartCut.H264_PROFILES.get(video.get('profile'))
+        if encoder == 'libx264' and profile:
+            args += ['-profile:v', profile]
+        return args
@@ -0,0 +1,122 @@
+"""Speed changes that avoid re-encoding the video."""
+
+import math
+import subprocess
+from typing import Optional
+
+from .ffmpeg_engine import FFmpegEngine
+from .media_info import MediaInfo
+
+
+class SpeedEngine:
+    """
+    Changes playback speed by rescaling timestamps instead of re-encoding.
+
+    Video packets are stream-copied with their input timestamps scaled by
+    ``1/speed`` (``-itsscale``), so every frame is kept and only shown
+    sooner or later; only the audio is re-encoded, through a chain of
+    ``atempo`` stages that reaches any factor. When keeping every frame
+    would push the frame rate past ``MAX_COPY_FPS`` (large speed-ups), the
+    video is re-encoded at the source frame rate instead, dropping the
+    frames that could not be shown anyway.
+    """
+
+    # atempo's range per stage with the best quality; larger factors are chained
+    ATEMPO_MIN = 0.5
+    ATEMPO_MAX = 2.0
+
+    # Copied video faster than this is decimated instead (players and encoders choke on it)
+    MAX_COPY_FPS = 120.0
+
+    @staticmethod
+    def atempo_chain(speed: float) -> list[str]:
+        """
+        atempo stages whose product is speed, each within [ATEMPO_MIN, ATEMPO_MAX].
+
+        Example: 4.0 -> ['atempo=2.0', 'atempo=2.0']; 0.3 -> ['atempo=0.5', 'atempo=0.6']
+        """
+        if speed <= 0:
+            raise ValueError("Speed must be positive")
+
+        stages = []
+        remaining = speed
+        while remaining > SpeedEngine.ATEMPO_MAX:
+            stages.append(SpeedEngine.ATEMPO_MAX)
+            remaining /= SpeedEngine.ATEMPO_MAX
+        while remaining < SpeedEngine.ATEMPO_MIN:
+            stages.append(SpeedEngine.ATEMPO_MIN)
+            remaining /= SpeedEngine.ATEMPO_MIN
+        if not stages or not math.isclose(remaining, 1.0, rel_tol=1e-9):
+            stages.append(remaining)
+        return [f'atempo={stage:.6g}' for stage in stages]
+
+    @staticmethod
+    def choose_mode(speed: float, info: Optional[MediaInfo]) -> str:
+        """
+        How to change the speed of a file.
+
+        Returns:
+            'copy' (rescale timestamps, copy video) or 'decimate' (re-encode
+            video at the source frame rate, dropping frames)
+        """
+        frame_rate = info.frame_rate if info else None
+        if frame_rate and frame_rate * speed > SpeedEngine.MAX_COPY_FPS:
+            return 'decimate'
+        return 'copy'
+
+    @staticmethod
+    def build_args(input_path: str, output_path: str, speed: float, mode: str,
+                   info: Optional[MediaInfo] = None) -> list[str]:
+        """ffmpeg arguments (without the executable) for one mode."""
+        audio = ['-af', ','.join(SpeedEngine.atempo_chain(speed))]
+
+        if mode == 'copy':
+            return [
+                # Only the video timestamps are scaled; the audio is retimed by atempo
+                '-itsscale:v', f'{1 / speed:.9g}',
+                '-i', input_path,
+                '-map', '0:v:0?',
+                '-map', '0:a:0?',
+                '-c:v', 'copy',
+                *audio,
+                '-y',
+                output_path
+            ]
+
+        frame_rate = info.frame_rate_fraction if info else None
+        return [
+            '-i', input_path,
+            '-map', '0:v:0?',
+            '-map', '0:a:0?',
+            '-filter:v', f'setpts=PTS/{speed}' + (f',fps={frame_rate}' if frame_rate else ''),
+            *audio,
+            '-y',
+            output_path
+        ]
+
+    @staticmethod
+    def change_speed(input_path: str, output_path: str, speed: float) -> bool:
+        """
+        Change video speed, copying the video stream when possible.
+
+        Args:
+            input_path: Input video
+            output_path: Output video
+            speed: Speed multiplier (0.5 = half speed, 4.0 = four times as fast)
+        """
+        if speed <= 0:
+            raise ValueError("Speed must be positive")
+
+        try:
+            info = FFmpegEngine.get_media_info(input_path)
+        except (RuntimeError, OSError):
+            info = None
+        mode = SpeedEngine.choose_mode(speed, info)
+        duration = info.duration / speed if info and info.duration else None
+
+        try:
+            FFmpegEngine.run_ffmpeg(SpeedEngine.build_args(input_path, output_path, speed, mode, info),
+                                    duration=duration)
+            return True
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"Failed to change speed: {e.stderr.decode()}")
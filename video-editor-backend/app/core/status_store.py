@@ -0,0 +1,103 @@
+"""Shared per-video processing status with live subscriptions."""
+
+import asyncio
+import contextvars
+import threading
+import time
+from typing import Optional
+
+
+class StatusStore:
+    """
+    Thread-safe map of video_id to its latest processing status.
+
+    Worker threads publish updates; async subscribers (SSE streams) receive
+    a snapshot on every change through an asyncio.Queue on their own loop.
+    """
+
+    QUEUE_SIZE = 100
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._status: dict[str, dict] = {}
+        self._subscribers: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            return video_id in self._status
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """Get a copy of the current status of a video."""
+        with self._lock:
+            status = self._status.get(video_id)
+            return dict(status) if status is not None else None
+
+    def set(self, video_id: str, **fields) -> dict:
+        """Replace the status of a video."""
+        return self._publish(video_id, fields, replace=True)
+
+    def update(self, video_id: str, **fields) -> dict:
+        """Merge fields into the status of a video."""
+        return self._publish(video_id, fields, replace=False)
+
+    def subscribe(self, video_id: str) -> asyncio.Queue:
+        """Subscribe to status changes of a video. Must be called from the event loop."""
+        queue = asyncio.Queue(maxsize=StatusStore.QUEUE_SIZE)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            self._subscribers.setdefault(video_id, []).append((loop, queue))
+        return queue
+
+    def unsubscribe(self, video_id: str, queue: asyncio.Queue):
+        """Remove a subscription created by subscribe()."""
+        with self._lock:
+            subscribers = self._subscribers.get(video_id, [])
+            self._subscribers[video_id] = [(l, q) for l, q in subscribers if q is not queue]
+            if not self._subscribers[video_id]:
+                del self._subscribers[video_id]
+
+    def _publish(self, video_id: str, fields: dict, replace: bool) -> dict:
+        with self._lock:
+            status = {} if replace else dict(self._status.get(video_id, {}))
+            status.update(fields)
+            status['updated_at'] = time.time()
+            self._status[video_id] = status
+            subscribers = list(self._subscribers.get(video_id, []))
+
+        snapshot = dict(status)
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_offer, queue, snapshot)
+            except RuntimeError:
+                # Subscriber's loop is closed
+                pass
+        return snapshot
+
+
+def _offer(queue: asyncio.Queue, snapshot: dict):
+    """Enqueue a snapshot, dropping the oldest one if the subscriber lags behind."""
+    if queue.full():
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+    queue.put_nowait(snapshot)
+
+
+status_store = StatusStore()
+
+_current_video: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    'status_video_id', default=None
+)
+
+
+def bind_video(video_id: Optional[str]) -> contextvars.Token:
+    """Route progress reported in the current context to a video's status."""
+    return _current_video.set(video_id)
+
+
+def report_progress(**fields):
+    """Merge progress fields into the status of the video bound to this context."""
+    video_id = _current_video.get()
+    if video_id is not None:
+        status_store.update(video_id, **fields)
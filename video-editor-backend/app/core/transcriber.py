@@ -0,0 +1,326 @@
+"""VAD-gated, chunk-parallel transcription."""
+
+import contextvars
+import math
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+import numpy as np
+
+from .ffmpeg_engine import FFmpegEngine
+from .silence_remover import SilenceDetectParser
+from .whisper_pool import whisper_pool
+
+
+class ChunkedTranscriber:
+    """
+    Transcribes only the speech in a file, several chunks at a time.
+
+    Audio is decoded once to 16 kHz mono PCM on a pipe while silencedetect
+    runs in the same pass; its log is parsed line by line as ffmpeg writes
+    it. A ``SpeechChunker`` cuts the stream as it arrives: silences are
+    dropped, and the speech is grouped into chunks of at most
+    ``MAX_CHUNK_SECONDS`` (Whisper's window), split at silence boundaries
+    or, inside long monologues, at the quietest moment before the limit.
+    Each finished chunk is transcribed on a ``whisper_pool`` replica while
+    decoding goes on, and its segments are shifted back onto the source
+    timeline. Only the chunk being built and the chunks queued for Whisper
+    are held in memory, whatever the length of the file.
+    """
+
+    SAMPLE_RATE = 16000
+    SILENCE_THRESHOLD_DB = -40
+    # Shortest pause worth skipping
+    MIN_SILENCE = 0.5
+    # Context kept around speech so word edges aren't clipped
+    SPEECH_PADDING = 0.2
+    MAX_CHUNK_SECONDS = 30.0
+    # Speech closer than this shares a chunk, so sentences keep their context
+    MAX_GAP_SECONDS = 2.0
+    # Long speech is split at the quietest window within this distance of the limit
+    SPLIT_SEARCH_SECONDS = 5.0
+    SPLIT_WINDOW_SECONDS = 0.1
+    # How often ffmpeg reports how far its log is complete (wall-clock seconds)
+    PROGRESS_PERIOD = 0.1
+
+    @staticmethod
+    def transcribe(media_path: str, size: str, language: Optional[str] = "en",
+                   workers: Optional[int] = None) -> dict:
+        """
+        Transcribe the speech of an audio or video file.
+
+        Args:
+            media_path: Input media path
+            size: Whisper model size
+            language: Language code, or None to auto-detect
+            workers: Concurrent chunks (default: the pool's replicas per model)
+
+        Returns:
+            Dictionary in the Whisper JSON layout (``text``, ``segments``,
+            ``language``) plus ``duration`` and ``speech_seconds``. Segments
+            carry ``start``, ``end``, ``text`` and ``confidence`` (matching
+            ``TranscriptSegment``) and word-level ``words``.
+        """
+        workers = max(1, workers or whisper_pool.replicas)
+        # Chunks decoded ahead of Whisper; decoding waits (and ffmpeg with it) beyond this
+        slots = threading.Semaphore(workers + 1)
+        futures: list[Future] = []
+        chunks = []
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            def submit(start: float, end: float, samples: np.ndarray):
+                slots.acquire()
+                failed = next((future for future in futures if future.done() and future.exception()), None)
+                if failed is not None:
+                    slots.release()
+                    # Stops ffmpeg instead of decoding the rest for nothing
+                    failed.result()
+                # Each task gets its own context copy so job cancellation reaches the workers
+                future = pool.submit(contextvars.copy_context().run, ChunkedTranscriber._transcribe_chunk,
+                                     samples, start, end, size, language)
+                future.add_done_callback(lambda _: slots.release())
+                futures.append(future)
+                chunks.append((start, end))
+
+            try:
+                duration = ChunkedTranscriber.stream_speech(media_path, submit)
+                results = [future.result() for future in futures]
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        segments = [segment for chunk_segments in results for segment in chunk_segments]
+        for index, segment in enumerate(segments):
+            segment['id'] = index
+
+        return {
+            'text': ''.join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': language,
+            'duration': duration,
+            'speech_seconds': round(sum(end - start for start, end in chunks), 3),
+        }
+
+    @staticmethod
+    def stream_speech(media_path: str, on_chunk: Callable[[float, float, np.ndarray], None]) -> float:
+        """
+        Decode 16 kHz mono PCM and cut it into speech chunks in a single ffmpeg pass.
+
+        Args:
+            media_path: Input media path
+            on_chunk: Called with (start, end, int16 samples) for each chunk, in
+                order, while ffmpeg is still decoding; blocking in it pauses decoding
+
+        Returns:
+            Duration of the decoded audio in seconds
+        """
+        audio_filter = (
+            f'silencedetect=n={ChunkedTranscriber.SILENCE_THRESHOLD_DB}dB'
+            f':d={ChunkedTranscriber.MIN_SILENCE}'
+        )
+        chunker = SpeechChunker()
+
+        def feed(pcm: bytes):
+            for chunk in chunker.feed_pcm(pcm):
+                on_chunk(*chunk)
+
+        FFmpegEngine.extract_pcm(media_path, ChunkedTranscriber.SAMPLE_RATE, audio_filter,
+                                 on_chunk=feed, on_stderr_line=chunker.feed_log,
+                                 progress_period=ChunkedTranscriber.PROGRESS_PERIOD)
+        for chunk in chunker.finish():
+            on_chunk(*chunk)
+        return chunker.duration
+
+    @staticmethod
+    def _quietest_point(samples: np.ndarray, offset: float, limit: float) -> float:
+        """
+        Time of the lowest-energy window in the SPLIT_SEARCH_SECONDS before limit.
+
+        Args:
+            samples: Samples starting at offset seconds
+            offset: Source time of samples[0]
+            limit: Latest split time
+        """
+        rate = ChunkedTranscriber.SAMPLE_RATE
+        window = int(ChunkedTranscriber.SPLIT_WINDOW_SECONDS * rate)
+        first = max(0, int((limit - ChunkedTranscriber.SPLIT_SEARCH_SECONDS - offset) * rate))
+        last = int((limit - offset) * rate)
+        search = samples[first:last].astype(np.float32)
+        usable = len(search) - len(search) % window
+        if usable == 0:
+            return limit
+        energy = np.square(search[:usable]).reshape(-1, window).mean(axis=1)
+        return offset + (first + int(np.argmin(energy)) * window + window // 2) / rate
+
+    @staticmethod
+    def _transcribe_chunk(samples: np.ndarray, start: float, end: float,
+                          size: str, language: Optional[str]) -> list[dict]:
+        audio = samples.astype(np.float32) / 32768.0
+        segments = []
+        for segment in whisper_pool.transcribe_stream(audio, size, language):
+            segment['start'] = round(segment['start'] + start, 3)
+            segment['end'] = round(min(segment['end'] + start, end), 3)
+            for word in segment['words']:
+                word['start'] = round(word['start'] + start, 3)
+                word['end'] = round(min(word['end'] + start, end), 3)
+            segments.append(segment)
+        return segments
+
+
+class SpeechChunker:
+    """
+    Cuts a PCM stream into speech chunks as it is decoded.
+
+    PCM arrives on ffmpeg's stdout and silencedetect results on its stderr,
+    read on two threads. A silence is only reported once it has lasted
+    ``MIN_SILENCE``, and the PCM of a moment can arrive before its log
+    line; ffmpeg's ``-progress`` ``out_time_us`` lines, written to stderr
+    after the filter logs of everything before them, tell how far the log
+    is complete. Decisions are made only up to that point, so speech is
+    never dropped for a silence that has not been reported yet.
+
+    Samples are kept from the start of the chunk being built; everything
+    before it, including silences, is discarded as soon as it is decided.
+    """
+
+    def __init__(self):
+        self.rate = ChunkedTranscriber.SAMPLE_RATE
+        self.duration = 0.0
+        self._lock = threading.Lock()
+        self._parser = SilenceDetectParser()
+        self._applied = 0
+        # Source time up to which the silencedetect log is complete
+        self._logged = 0.0
+        self._received = 0
+        # PCM from sample _buffer_start on; earlier samples are already decided
+        self._buffer = bytearray()
+        self._buffer_start = 0
+        # Start of the chunk being built, or None inside a silence whose end is not known yet
+        self._chunk_start: Optional[float] = 0.0
+        # Short pauses kept inside the current chunk, candidates for splitting it
+        self._gaps: list[tuple[float, float]] = []
+
+    def feed_log(self, line: str):
+        """Consume one ffmpeg stderr line (silencedetect result or progress)."""
+        key, sep, value = line.strip().partition('=')
+        with self._lock:
+            if sep and key == 'out_time_us':
+                try:
+                    self._logged = max(self._logged, int(value) / 1_000_000)
+                except ValueError:
+                    pass
+                return
+            self._parser.feed(line)
+
+    def feed_pcm(self, pcm: bytes) -> list[tuple[float, float, np.ndarray]]:
+        """Consume decoded PCM; returns the chunks it completes as (start, end, samples)."""
+        with self._lock:
+            first = self._received
+            self._received += len(pcm) // 2
+            skip = max(0, self._buffer_start - first)
+            self._buffer += pcm[skip * 2:]
+            # A silence is reported MIN_SILENCE after it starts
+            known = min(self._received / self.rate, self._logged - ChunkedTranscriber.MIN_SILENCE)
+            return self._advance(known)
+
+    def finish(self) -> list[tuple[float, float, np.ndarray]]:
+        """Decide the rest once ffmpeg has exited; returns the remaining chunks."""
+        with self._lock:
+            self.duration = self._received / self.rate
+            self._parser.finish(self.duration)
+            chunks = self._advance(self.duration, final=True)
+            padding = ChunkedTranscriber.SPEECH_PADDING
+            end = self.duration
+            if self._gaps and self._gaps[-1][1] + 2 * padding >= end:
+                # A short pause reaching the end of the file is a trailing silence
+                end = self._gaps[-1][0]
+            # Anything shorter is the padding after a trailing silence, not speech
+            if self._chunk_start is not None and end - self._chunk_start > 2 * padding:
+                chunks.append(self._emit(self._chunk_start, end))
+            self._chunk_start = None
+            return chunks
+
+    def _advance(self, known: float, final: bool = False) -> list[tuple[float, float, np.ndarray]]:
+        """Apply the silences and length limits decided up to time known."""
+        padding = ChunkedTranscriber.SPEECH_PADDING
+        chunks = []
+        regions = self._parser.regions
+        while self._applied < len(regions):
+            start, end = regions[self._applied]
+            # Pauses keep SPEECH_PADDING of context on both sides, except at the file edges
+            quiet_start = start + padding if start > 0 else 0.0
+            trailing = final and end >= self.duration - padding
+            quiet_end = end if trailing else end - padding
+            if quiet_start > known:
+                break
+            self._applied += 1
+            chunks += self._limit_length(quiet_start)
+            if quiet_end <= quiet_start:
+                continue
+            if self._chunk_start is None or quiet_start <= self._chunk_start:
+                self._chunk_start = max(self._chunk_start or 0.0, quiet_end)
+                self._gaps.clear()
+            elif quiet_end - quiet_start <= ChunkedTranscriber.MAX_GAP_SECONDS and not trailing:
+                self._gaps.append((quiet_start, quiet_end))
+            else:
+                chunks.append(self._emit(self._chunk_start, quiet_start))
+                self._chunk_start = quiet_end
+                self._gaps.clear()
+
+        horizon = known
+        if self._parser.start is not None and not final:
+            # A silence has started and not ended yet; it lasts at least until known
+            quiet_start = self._parser.start + padding if self._parser.start > 0 else 0.0
+            horizon = min(horizon, quiet_start)
+            if (self._chunk_start is not None and quiet_start > self._chunk_start
+                    and known - quiet_start > ChunkedTranscriber.MAX_GAP_SECONDS):
+                # Too long to keep inside the chunk, wherever it ends
+                chunks += self._limit_length(quiet_start)
+                chunks.append(self._emit(self._chunk_start, quiet_start))
+                self._chunk_start = None
+                self._gaps.clear()
+        chunks += self._limit_length(horizon)
+
+        # Nothing before the chunk being built is needed any more
+        if self._chunk_start is None:
+            self._drop_until(known)
+        else:
+            self._drop_until(self._chunk_start)
+        return chunks
+
+    def _limit_length(self, horizon: float) -> list[tuple[float, float, np.ndarray]]:
+        """Split the current chunk while the speech known up to horizon exceeds MAX_CHUNK_SECONDS."""
+        chunks = []
+        max_chunk = ChunkedTranscriber.MAX_CHUNK_SECONDS
+        while self._chunk_start is not None and horizon - self._chunk_start > max_chunk:
+            limit = self._chunk_start + max_chunk
+            pauses = [gap for gap in self._gaps if gap[0] <= limit]
+            if pauses:
+                split, resume = pauses[-1]
+            else:
+                split = resume = ChunkedTranscriber._quietest_point(
+                    self._samples(), self._buffer_start / self.rate, limit
+                )
+            chunks.append(self._emit(self._chunk_start, split))
+            self._chunk_start = resume
+            self._gaps = [gap for gap in self._gaps if gap[0] >= resume]
+            self._drop_until(resume)
+        return chunks
+
+    def _emit(self, start: float, end: float) -> tuple[float, float, np.ndarray]:
+        first = max(0, int(start * self.rate) - self._buffer_start)
+        last = max(first, int(math.ceil(end * self.rate)) - self._buffer_start)
+        # Copied, so the chunk doesn't pin the buffer it was sliced from
+        return start, end, self._samples()[first:last].copy()
+
+    def _samples(self) -> np.ndarray:
+        return np.frombuffer(self._buffer, dtype='<i2', count=len(self._buffer) // 2)
+
+    def _drop_until(self, time: float):
+        sample = int(time * self.rate)
+        if sample <= self._buffer_start:
+            return
+        del self._buffer[:(sample - self._buffer_start) * 2]
+        self._buffer_start = sample
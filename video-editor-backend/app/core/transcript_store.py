@@ -0,0 +1,325 @@
+"""Persistent columnar transcripts with time and word lookups."""
+
+import math
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np
+
+from ..utils.file_manager import FileManager
+
+
+WORD_PATTERN = re.compile(r"[\w']+")
+
+
+def normalize_words(text: str) -> list[str]:
+    """Lowercase word tokens of a text, without punctuation."""
+    return [word.strip("'") for word in WORD_PATTERN.findall(text.lower()) if word.strip("'")]
+
+
+class Transcript:
+    """
+    A transcript stored as columns rather than a list of dicts.
+
+    Segments and words each have start/end arrays and offsets into one UTF-8
+    text blob, so a transcript is a handful of arrays that save to a small
+    ``.npz`` and load without parsing. Times are sorted, so "text at time T"
+    is a binary search; "where is word W spoken" uses an inverted index
+    from normalized word to word positions, built on first use.
+    """
+
+    COLUMNS = (
+        'segment_starts', 'segment_ends', 'confidence', 'text_offsets', 'text',
+        'word_starts', 'word_ends', 'word_offsets', 'words',
+    )
+
+    def __init__(self, language: str, segment_starts: np.ndarray, segment_ends: np.ndarray,
+                 confidence: np.ndarray, text_offsets: np.ndarray, text: np.ndarray,
+                 word_starts: np.ndarray, word_ends: np.ndarray, word_offsets: np.ndarray,
+                 words: np.ndarray):
+        self.language = language
+        self.segment_starts = segment_starts
+        self.segment_ends = segment_ends
+        self.confidence = confidence
+        self.text_offsets = text_offsets
+        self.text = text
+        self.word_starts = word_starts
+        self.word_ends = word_ends
+        self.word_offsets = word_offsets
+        self.words = words
+        self._word_index: Optional[dict[str, np.ndarray]] = None
+
+    @classmethod
+    def from_segments(cls, segments: list[dict], language: Optional[str]) -> 'Transcript':
+        """
+        Build from Whisper-style segments.
+
+        Segments without word timestamps get them interpolated from each
+        word's character position within the segment.
+        """
+        segments = sorted(segments, key=lambda segment: segment['start'])
+        texts, word_rows = [], []
+        for segment in segments:
+            texts.append(segment['text'].strip())
+            word_rows.extend(cls._segment_words(segment))
+
+        text_blob, text_offsets = _pack([text.encode('utf-8') for text in texts])
+        word_blob, word_offsets = _pack([word.encode('utf-8') for _, _, word in word_rows])
+        return cls(
+            language=language or '',
+            segment_starts=np.array([segment['start'] for segment in segments], dtype=np.float64),
+            segment_ends=np.array([segment['end'] for segment in segments], dtype=np.float64),
+            confidence=np.array([_confidence(segment) for segment in segments], dtype=np.float32),
+            text_offsets=text_offsets,
+            text=text_blob,
+            word_starts=np.array([row[0] for row in word_rows], dtype=np.float64),
+            word_ends=np.array([row[1] for row in word_rows], dtype=np.float64),
+            word_offsets=word_offsets,
+            words=word_blob,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'Transcript':
+        with np.load(path, allow_pickle=False) as data:
+            return cls(str(data['language']), *(data[column] for column in cls.COLUMNS))
+
+    def save(self, path: str):
+        """Write atomically as a compressed ``.npz``."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, language=np.array(self.language),
+                                **{column: getattr(self, column) for column in self.COLUMNS})
+        os.replace(tmp_path, path)
+
+    def __len__(self) -> int:
+        return len(self.segment_starts)
+
+    @property
+    def word_count(self) -> int:
+        return len(self.word_starts)
+
+    def segment_text(self, index: int) -> str:
+        return _unpack(self.text, self.text_offsets, index)
+
+    def word(self, index: int) -> str:
+        return _unpack(self.words, self.word_offsets, index)
+
+    def segment(self, index: int) -> dict:
+        return {
+            'start': float(self.segment_starts[index]),
+            'end': float(self.segment_ends[index]),
+            'text': self.segment_text(index),
+            'confidence': round(float(self.confidence[index]), 4),
+        }
+
+    def segments(self) -> list[dict]:
+        return [self.segment(index) for index in range(len(self))]
+
+    def text_at(self, time: float) -> Optional[str]:
+        """Text of the segment being spoken at a time, or None during silence."""
+        index = int(np.searchsorted(self.segment_starts, time, side='right')) - 1
+        if index >= 0 and time < self.segment_ends[index]:
+            return self.segment_text(index)
+        return None
+
+    def segments_between(self, start: float, end: float) -> list[dict]:
+        """Segments overlapping [start, end), e.g. for subtitling a cut."""
+        first = int(np.searchsorted(self.segment_ends, start, side='right'))
+        last = int(np.searchsorted(self.segment_starts, end, side='left'))
+        return [self.segment(index) for index in range(first, last)]
+
+    def find(self, phrase: str) -> list[tuple[float, float]]:
+        """
+        Times where a word or phrase is spoken.
+
+        Matching is on consecutive normalized words (case and punctuation
+        are ignored).
+
+        Returns:
+            List of (start, end) tuples, in order
+        """
+        tokens = normalize_words(phrase)
+        if not tokens:
+            return []
+        candidates = self._index().get(tokens[0])
+        if candidates is None:
+            return []
+
+        matches = []
+        for position in candidates.tolist():
+            last = position + len(tokens) - 1
+            if last >= self.word_count:
+                break
+            if all(self._normalized_word(position + k) == token for k, token in enumerate(tokens[1:], 1)):
+                matches.append((float(self.word_starts[position]), float(self.word_ends[last])))
+        return matches
+
+    def to_dict(self) -> dict:
+        """Whisper JSON layout (text, segments with words, language)."""
+        segments = self.segments()
+        word_position = 0
+        for segment in segments:
+            words = []
+            while word_position < self.word_count and self.word_starts[word_position] < segment['end']:
+                words.append({
+                    'start': float(self.word_starts[word_position]),
+                    'end': float(self.word_ends[word_position]),
+                    'word': self.word(word_position),
+                })
+                word_position += 1
+            segment['words'] = words
+        return {
+            'text': ' '.join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': self.language,
+        }
+
+    def _index(self) -> dict[str, np.ndarray]:
+        if self._word_index is None:
+            positions: dict[str, list[int]] = {}
+            for index in range(self.word_count):
+                for token in normalize_words(self.word(index))[:1]:
+                    positions.setdefault(token, []).append(index)
+            self._word_index = {token: np.array(found) for token, found in positions.items()}
+        return self._word_index
+
+    def _normalized_word(self, index: int) -> Optional[str]:
+        tokens = normalize_words(self.word(index))
+        return tokens[0] if tokens else None
+
+    @staticmethod
+    def _segment_words(segment: dict) -> list[tuple[float, float, str]]:
+        words = segment.get('words')
+        if words:
+            return [(word['start'], word['end'], word['word'].strip()) for word in words]
+
+        # Spread the segment's duration over its words by character position
+        text = segment['text'].strip()
+        spans = [match.span() for match in re.finditer(r'\S+', text)]
+        if not spans:
+            return []
+        start, end = segment['start'], segment['end']
+        scale = (end - start) / max(1, len(text))
+        return [
+            (start + begin * scale, start + finish * scale, text[begin:finish])
+            for begin, finish in spans
+        ]
+
+
+class TranscriptStore:
+    """
+    Transcripts persisted per content hash, model and language.
+
+    Entries live in ``outputs/.transcripts`` as ``.npz`` files, so a video
+    (or any re-upload of the same content) is transcribed once and
+    subtitle, cut-by-phrase and search features read the stored result.
+    Each video's latest transcript key is recorded in the metadata index.
+    Recently used transcripts are kept in memory.
+    """
+
+    STORE_DIR = os.path.join(FileManager.OUTPUT_DIR, '.transcripts')
+    MAX_LOADED = 32
+
+    def __init__(self, store_dir: Optional[str] = None):
+        self.store_dir = store_dir or TranscriptStore.STORE_DIR
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._loaded: OrderedDict[str, Transcript] = OrderedDict()
+
+    @staticmethod
+    def make_key(content_hash: str, model: str, language: Optional[str]) -> str:
+        return f"{content_hash}_{model}_{language or 'auto'}"
+
+    def get(self, key: str) -> Optional[Transcript]:
+        """Load a transcript by key from memory or disk."""
+        with self._lock:
+            transcript = self._loaded.get(key)
+            if transcript is not None:
+                self._loaded.move_to_end(key)
+                return transcript
+
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            transcript = Transcript.load(path)
+        except (OSError, ValueError, KeyError):
+            return None
+        self._remember(key, transcript)
+        return transcript
+
+    def get_for_video(self, video_id: str) -> Optional[Transcript]:
+        """The transcript last recorded for a video, if any."""
+        record = FileManager.index.get(video_id)
+        info = record.get('transcript') if record else None
+        return self.get(info['key']) if info else None
+
+    def get_or_transcribe(self, video_id: str, input_path: str, model: str, language: Optional[str],
+                          transcribe: Callable[[], dict]) -> Transcript:
+        """
+        Return the stored transcript of a file, transcribing it on a miss.
+
+        Args:
+            video_id: Video the transcript is recorded for
+            input_path: Media file (identified by content hash)
+            model: Whisper model the transcript is made with
+            language: Language code
+            transcribe: Produces a Whisper-style result (``segments``, ``language``)
+        """
+        key = self.make_key(FileManager.get_content_hash(input_path), model, language)
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # Concurrent requests for the same content wait for one transcription
+        with key_lock:
+            transcript = self.get(key)
+            if transcript is None:
+                result = transcribe()
+                transcript = Transcript.from_segments(result['segments'], result.get('language') or language)
+                transcript.save(self._path(key))
+                self._remember(key, transcript)
+
+        FileManager.index.set_transcript(video_id, {
+            'key': key,
+            'model': model,
+            'language': transcript.language,
+            'segments': len(transcript),
+            'words': transcript.word_count,
+        })
+        return transcript
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.store_dir, f"{key}.npz")
+
+    def _remember(self, key: str, transcript: Transcript):
+        with self._lock:
+            self._loaded[key] = transcript
+            self._loaded.move_to_end(key)
+            while len(self._loaded) > self.MAX_LOADED:
+                self._loaded.popitem(last=False)
+
+
+def _pack(items: list[bytes]) -> tuple[np.ndarray, np.ndarray]:
+    """Concatenate byte strings into one uint8 blob plus n+1 offsets."""
+    offsets = np.zeros(len(items) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(item) for item in items])
+    return np.frombuffer(b''.join(items), dtype=np.uint8).copy(), offsets
+
+
+def _unpack(blob: np.ndarray, offsets: np.ndarray, index: int) -> str:
+    return blob[offsets[index]:offsets[index + 1]].tobytes().decode('utf-8')
+
+
+def _confidence(segment: dict) -> float:
+    if 'confidence' in segment:
+        return segment['confidence']
+    if 'avg_logprob' in segment:
+        return math.exp(segment['avg_logprob'])
+    return 0.0
+
+
+transcript_store = TranscriptStore()
@@ -4,15 +4,29 @@ import subprocess
 import json
 import os
 
+from typing import Iterator, Optional
+
+from .process_runner import run_process
+from .ffmpeg_engine import FFmpegEngine
+from .transcriber import ChunkedTranscriber
+from .whisper_pool import whisper_pool
+
 
 class WhisperEngine:
-    """Handles Whisper transcription."""
+    """
+    Handles Whisper transcription.
     
-    MODEL = "base"  # tiny, base, small, medium, large
+    Transcription runs in-process on models kept resident by ``whisper_pool``;
+    the ``whisper`` CLI is only used when no Whisper library is importable.
+    """
+    
+    MODEL = os.environ.get("WHISPER_MODEL", "base")  # tiny, base, small, medium, large
     
     @staticmethod
     def check_installed() -> bool:
         """Check if Whisper is installed."""
+        if whisper_pool.available():
+            return True
         try:
             subprocess.run(['whisper', '--help'], capture_output=True, check=True)
             return True
@@ -26,12 +40,15 @@ class WhisperEngine:
         
         Args:
             audio_path: Path to audio file
-            output_path: Where to save transcript
+            output_path: Where to save transcript (CLI fallback only)
             language: Language code
             
         Returns:
             Dictionary with transcript data
         """
+        if whisper_pool.available():
+            return whisper_pool.transcribe(audio_path, WhisperEngine.MODEL, language)
+        
         if not output_path:
             output_path = audio_path.replace('.mp3', '').replace('.wav', '')
         
@@ -45,7 +62,7 @@ class WhisperEngine:
         ]
         
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
+            result = run_process(cmd, check=True, text=True)
             
             # Load generated JSON
             json_path = output_path + '.json'
@@ -57,11 +74,36 @@ class WhisperEngine:
         except subprocess.CalledProcessError as e:
             raise RuntimeError(f"Whisper transcription failed: {e.stderr}")
     
+    @staticmethod
+    def transcribe_stream(audio_path: str, language: Optional[str] = "en") -> Iterator[dict]:
+        """
+        Transcribe audio or video, yielding segments as they are produced.
+        
+        Args:
+            audio_path: Path to audio or video file
+            language: Language code, or None to auto-detect
+            
+        Yields:
+            Segment dictionaries with id, start, end and text
+        """
+        if not whisper_pool.available():
+            yield from WhisperEngine.transcribe(audio_path, language=language).get('segments', [])
+            return
+        yield from whisper_pool.transcribe_stream(audio_path, WhisperEngine.MODEL, language)
+    
     @staticmethod
     def transcribe_video(video_path: str, output_path: str = None) -> dict:
-        """Transcribe video by extracting audio first."""
+        """
+        Transcribe video by extracting audio first.
+        
+        In-process, only the speech is transcribed, in parallel chunks
+        (see ``ChunkedTranscriber``).
+        """
         import tempfile
         
+        if whisper_pool.available():
+            return ChunkedTranscriber.transcribe(video_path, WhisperEngine.MODEL, "en")
+        
         # Extract audio temporarily
         with tempfile.NamedTemporaryFile(suffix='.mp3', delete=False) as tmp:
             tmp_audio = tmp.name
@@ -69,13 +111,12 @@ class WhisperEngine:
         try:
             # Extract audio
             cmd = [
-                'ffmpeg',
                 '-i', video_path,
                 '-q:a', '9',
                 '-y',
                 tmp_audio
             ]
-            subprocess.run(cmd, capture_output=True, check=True)
+            FFmpegEngine.run_ffmpeg(cmd, duration=FFmpegEngine.probe_duration(video_path))
             
             # Transcribe
             result = WhisperEngine.transcribe(tmp_audio, output_path)
@@ -0,0 +1,251 @@
+"""Resident Whisper models for in-process transcription."""
+
+import math
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional, Union
+
+import numpy as np
+
+from .process_runner import check_cancelled
+
+try:
+    from faster_whisper import WhisperModel
+except ImportError:
+    WhisperModel = None
+
+try:
+    import whisper
+except ImportError:
+    whisper = None
+
+
+class LoadedModel:
+    """One loaded model instance."""
+
+    def __init__(self, name: str, backend: str, model):
+        self.name = name
+        self.backend = backend
+        self.model = model
+        self.loaded_at = time.time()
+        self.uses = 0
+
+
+class ModelReplicas:
+    """Interchangeable instances of one model, each used by one caller at a time."""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.count = 0
+        self.idle: queue.LifoQueue[LoadedModel] = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    def take(self, load) -> tuple[LoadedModel, bool]:
+        """
+        Return an idle instance, load another one while under the limit, or
+        wait for one to be released. The flag tells whether a load happened.
+        """
+        try:
+            return self.idle.get_nowait(), False
+        except queue.Empty:
+            pass
+        with self._lock:
+            should_load = self.count < self.limit
+            if should_load:
+                self.count += 1
+        if not should_load:
+            return self.idle.get(), False
+        try:
+            return load(self.name), True
+        except BaseException:
+            with self._lock:
+                self.count -= 1
+            raise
+
+    def release(self, entry: LoadedModel):
+        self.idle.put(entry)
+
+
+class WhisperModelPool:
+    """
+    Keeps Whisper models loaded across requests.
+
+    Models are keyed by name, which is resolved from size and language:
+    English requests on sizes that have an English-only variant use it
+    (``base`` -> ``base.en``). faster-whisper is used when installed,
+    otherwise openai-whisper. Each model instance serves one caller at a
+    time; up to ``REPLICAS`` instances of a model are loaded on demand so
+    chunked transcription can run in parallel. The least recently used
+    model is dropped once more than ``MAX_MODELS`` are resident.
+    """
+
+    MAX_MODELS = int(os.environ.get('VIDEO_EDITOR_WHISPER_MAX_MODELS', 2))
+    # Instances per model; each one holds its own weights in memory
+    REPLICAS = int(os.environ.get('VIDEO_EDITOR_WHISPER_REPLICAS', 0)) or max(1, min(4, (os.cpu_count() or 1) // 4))
+    DEVICE = os.environ.get('VIDEO_EDITOR_WHISPER_DEVICE', 'cpu')
+    # faster-whisper quantization; int8 is the fastest choice on CPU
+    COMPUTE_TYPE = os.environ.get('VIDEO_EDITOR_WHISPER_COMPUTE_TYPE', 'int8')
+    ENGLISH_ONLY_SIZES = {'tiny', 'base', 'small', 'medium'}
+
+    def __init__(self, max_models: Optional[int] = None, replicas: Optional[int] = None):
+        self.max_models = max_models or WhisperModelPool.MAX_MODELS
+        self.replicas = replicas or WhisperModelPool.REPLICAS
+        self._lock = threading.Lock()
+        self._models: OrderedDict[str, ModelReplicas] = OrderedDict()
+        self.loads = 0
+        self.hits = 0
+        self.load_seconds = 0.0
+
+    @staticmethod
+    def available() -> bool:
+        """Check if a Whisper library can be imported in this process."""
+        return WhisperModel is not None or whisper is not None
+
+    @staticmethod
+    def backend() -> Optional[str]:
+        """Name of the library models are loaded with."""
+        if WhisperModel is not None:
+            return 'faster-whisper'
+        if whisper is not None:
+            return 'openai-whisper'
+        return None
+
+    @staticmethod
+    def model_name(size: str, language: Optional[str] = None) -> str:
+        """Resolve the model to load for a size and language."""
+        if language == 'en' and size in WhisperModelPool.ENGLISH_ONLY_SIZES:
+            return f"{size}.en"
+        return size
+
+    def get(self, name: str) -> ModelReplicas:
+        """Return the replica set of a model, marking it most recently used."""
+        with self._lock:
+            replicas = self._models.get(name)
+            if replicas is None:
+                replicas = self._models[name] = ModelReplicas(name, self.replicas)
+                # Evicted models are freed once their in-flight users release them
+                while len(self._models) > self.max_models:
+                    self._models.popitem(last=False)
+            else:
+                self._models.move_to_end(name)
+            return replicas
+
+    @contextmanager
+    def acquire(self, size: str, language: Optional[str] = None) -> Iterator[LoadedModel]:
+        """Hold exclusive use of a model instance for the duration of the block."""
+        replicas = self.get(self.model_name(size, language))
+        started = time.perf_counter()
+        entry, loaded = replicas.take(self._load)
+        with self._lock:
+            if loaded:
+                self.loads += 1
+                self.load_seconds += time.perf_counter() - started
+            else:
+                self.hits += 1
+        entry.uses += 1
+        try:
+            yield entry
+        finally:
+            replicas.release(entry)
+
+    def preload(self, size: str, language: Optional[str] = None, background: bool = True):
+        """Load a model ahead of the first request."""
+        if not self.available():
+            return
+        if not background:
+            self._preload_quietly(size, language)
+            return
+        threading.Thread(target=self._preload_quietly, args=(size, language), daemon=True).start()
+
+    def transcribe_stream(self, audio: Union[str, np.ndarray], size: str,
+                          language: Optional[str] = None) -> Iterator[dict]:
+        """
+        Transcribe audio, yielding segments as they are decoded.
+
+        Args:
+            audio: Audio or video file (decoded by the Whisper library), or
+                16 kHz mono float32 samples
+            size: Model size (tiny, base, small, medium, large)
+            language: Language code, or None to auto-detect
+
+        Yields:
+            Segment dictionaries with ``id``, ``start``, ``end``, ``text``,
+            ``confidence`` (the segment's mean token probability) and
+            ``words`` (``start``, ``end``, ``word`` per word)
+        """
+        with self.acquire(size, language) as entry:
+            if entry.backend == 'faster-whisper':
+                segments, _ = entry.model.transcribe(audio, language=language, word_timestamps=True)
+                for segment in segments:
+                    check_cancelled()
+                    words = [(word.start, word.end, word.word) for word in segment.words or []]
+                    yield _segment(segment.id, segment.start, segment.end, segment.text,
+                                   segment.avg_logprob, words)
+            else:
+                # openai-whisper only returns once all of the audio is decoded
+                result = entry.model.transcribe(audio, language=language, word_timestamps=True,
+                                                fp16=self.DEVICE != 'cpu')
+                for segment in result['segments']:
+                    check_cancelled()
+                    words = [(word['start'], word['end'], word['word']) for word in segment.get('words', [])]
+                    yield _segment(segment['id'], segment['start'], segment['end'],
+                                   segment['text'], segment['avg_logprob'], words)
+
+    def transcribe(self, audio_path: str, size: str, language: Optional[str] = None) -> dict:
+        """Transcribe a media file into the Whisper JSON layout (text, segments, language)."""
+        segments = list(self.transcribe_stream(audio_path, size, language))
+        return {
+            'text': ''.join(segment['text'] for segment in segments),
+            'segments': segments,
+            'language': language,
+        }
+
+    def stats(self) -> dict:
+        """Resident models and load counters."""
+        with self._lock:
+            return {
+                'backend': self.backend(),
+                'models': {name: replicas.count for name, replicas in self._models.items()},
+                'loads': self.loads,
+                'hits': self.hits,
+                'load_seconds': round(self.load_seconds, 3),
+            }
+
+    def _load(self, name: str) -> LoadedModel:
+        if WhisperModel is not None:
+            # Split the cores between replicas so parallel chunks don't oversubscribe the CPU
+            threads = max(1, (os.cpu_count() or 1) // self.replicas)
+            model = WhisperModel(name, device=self.DEVICE, compute_type=self.COMPUTE_TYPE,
+                                 cpu_threads=threads)
+        elif whisper is not None:
+            model = whisper.load_model(name, device=self.DEVICE)
+        else:
+            raise RuntimeError("No Whisper library installed (faster-whisper or openai-whisper)")
+        return LoadedModel(name, self.backend(), model)
+
+    def _preload_quietly(self, size: str, language: Optional[str]):
+        try:
+            with self.acquire(size, language):
+                pass
+        except Exception as e:
+            print(f"⚠️  Could not preload Whisper model '{self.model_name(size, language)}': {e}")
+
+
+def _segment(segment_id: int, start: float, end: float, text: str, avg_logprob: float,
+             words: list[tuple[float, float, str]]) -> dict:
+    return {
+        'id': segment_id,
+        'start': start,
+        'end': end,
+        'text': text,
+        'confidence': round(math.exp(avg_logprob), 4),
+        'words': [{'start': s, 'end': e, 'word': w} for s, e, w in words],
+    }
+
+
+whisper_pool = WhisperModelPool()
@@ -1,11 +1,17 @@
 """FastAPI main application."""
 
+import asyncio
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from .api import upload, chat, status, download
+from .api import upload, chat, status, download, jobs, transcript
 from .core.ffmpeg_engine import FFmpegEngine
+from .core.job_queue import job_queue
+from .core.render_cache import render_cache
+from .core.whisper_engine import WhisperEngine
+from .core.whisper_pool import whisper_pool
 from .utils.file_manager import FileManager
 
 
@@ -30,18 +36,32 @@ app.include_router(upload.router)
 app.include_router(chat.router)
 app.include_router(status.router)
 app.include_router(download.router)
+app.include_router(jobs.router)
+app.include_router(transcript.router)
 
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize on startup."""
     FileManager.ensure_directories()
+    FileManager.index.load()
     
-    # Check FFmpeg
-    if not FFmpegEngine.check_installed():
+    # Discover FFmpeg's capabilities once; requests and /health answer from memory
+    capabilities = await asyncio.to_thread(FFmpegEngine.capabilities, True)
+    if not capabilities.installed:
         print("⚠️  FFmpeg not installed. Install it to use video processing features.")
     else:
-        print("✓ FFmpeg is available")
+        print(f"✓ FFmpeg is available ({capabilities.version}; "
+              f"{len(capabilities.encoders)} encoders, {len(capabilities.filters)} filters)")
+    
+    # Load the default Whisper model in the background so the first transcription doesn't wait
+    whisper_pool.preload(WhisperEngine.MODEL, "en")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Cancel running jobs on shutdown."""
+    await job_queue.shutdown()
 
 
 @app.get("/")
@@ -53,6 +73,10 @@ async def root():
             "upload": "POST /api/upload",
             "chat": "POST /api/chat",
             "status": "GET /api/status/{video_id}",
+            "jobs": "GET /api/jobs/{job_id}",
+            "cancel_job": "DELETE /api/jobs/{job_id}",
+            "transcript": "GET /api/transcript/{video_id}",
+            "transcript_search": "GET /api/transcript/{video_id}/search?q=...",
             "download": "GET /api/download/{video_id}",
             "outputs": "GET /api/outputs/{video_id}"
         }
@@ -60,11 +84,19 @@ async def root():
 
 
 @app.get("/health")
-async def health():
-    """Health check endpoint."""
+async def health(refresh: bool = False):
+    """
+    Health check endpoint.
+    
+    ``refresh=true`` re-discovers FFmpeg's capabilities (e.g. after an upgrade).
+    """
+    capabilities = await asyncio.to_thread(FFmpegEngine.capabilities, refresh)
     return {
         "status": "healthy",
-        "ffmpeg_installed": FFmpegEngine.check_installed()
+        "ffmpeg_installed": capabilities.installed,
+        "ffmpeg": capabilities.summary(),
+        "render_cache": render_cache.stats(),
+        "whisper": whisper_pool.stats()
     }
 
 
@@ -8,6 +8,7 @@ class ChatMessage(BaseModel):
     """Chat message schema."""
     video_id: str
     message: str
+    preview: bool = False
 
 
 class ChatResponse(BaseModel):
@@ -17,6 +18,22 @@ class ChatResponse(BaseModel):
     video_id: str
     output_path: Optional[str] = None
     operation: Optional[str] = None
+    job_id: Optional[str] = None
+
+
+class JobResponse(BaseModel):
+    """Background job schema."""
+    job_id: str
+    video_id: str
+    operation: str
+    status: str
+    message: Optional[str] = None
+    output_path: Optional[str] = None
+    cached: Optional[bool] = None
+    error: Optional[str] = None
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
 
 
 class UploadResponse(BaseModel):
@@ -25,6 +42,21 @@ class UploadResponse(BaseModel):
     filename: str
     size: int
     message: str
+    sha256: Optional[str] = None
+
+
+class UploadSessionCreate(BaseModel):
+    """Resumable upload creation request."""
+    filename: str
+    size: int
+
+
+class UploadSessionResponse(BaseModel):
+    """Resumable upload state."""
+    upload_id: str
+    filename: str
+    size: int
+    offset: int
 
 
 class StatusResponse(BaseModel):
@@ -33,6 +65,10 @@ class StatusResponse(BaseModel):
     status: str
     progress: float
     current_operation: Optional[str] = None
+    job_id: Optional[str] = None
+    speed: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    error: Optional[str] = None
 
 
 class TranscriptSegment(BaseModel):
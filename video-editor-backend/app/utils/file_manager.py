@@ -1,16 +1,29 @@
 """File management utilities."""
 
+import hashlib
 import os
+import threading
 import uuid
 from pathlib import Path
 
+from .metadata_index import MetadataIndex
+
 
 class FileManager:
     """Handles file operations."""
     
     UPLOAD_DIR = "uploads"
     OUTPUT_DIR = "outputs"
+    INDEX_PATH = "metadata_index.jsonl"
     ALLOWED_EXTENSIONS = {'.mp4', '.avi', '.mov', '.mkv', '.webm', '.flv'}
+    HASH_CHUNK_SIZE = 1024 * 1024
+    
+    # (path, size, mtime_ns) -> sha256 hex digest
+    _content_hashes: dict[tuple, str] = {}
+    _hash_lock = threading.Lock()
+    
+    # Persistent video_id -> upload/outputs/media info/jobs index
+    index = MetadataIndex(INDEX_PATH, UPLOAD_DIR, OUTPUT_DIR)
     
     @staticmethod
     def generate_video_id() -> str:
@@ -29,9 +42,9 @@ class FileManager:
         return os.path.join(FileManager.UPLOAD_DIR, f"{video_id}_{filename}")
     
     @staticmethod
-    def get_output_path(video_id: str, operation: str) -> str:
-        """Get output path for processed video."""
-        return os.path.join(FileManager.OUTPUT_DIR, f"{video_id}_{operation}.mp4")
+    def get_output_path(video_id: str, operation: str, extension: str = '.mp4') -> str:
+        """Get output path for processed video (or another artifact type)."""
+        return os.path.join(FileManager.OUTPUT_DIR, f"{video_id}_{operation}{extension}")
     
     @staticmethod
     def get_temp_path(video_id: str, suffix: str) -> str:
@@ -66,12 +79,75 @@ class FileManager:
         except Exception:
             return False
     
+    @staticmethod
+    def find_upload(video_id: str) -> str:
+        """Path of a video's upload, or None if it does not exist."""
+        return FileManager.index.get_upload_path(video_id)
+    
+    @staticmethod
+    def register_upload(video_id: str, path: str, filename: str, sha256: str = None):
+        """Record a completed upload in the metadata index."""
+        FileManager.index.add_upload(video_id, path, filename, sha256)
+        if sha256:
+            FileManager.remember_content_hash(path, sha256)
+    
     @staticmethod
     def list_outputs(video_id: str) -> list[str]:
         """List all outputs for a video."""
-        outputs = []
-        if os.path.exists(FileManager.OUTPUT_DIR):
-            for file in os.listdir(FileManager.OUTPUT_DIR):
-                if file.startswith(video_id):
-                    outputs.append(os.path.join(FileManager.OUTPUT_DIR, file))
-        return outputs
+        return FileManager.index.list_outputs(video_id)
+    
+    @staticmethod
+    def register_output(video_id: str, path: str):
+        """Record a newly written output in the metadata index."""
+        FileManager.index.add_output(video_id, path)
+    
+    @staticmethod
+    def latest_output(video_id: str, extension: str = None) -> str:
+        """Most recently modified output of a video, optionally of one file type."""
+        outputs = [
+            path for path in FileManager.list_outputs(video_id)
+            if extension is None or path.endswith(extension)
+        ]
+        if not outputs:
+            return None
+        return max(outputs, key=os.path.getmtime)
+    
+    @staticmethod
+    def get_content_hash(path: str) -> str:
+        """
+        Get the SHA-256 of a file's content.
+        
+        Digests are memoized by path, size and modification time, so a file
+        is only read again after it changes.
+        """
+        key = FileManager._hash_key(path)
+        with FileManager._hash_lock:
+            digest = FileManager._content_hashes.get(key)
+        if digest is None:
+            # Digest recorded at upload time survives restarts
+            digest = FileManager.index.content_hash_for(path, key[1], key[2])
+        if digest is not None:
+            FileManager.remember_content_hash(path, digest, key)
+            return digest
+        
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(FileManager.HASH_CHUNK_SIZE), b''):
+                sha256.update(chunk)
+        
+        digest = sha256.hexdigest()
+        FileManager.remember_content_hash(path, digest, key)
+        FileManager.index.record_content_hash(path, digest)
+        return digest
+    
+    @staticmethod
+    def remember_content_hash(path: str, digest: str, key: tuple = None):
+        """Record a digest computed elsewhere (e.g. while the file was uploaded)."""
+        key = key or FileManager._hash_key(path)
+        with FileManager._hash_lock:
+            FileManager._content_hashes[key] = digest
+    
+    @staticmethod
+    def _hash_key(path: str) -> tuple:
+        stat = os.stat(path)
+        return (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
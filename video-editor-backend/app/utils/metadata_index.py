@@ -0,0 +1,271 @@
+"""Persistent per-video metadata index backed by an append-only JSON log."""
+
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+
+class MetadataIndex:
+    """
+    Maps video_id to its upload, probed media info, transcript, outputs and job history.
+
+    State lives in memory for O(1) lookups and every change is appended to a
+    JSON-lines log, which is replayed on load. Loading reconciles the index
+    with the filesystem: records of deleted files are dropped and files that
+    appeared outside the API are adopted. The log is rewritten as a snapshot
+    when it grows well past the number of live records.
+    """
+
+    MAX_JOB_HISTORY = 50
+
+    def __init__(self, index_path: str, upload_dir: str, output_dir: str):
+        self.index_path = index_path
+        self.upload_dir = upload_dir
+        self.output_dir = output_dir
+        self._lock = threading.RLock()
+        self._videos: dict[str, dict] = {}
+        self._by_path: dict[str, str] = {}
+        self._log_lines = 0
+        self._loaded = False
+
+    def load(self):
+        """Replay the log and reconcile it with the upload and output directories."""
+        with self._lock:
+            self._videos = {}
+            self._by_path = {}
+            self._log_lines = 0
+
+            if os.path.exists(self.index_path):
+                with open(self.index_path, encoding='utf-8') as f:
+                    for line in f:
+                        self._log_lines += 1
+                        try:
+                            self._apply(json.loads(line))
+                        except (ValueError, KeyError):
+                            # Torn write at the end of the log
+                            continue
+
+            self._loaded = True
+            self._reconcile()
+
+            if self._log_lines > 2 * self._record_count() + 1000:
+                self.compact()
+
+    def get(self, video_id: str) -> Optional[dict]:
+        """Get a copy of a video's record."""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._videos.get(video_id)
+            return json.loads(json.dumps(record)) if record is not None else None
+
+    def __contains__(self, video_id: str) -> bool:
+        with self._lock:
+            self._ensure_loaded()
+            return video_id in self._videos
+
+    def add_upload(self, video_id: str, path: str, filename: str, sha256: Optional[str] = None):
+        """Record a newly uploaded video."""
+        stat = os.stat(path)
+        self._append({
+            'event': 'upload',
+            'video_id': video_id,
+            'path': path,
+            'filename': filename,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': sha256,
+            'created_at': time.time(),
+        })
+
+    def get_upload_path(self, video_id: str) -> Optional[str]:
+        """Path of a video's upload, or None if unknown or deleted."""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._videos.get(video_id)
+            path = record.get('path') if record else None
+            if path is None:
+                return None
+            if not os.path.isfile(path):
+                self._append({'event': 'remove_upload', 'video_id': video_id})
+                return None
+            return path
+
+    def content_hash_for(self, path: str, size: int, mtime_ns: int) -> Optional[str]:
+        """Stored SHA-256 of an upload, if the file is unchanged since it was recorded."""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._videos.get(self._by_path.get(path, ''))
+            if record and record.get('size') == size and record.get('mtime_ns') == mtime_ns:
+                return record.get('sha256')
+            return None
+
+    def record_content_hash(self, path: str, sha256: str):
+        """Store the SHA-256 of an upload identified by its path."""
+        with self._lock:
+            self._ensure_loaded()
+            video_id = self._by_path.get(path)
+            if video_id is None or self._videos[video_id].get('sha256') == sha256:
+                return
+            stat = os.stat(path)
+            self._append({
+                'event': 'hash',
+                'video_id': video_id,
+                'sha256': sha256,
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+            })
+
+    def set_media_info(self, video_id: str, info: dict):
+        """Store probed media info for a video."""
+        self._append({'event': 'media_info', 'video_id': video_id, 'info': info})
+
+    def set_transcript(self, video_id: str, info: dict):
+        """Store the key and summary of a video's stored transcript."""
+        self._append({'event': 'transcript', 'video_id': video_id, 'info': info})
+
+    def add_output(self, video_id: str, path: str):
+        """Record an output file of a video."""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._videos.get(video_id)
+            if record and path in record['outputs']:
+                return
+        self._append({'event': 'output', 'video_id': video_id, 'path': path})
+
+    def list_outputs(self, video_id: str) -> list[str]:
+        """Existing output files of a video, dropping records of deleted ones."""
+        with self._lock:
+            self._ensure_loaded()
+            record = self._videos.get(video_id)
+            if record is None:
+                return []
+            outputs = []
+            for path in list(record['outputs']):
+                if os.path.isfile(path):
+                    outputs.append(path)
+                else:
+                    self._append({'event': 'remove_output', 'video_id': video_id, 'path': path})
+            return outputs
+
+    def record_job(self, video_id: str, job: dict):
+        """Append a finished job to a video's history."""
+        self._append({'event': 'job', 'video_id': video_id, 'job': job})
+
+    def compact(self):
+        """Rewrite the log as one snapshot event per video."""
+        with self._lock:
+            tmp_path = f"{self.index_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in self._videos.values():
+                    f.write(json.dumps({'event': 'snapshot', 'record': record}) + '\n')
+            os.replace(tmp_path, self.index_path)
+            self._log_lines = len(self._videos)
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.load()
+
+    def _append(self, event: dict):
+        with self._lock:
+            self._ensure_loaded()
+            self._apply(event)
+            directory = os.path.dirname(self.index_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.index_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(event) + '\n')
+            self._log_lines += 1
+
+    def _record(self, video_id: str) -> dict:
+        record = self._videos.get(video_id)
+        if record is None:
+            record = {
+                'video_id': video_id,
+                'path': None,
+                'filename': None,
+                'size': None,
+                'mtime_ns': None,
+                'sha256': None,
+                'created_at': None,
+                'media_info': None,
+                'transcript': None,
+                'outputs': [],
+                'jobs': [],
+            }
+            self._videos[video_id] = record
+        return record
+
+    def _apply(self, event: dict):
+        """Apply one log event to the in-memory state."""
+        kind = event['event']
+
+        if kind == 'snapshot':
+            record = event['record']
+            self._videos[record['video_id']] = record
+            if record.get('path'):
+                self._by_path[record['path']] = record['video_id']
+            return
+
+        video_id = event['video_id']
+        record = self._record(video_id)
+
+        if kind == 'upload':
+            for key in ('path', 'filename', 'size', 'mtime_ns', 'sha256', 'created_at'):
+                record[key] = event.get(key)
+            self._by_path[event['path']] = video_id
+        elif kind == 'remove_upload':
+            self._by_path.pop(record.get('path') or '', None)
+            record['path'] = None
+        elif kind == 'hash':
+            record['sha256'] = event['sha256']
+            record['size'] = event.get('size', record.get('size'))
+            record['mtime_ns'] = event.get('mtime_ns', record.get('mtime_ns'))
+        elif kind == 'media_info':
+            record['media_info'] = event['info']
+        elif kind == 'transcript':
+            record['transcript'] = event['info']
+        elif kind == 'output':
+            if event['path'] not in record['outputs']:
+                record['outputs'].append(event['path'])
+        elif kind == 'remove_output':
+            if event['path'] in record['outputs']:
+                record['outputs'].remove(event['path'])
+        elif kind == 'job':
+            record['jobs'] = (record['jobs'] + [event['job']])[-MetadataIndex.MAX_JOB_HISTORY:]
+
+        if record['path'] is None and not record['outputs'] and not record['jobs']:
+            del self._videos[video_id]
+
+    def _record_count(self) -> int:
+        return len(self._videos)
+
+    def _reconcile(self):
+        """Drop records of missing files and adopt files the index does not know."""
+        for video_id in list(self._videos):
+            record = self._videos[video_id]
+            if record.get('path') and not os.path.isfile(record['path']):
+                self._append({'event': 'remove_upload', 'video_id': video_id})
+            for path in list(self._videos.get(video_id, {}).get('outputs', [])):
+                if not os.path.isfile(path):
+                    self._append({'event': 'remove_output', 'video_id': video_id, 'path': path})
+
+        known_outputs = {
+            path for record in self._videos.values() for path in record['outputs']
+        }
+        for directory, is_upload in ((self.upload_dir, True), (self.output_dir, False)):
+            if not os.path.isdir(directory):
+                continue
+            for name in os.listdir(directory):
+                path = os.path.join(directory, name)
+                if name.startswith('.') or name.endswith('.tmp') or not os.path.isfile(path):
+                    continue
+                # Files are named {video_id}_{name}; UUIDs contain no underscore
+                video_id, sep, rest = name.partition('_')
+                if not sep:
+                    continue
+                if is_upload and path not in self._by_path:
+                    self.add_upload(video_id, path, rest)
+                elif not is_upload and path not in known_outputs:
+                    self._append({'event': 'output', 'video_id': video_id, 'path': path})
@@ -0,0 +1,88 @@
+"""Incremental multipart/form-data parsing over a streamed request body."""
+
+from typing import AsyncIterator, Optional
+
+from multipart.multipart import MultipartParseError, MultipartParser, parse_options_header
+
+
+async def iter_multipart(content_type: str, chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[str, object]]:
+    """
+    Parse a multipart body as it arrives.
+
+    Unlike ``UploadFile``, nothing is spooled: each part's data is yielded
+    as soon as the body chunk containing it has been received, so callers
+    can write a file field straight to its destination.
+
+    Args:
+        content_type: The request's Content-Type header
+        chunks: The request body, e.g. ``request.stream()``
+
+    Yields:
+        ('part', (name, filename)) when a part's headers are complete
+        (filename is None for plain fields), ('data', bytes) for the part's
+        content, and ('end', None) when the part is finished. A part
+        without 'end' was cut off by a truncated body.
+
+    Raises:
+        ValueError: The body is not multipart/form-data or is malformed
+    """
+    media_type, options = parse_options_header(content_type)
+    boundary = options.get(b'boundary')
+    if media_type != b'multipart/form-data' or not boundary:
+        raise ValueError("Expected a multipart/form-data body")
+
+    events: list[tuple[str, object]] = []
+    headers: dict[bytes, bytes] = {}
+    header = {'field': b'', 'value': b''}
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data: bytes, start: int, end: int):
+        header['field'] += data[start:end]
+
+    def on_header_value(data: bytes, start: int, end: int):
+        header['value'] += data[start:end]
+
+    def on_header_end():
+        headers[header['field'].lower()] = header['value']
+        header['field'] = header['value'] = b''
+
+    def on_headers_finished():
+        _, disposition = parse_options_header(headers.get(b'content-disposition', b''))
+        events.append(('part', (_decode(disposition.get(b'name')), _decode(disposition.get(b'filename')))))
+
+    def on_part_data(data: bytes, start: int, end: int):
+        events.append(('data', data[start:end]))
+
+    def on_part_end():
+        events.append(('end', None))
+
+    parser = MultipartParser(boundary, {
+        'on_part_begin': on_part_begin,
+        'on_header_field': on_header_field,
+        'on_header_value': on_header_value,
+        'on_header_end': on_header_end,
+        'on_headers_finished': on_headers_finished,
+        'on_part_data': on_part_data,
+        'on_part_end': on_part_end,
+    })
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        try:
+            parser.write(chunk)
+        except MultipartParseError as e:
+            raise ValueError(f"Malformed multipart body: {e}")
+        for event in events:
+            yield event
+        events.clear()
+
+    parser.finalize()
+    for event in events:
+        yield event
+
+
+def _decode(value: Optional[bytes]) -> Optional[str]:
+    return value.decode('utf-8', errors='replace') if value is not None else None
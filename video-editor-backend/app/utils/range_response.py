@@ -0,0 +1,143 @@
+"""File responses with HTTP Range and ETag support."""
+
+import asyncio
+import os
+import re
+from email.utils import formatdate
+from typing import Optional
+from urllib.parse import quote
+
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+
+class RangeFileResponse(Response):
+    """
+    Serve a file with byte-range (206) and conditional (304) support.
+
+    The requested range is streamed in chunks read off the event loop, so
+    only one chunk is in memory at a time. uvicorn does not offer the
+    ``http.response.zerocopysend`` extension; if a server does, the file
+    descriptor is handed to it instead.
+    """
+
+    CHUNK_SIZE = 256 * 1024
+
+    def __init__(self, path: str, request_headers, media_type: str = 'application/octet-stream',
+                 filename: Optional[str] = None, method: str = 'GET'):
+        super().__init__(content=None, media_type=media_type)
+        self.path = path
+        self.send_body = method != 'HEAD'
+
+        stat = os.stat(path)
+        self.file_size = stat.st_size
+        self.etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+        self.raw_headers = [
+            (b'accept-ranges', b'bytes'),
+            (b'etag', self.etag.encode()),
+            (b'last-modified', formatdate(stat.st_mtime, usegmt=True).encode()),
+            (b'content-type', media_type.encode()),
+        ]
+        if filename:
+            self.raw_headers.append(
+                (b'content-disposition', f"attachment; filename*=utf-8''{quote(filename)}".encode())
+            )
+
+        self.start, self.end = 0, self.file_size - 1
+        if _etag_matches(request_headers.get('if-none-match'), self.etag):
+            self.status_code = 304
+            return
+
+        byte_range = request_headers.get('range')
+        if_range = request_headers.get('if-range')
+        if byte_range and (if_range is None or if_range == self.etag):
+            parsed = _parse_range(byte_range, self.file_size)
+            if parsed is None:
+                self.status_code = 416
+                self.raw_headers.append((b'content-range', f'bytes */{self.file_size}'.encode()))
+                return
+            if parsed != (0, self.file_size - 1):
+                self.start, self.end = parsed
+                self.status_code = 206
+                self.raw_headers.append(
+                    (b'content-range', f'bytes {self.start}-{self.end}/{self.file_size}'.encode())
+                )
+
+    @property
+    def content_length(self) -> int:
+        if self.status_code in (304, 416):
+            return 0
+        return max(0, self.end - self.start + 1)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        self.raw_headers.append((b'content-length', str(self.content_length).encode()))
+        await send({'type': 'http.response.start', 'status': self.status_code, 'headers': self.raw_headers})
+
+        if not self.send_body or self.content_length == 0:
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        with open(self.path, 'rb') as f:
+            if 'http.response.zerocopysend' in scope.get('extensions', {}):
+                await send({
+                    'type': 'http.response.zerocopysend',
+                    'file': f.fileno(),
+                    'offset': self.start,
+                    'count': self.content_length,
+                })
+                return
+
+            position = self.start
+            remaining = self.content_length
+            while remaining > 0:
+                chunk = await asyncio.to_thread(_read_at, f, position, min(self.CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                position += len(chunk)
+                remaining -= len(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+
+            if remaining > 0:
+                # File shrank while streaming
+                await send({'type': 'http.response.body', 'body': b''})
+
+
+def _read_at(f, position: int, size: int) -> bytes:
+    f.seek(position)
+    return f.read(size)
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag."""
+    if not header:
+        return False
+    candidates = [tag.strip().removeprefix('W/') for tag in header.split(',')]
+    return '*' in candidates or etag in candidates
+
+
+def _parse_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """
+    Parse a single ``bytes=`` range into inclusive (start, end).
+
+    Multiple ranges are served as the whole file; unsatisfiable ranges return None.
+    """
+    match = re.fullmatch(r'\s*bytes\s*=\s*(\d*)\s*-\s*(\d*)\s*', header)
+    if not match:
+        return 0, size - 1
+    first, last = match.groups()
+
+    if first == '' and last == '':
+        return 0, size - 1
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or end < start:
+        return None
+    return start, min(end, size - 1)
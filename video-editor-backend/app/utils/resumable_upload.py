@@ -0,0 +1,155 @@
+"""Resumable (tus-style) upload sessions."""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import AsyncIterator, Optional
+
+from .file_manager import FileManager
+
+
+class UploadSession:
+    """
+    A partially uploaded file.
+
+    Data is appended to ``uploads/.partial/{upload_id}.part``; the size of that
+    file is the authoritative offset, so sessions survive dropped connections
+    and server restarts. The SHA-256 is updated as chunks arrive and rebuilt
+    from the partial file if the in-memory state was lost.
+    """
+
+    PARTIAL_DIR = os.path.join(FileManager.UPLOAD_DIR, '.partial')
+
+    def __init__(self, upload_id: str, filename: str, size: int, created_at: Optional[float] = None):
+        self.upload_id = upload_id
+        self.filename = filename
+        self.size = size
+        self.created_at = created_at or time.time()
+        self.lock = asyncio.Lock()
+        self._sha256 = None
+        self._hashed_offset = 0
+
+    @property
+    def data_path(self) -> str:
+        return os.path.join(UploadSession.PARTIAL_DIR, f"{self.upload_id}.part")
+
+    @property
+    def meta_path(self) -> str:
+        return os.path.join(UploadSession.PARTIAL_DIR, f"{self.upload_id}.json")
+
+    @property
+    def offset(self) -> int:
+        """Number of bytes received so far."""
+        return FileManager.get_file_size(self.data_path)
+
+    def save(self):
+        """Persist session metadata and create the empty data file."""
+        os.makedirs(UploadSession.PARTIAL_DIR, exist_ok=True)
+        with open(self.meta_path, 'w') as f:
+            json.dump({
+                'upload_id': self.upload_id,
+                'filename': self.filename,
+                'size': self.size,
+                'created_at': self.created_at
+            }, f)
+        open(self.data_path, 'ab').close()
+
+    async def append(self, chunks: AsyncIterator[bytes]) -> int:
+        """
+        Append streamed chunks to the partial file.
+
+        Chunks are written and hashed off the event loop; memory use is one
+        chunk regardless of upload size. Appending stops with ValueError if
+        the declared size would be exceeded.
+
+        Returns:
+            The new offset
+        """
+        offset = await asyncio.to_thread(self._sync_hash)
+        with open(self.data_path, 'ab') as f:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                if offset + len(chunk) > self.size:
+                    raise ValueError(f"Upload exceeds declared size of {self.size} bytes")
+                await asyncio.to_thread(self._write, f, chunk)
+                offset += len(chunk)
+        return offset
+
+    def finalize(self, destination: str) -> str:
+        """
+        Move the completed upload to its final path.
+
+        Returns:
+            SHA-256 hex digest of the file content
+        """
+        if self._sync_hash() != self.size:
+            raise ValueError(f"Upload incomplete: {self.offset} of {self.size} bytes received")
+
+        digest = self._sha256.hexdigest()
+        os.replace(self.data_path, destination)
+        FileManager.cleanup_file(self.meta_path)
+        return digest
+
+    def discard(self):
+        """Delete the partial upload."""
+        FileManager.cleanup_file(self.data_path)
+        FileManager.cleanup_file(self.meta_path)
+
+    def _write(self, f, chunk: bytes):
+        f.write(chunk)
+        f.flush()
+        self._sha256.update(chunk)
+        self._hashed_offset += len(chunk)
+
+    def _sync_hash(self) -> int:
+        """Bring the running hash up to the current offset, rehashing from disk if needed."""
+        offset = self.offset
+        if self._sha256 is None or self._hashed_offset != offset:
+            self._sha256 = hashlib.sha256()
+            self._hashed_offset = 0
+            with open(self.data_path, 'rb') as f:
+                for chunk in iter(lambda: f.read(FileManager.HASH_CHUNK_SIZE), b''):
+                    self._sha256.update(chunk)
+                    self._hashed_offset += len(chunk)
+        return self._hashed_offset
+
+
+class UploadSessionManager:
+    """Creates and looks up resumable upload sessions."""
+
+    def __init__(self):
+        self._sessions: dict[str, UploadSession] = {}
+
+    def create(self, filename: str, size: int) -> UploadSession:
+        """Start a new upload session."""
+        session = UploadSession(str(uuid.uuid4()), filename, size)
+        session.save()
+        self._sessions[session.upload_id] = session
+        return session
+
+    def get(self, upload_id: str) -> Optional[UploadSession]:
+        """Get a session, reloading it from disk after a restart."""
+        session = self._sessions.get(upload_id)
+        if session is not None:
+            return session
+
+        meta_path = os.path.join(UploadSession.PARTIAL_DIR, f"{os.path.basename(upload_id)}.json")
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+
+        session = UploadSession(meta['upload_id'], meta['filename'], meta['size'], meta.get('created_at'))
+        self._sessions[upload_id] = session
+        return session
+
+    def remove(self, upload_id: str):
+        """Forget a session (after finalizing or discarding it)."""
+        self._sessions.pop(upload_id, None)
+
+
+upload_sessions = UploadSessionManager()